@@ -0,0 +1,44 @@
+#!/usr/bin/python3
+"""Compare the size, save and reload times of the compression codecs.
+
+The ratio is against the uncompressed JSON file, and saves reuse the
+JSON fragments or binary records cached by the warm-up save of their
+format.
+
+Usage: python3 benchmarks/bench_compression.py [number of objects]
+"""
+import os
+import sys
+from fixtures import populate, timed
+import models
+from models.engine.file_storage import FileStorage
+
+
+def main(count):
+    """Print the results of every codec for count objects."""
+    populate(count)
+    plain = None
+    print(f"{count} objects")
+    print(f"{'codec':8}{'format':8}{'size':>12}{'ratio':>8}"
+          f"{'save (s)':>10}{'reload (s)':>12}")
+    for binary in (False, True):
+        FileStorage._FileStorage__binary = binary
+        FileStorage._FileStorage__codec = None
+        models.storage.save()
+        for codec in (None, "gzip", "zlib", "lzma"):
+            FileStorage._FileStorage__codec = codec
+            objects = FileStorage._FileStorage__objects
+            save, result = timed(models.storage.save)
+            size = os.path.getsize("file.json")
+            plain = plain or size
+            FileStorage._FileStorage__objects = {}
+            reload, result = timed(models.storage.reload)
+            assert len(models.storage.all()) == len(objects)
+            FileStorage._FileStorage__objects = objects
+            print(f"{codec or 'none':8}{'binary' if binary else 'json':8}"
+                  f"{size:>12}{plain / size:>8.1f}{save:>10.3f}"
+                  f"{reload:>12.3f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,93 @@
+#!/usr/bin/python3
+"""Compare the memory held per object by the model classes and by their
+compact variants (HBNB_COMPACT_MODELS=1), then with and without interned
+ids.
+
+Both representations build the same records, read back from JSON as
+reload reads them, through their decoders, so attribute values are shared
+and only the instances, their dictionaries or slots and their timestamps
+are counted. The ids are then compared by building the objects from a
+fresh JSON text and counting everything they keep once the records are
+gone, with every foreign key a copy of the id it references or sharing
+it.
+
+Usage: python3 benchmarks/bench_memory.py [number of objects]
+"""
+import gc
+import json
+import sys
+import tracemalloc
+from fixtures import populate
+import models
+from models.engine.compact import compact
+from models.engine.decoder import compile_decoder
+from models.engine.schema import columns, declared
+
+
+def footprint(records, cls_of):
+    """Return the bytes allocated per class name while building records
+    through the decoders of the classes picked by cls_of."""
+    decoders = {class_name: compile_decoder(cls_of(cls))
+                for class_name, cls in declared.items()}
+    sizes = {}
+    for class_name in sorted({record["__class__"] for record in records}):
+        batch = [record for record in records
+                 if record["__class__"] == class_name]
+        decode = decoders[class_name]
+        gc.collect()
+        tracemalloc.start()
+        objects = [decode(record) for record in batch]
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        sizes[class_name] = (len(objects), size)
+        del objects
+    return sizes
+
+
+def retained(text, references):
+    """Return the bytes kept by the objects built from the JSON text of
+    their records, interning the ids held by references."""
+    decoders = {class_name: compile_decoder(cls, references)
+                for class_name, cls in declared.items()}
+    gc.collect()
+    tracemalloc.start()
+    records = json.loads(text)
+    objects = [decoders[record["__class__"]](record) for record in records]
+    del records
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del objects
+    return size
+
+
+def main(count):
+    """Print the bytes per object of both representations for count
+    objects."""
+    populate(count)
+    records = json.loads(json.dumps([obj.to_dict() for obj
+                                     in models.storage.all().values()]))
+    plain = footprint(records, lambda cls: cls)
+    slotted = footprint(records, lambda cls: compact(cls, columns(cls)))
+    print(f"{len(records)} objects, bytes per object")
+    print(f"{'class':10}{'count':>8}{'dict':>8}{'compact':>9}{'saved':>7}")
+    totals = [0, 0, 0]
+    for class_name, (number, before) in plain.items():
+        after = slotted[class_name][1]
+        totals = [totals[0] + number, totals[1] + before, totals[2] + after]
+        print(f"{class_name:10}{number:>8}{before / number:>8.0f}"
+              f"{after / number:>9.0f}{1 - after / before:>7.0%}")
+    number, before, after = totals
+    print(f"{'all':10}{number:>8}{before / number:>8.0f}"
+          f"{after / number:>9.0f}{1 - after / before:>7.0%}")
+    text = json.dumps(records)
+    copied = retained(text, ())
+    interned = retained(text, None)
+    print("\nwith every value, bytes per object")
+    print(f"{'copied ids':16}{copied / number:>8.0f}")
+    print(f"{'interned ids':16}{interned / number:>8.0f}"
+          f"{1 - interned / copied:>7.0%}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
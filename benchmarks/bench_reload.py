@@ -0,0 +1,123 @@
+#!/usr/bin/python3
+"""Compare reload with the reload of the baseline.
+
+The baseline loaded the whole file.json with json.load, looked up each
+class with eval, built each instance through BaseModel.__init__, which
+parsed the timestamps and set every attribute one by one, and added each
+one to the storage through new. former_reload runs that code, with that
+__init__, against both layouts of file.json: the single line json.dump
+wrote in the baseline and the one entry per line written by save now.
+The current reload decodes the entries of either layout in batches and
+builds the instances through the decoders, interning their ids.
+
+Usage: python3 benchmarks/bench_reload.py [number of objects]
+"""
+import json
+import sys
+import uuid
+from datetime import datetime
+from fixtures import populate, timed
+import models
+from models.base_model import BaseModel
+from models.user import User
+from models.state import State
+from models.city import City
+from models.amenity import Amenity
+from models.place import Place
+from models.review import Review
+from models.engine.file_storage import FileStorage
+
+
+def former_init(self, *args, **kwargs):
+    '''Initializing the Basemodel.
+    Args:
+    *args: won’t be used
+    **kwargs: dic representation of instance
+    '''
+    if len(kwargs) != 0:
+        for key, value in kwargs.items():
+            if key == "created_at" or key == "updated_at":
+                self.__dict__[key] = datetime.fromisoformat(value)
+            else:
+                self.__dict__[key] = value
+    else:
+        self.id = str(uuid.uuid4())
+        self.created_at = datetime.now()
+        self.updated_at = datetime.now()
+        models.storage.new(self)
+
+
+def former_new(objects, obj):
+    """Set in objects obj with key <obj_class_name>.id"""
+    key_name = f"{obj.__class__.__name__}.{obj.id}"
+    objects[key_name] = obj
+
+
+def former_reload(path):
+    """Deserialize the JSON file path the way the baseline reload did."""
+    objects = {}
+    init = BaseModel.__init__
+    BaseModel.__init__ = former_init
+    try:
+        with open(path, "r") as f:
+            obj_dict = json.load(f)
+            for object_value in obj_dict.values():
+                class_name = object_value["__class__"]
+                del object_value["__class__"]
+                former_new(objects, eval(f"{class_name}")(**object_value))
+    finally:
+        BaseModel.__init__ = init
+    return objects
+
+
+def single_line(path):
+    """Write the objects to path on a single line, as the baseline did."""
+    with open(path, 'w') as f:
+        dic = {key: value.to_dict()
+               for key, value in models.storage.all().items()}
+        json.dump(dic, f)
+
+
+def current_reload(path):
+    """Reload the storage from path."""
+    FileStorage._FileStorage__file_path = path
+    try:
+        models.storage.reload()
+    finally:
+        FileStorage._FileStorage__file_path = "file.json"
+    return models.storage.all()
+
+
+def best(function, path, repeat=5):
+    """Return the fastest of repeat runs of function(path) on an empty
+    storage, and the number of objects it loaded."""
+    times = []
+    for _ in range(repeat):
+        FileStorage._FileStorage__objects = {}
+        seconds, objects = timed(function, path)
+        times.append(seconds)
+        loaded = len(objects)
+        del objects
+    return min(times), loaded
+
+
+def main(count):
+    """Print the reload times of the baseline and of the current code for
+    count objects, for both layouts."""
+    populate(count)
+    models.storage.save()
+    single_line("single.json")
+    print(f"{count} objects")
+    print(f"{'layout':16}{'baseline':>10}{'current':>10}{'speedup':>10}")
+    for layout, path in (("single line", "single.json"),
+                         ("entry per line", "file.json")):
+        former, loaded = best(former_reload, path)
+        assert loaded == count
+        current, loaded = best(current_reload, path)
+        assert loaded == count
+        print(f"{layout:16}{former:>9.3f}s{current:>9.3f}s"
+              f"{former / current:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,71 @@
+#!/usr/bin/python3
+"""Shared helpers for the storage benchmarks.
+
+Importing this module moves to a temporary directory before models is
+imported, so the benchmarks never touch the file.json of the project.
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.chdir(tempfile.mkdtemp(prefix="hbnb-bench-"))
+
+import models
+from models.city import City
+from models.place import Place
+from models.review import Review
+from models.state import State
+from models.user import User
+
+words = ["cozy", "cabin", "quiet", "view", "lake", "downtown", "loft",
+         "sunny", "garden", "clean", "great", "host", "close", "beach"]
+
+
+def populate(count, seed=0):
+    """Create count objects shaped like a small listing site."""
+    rand = random.Random(seed)
+    states = []
+    for i in range(10):
+        state = State()
+        state.name = f"State {i}"
+        states.append(state)
+    cities = []
+    for i in range(max(1, count // 100)):
+        city = City()
+        city.state_id = rand.choice(states).id
+        city.name = f"City {i}"
+        cities.append(city)
+    users = []
+    for i in range(max(1, count // 10)):
+        user = User()
+        user.email = f"user{i}@hbnb.io"
+        user.first_name = rand.choice(words).title()
+        users.append(user)
+    places = []
+    for i in range(max(1, count // 4)):
+        place = Place()
+        place.city_id = rand.choice(cities).id
+        place.user_id = rand.choice(users).id
+        place.name = " ".join(rand.choices(words, k=3))
+        place.description = " ".join(rand.choices(words, k=20))
+        place.number_rooms = rand.randint(1, 6)
+        place.max_guest = rand.randint(1, 12)
+        place.price_by_night = rand.randint(20, 500)
+        place.latitude = rand.uniform(-60, 60)
+        place.longitude = rand.uniform(-180, 180)
+        places.append(place)
+    while len(models.storage.all()) < count:
+        review = Review()
+        review.place_id = rand.choice(places).id
+        review.user_id = rand.choice(users).id
+        review.text = " ".join(rand.choices(words, k=30))
+
+
+def timed(function, *args):
+    """Return the seconds taken by function(*args) and its result."""
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
@@ -4,13 +4,7 @@ import cmd
 import re
 from shlex import split
 from models import storage
-from models.base_model import BaseModel
-from models.user import User
-from models.state import State
-from models.city import City
-from models.place import Place
-from models.amenity import Amenity
-from models.review import Review
+from models.engine.schema import classes, columns
 
 
 def parse(arg):
@@ -31,6 +25,16 @@ def parse(arg):
         return retl
 
 
+def parse_value(text):
+    """Return text as an int or a float if it is one, else as is."""
+    for valtype in (int, float):
+        try:
+            return valtype(text)
+        except ValueError:
+            pass
+    return text
+
+
 class HBNBCommand(cmd.Cmd):
     """Defines the HolbertonBnB command interpreter.
 
@@ -60,7 +64,8 @@ class HBNBCommand(cmd.Cmd):
             "show": self.do_show,
             "destroy": self.do_destroy,
             "count": self.do_count,
-            "update": self.do_update
+            "update": self.do_update,
+            "search": self.do_search
         }
         match = re.search(r"\.", arg)
         if match is not None:
@@ -76,11 +81,13 @@ class HBNBCommand(cmd.Cmd):
 
     def do_quit(self, arg):
         """Quit command to exit the program."""
+        storage.flush()
         return True
 
     def do_EOF(self, arg):
         """EOF signal to exit the program."""
         print("")
+        storage.flush()
         return True
 
     def do_create(self, arg):
@@ -93,7 +100,7 @@ class HBNBCommand(cmd.Cmd):
         elif argl[0] not in HBNBCommand.__classes:
             print("** class doesn't exist **")
         else:
-            print(eval(argl[0])().id)
+            print(classes[argl[0]]().id)
             storage.save()
 
     def do_show(self, arg):
@@ -127,7 +134,7 @@ class HBNBCommand(cmd.Cmd):
         elif "{}.{}".format(argl[0], argl[1]) not in objdict.keys():
             print("** no instance found **")
         else:
-            del objdict["{}.{}".format(argl[0], argl[1])]
+            storage.delete(objdict["{}.{}".format(argl[0], argl[1])])
             storage.save()
 
     def do_all(self, arg):
@@ -139,22 +146,129 @@ class HBNBCommand(cmd.Cmd):
             print("** class doesn't exist **")
         else:
             objl = []
-            for obj in storage.all().values():
-                if len(argl) > 0 and argl[0] == obj.__class__.__name__:
+            if len(argl) > 0:
+                for obj in storage.query(argl[0]):
                     objl.append(obj.__str__())
-                elif len(argl) == 0:
+            else:
+                for obj in storage.all().values():
                     objl.append(obj.__str__())
             print(objl)
 
+    def do_compact(self, arg):
+        """Usage: compact
+        Write a snapshot of the storage and empty its journal."""
+        storage.compact()
+
     def do_count(self, arg):
         """Usage: count <class> or <class>.count()
         Retrieve the number of instances of a given class."""
         argl = parse(arg)
-        count = 0
-        for obj in storage.all().values():
-            if argl[0] == obj.__class__.__name__:
-                count += 1
-        print(count)
+        print(storage.count(argl[0]))
+
+    def do_geo(self, arg):
+        """Usage: geo radius <latitude> <longitude> <km> or
+       geo nearest <latitude> <longitude> <count> or
+       geo bbox <south> <west> <north> <east>
+        Display the places within km of a point, the count places
+        closest to it, or the places inside a bounding box."""
+        argl = parse(arg)
+        queries = {"radius": storage.radius, "nearest": storage.nearest,
+                   "bbox": storage.bbox}
+        if len(argl) == 0:
+            print("** query missing **")
+            return False
+        if argl[0] not in queries:
+            print("** query doesn't exist **")
+            return False
+        if len(argl) < (5 if argl[0] == "bbox" else 4):
+            print("** coordinates missing **")
+            return False
+        try:
+            values = [float(value) for value in argl[1:]]
+            if argl[0] == "nearest":
+                values[2] = int(argl[3])
+        except ValueError:
+            print("** invalid number **")
+            return False
+        print([obj.__str__() for obj in queries[argl[0]]("Place", *values)])
+
+    def do_search(self, arg):
+        """Usage: search <words> or search <class> <words> or
+       <class>.search(<words>)
+        Display the places and reviews matching the words, best first."""
+        argl = arg.split()
+        class_name = None
+        if len(argl) > 0 and argl[0] in HBNBCommand.__classes:
+            class_name = argl.pop(0)
+        if len(argl) == 0:
+            print("** words missing **")
+            return False
+        print([obj.__str__() for obj in
+               storage.search(" ".join(argl), class_name)])
+
+    def do_stats(self, arg):
+        """Usage: stats <class> count|sum|min|max|avg [<attribute>]
+       [by <attribute>] [where <attribute> <operator> <value> ...]
+        Display an aggregate of an attribute over the instances of a class
+        meeting the conditions, per value of another attribute if given."""
+        argl = split(arg)
+        if len(argl) == 0:
+            print("** class name missing **")
+            return False
+        if argl[0] not in HBNBCommand.__classes:
+            print("** class doesn't exist **")
+            return False
+        if len(argl) == 1:
+            print("** aggregate missing **")
+            return False
+        if argl[1] not in ("count", "sum", "min", "max", "avg"):
+            print("** aggregate doesn't exist **")
+            return False
+        try:
+            view = storage.columns(argl[0])
+        except ImportError:
+            print("** numpy missing **")
+            return False
+        words = argl[2:]
+        name = by = None
+        if words and words[0] not in ("by", "where"):
+            name = words.pop(0)
+        if words[:1] == ["by"] and len(words) > 1:
+            by = words[1]
+            words = words[2:]
+        conditions = []
+        if words[:1] == ["where"]:
+            words.pop(0)
+            while len(words) >= 3:
+                if words[1] == "in":
+                    value = [parse_value(item)
+                             for item in words[2].split(",")]
+                else:
+                    value = parse_value(words[2])
+                conditions.append((words[0], words[1], value))
+                words = words[3:]
+        if words:
+            print("** invalid condition **")
+            return False
+        if argl[1] != "count" and name is None:
+            print("** attribute name missing **")
+            return False
+        for attribute in (name, by) + tuple(cond[0] for cond in conditions):
+            if attribute is not None and attribute not in view.names:
+                print("** attribute doesn't exist **")
+                return False
+        try:
+            mask = view.where(*conditions)
+        except ValueError:
+            print("** invalid condition **")
+            return False
+        try:
+            if by is None:
+                print(view.aggregate(argl[1], name, mask))
+            else:
+                print(view.group_by(by, argl[1], name, mask))
+        except ValueError:
+            print("** attribute isn't a number **")
 
     def do_update(self, arg):
         """Usage: update <class> <id> <attribute_name> <attribute_value> or
@@ -189,20 +303,19 @@ class HBNBCommand(cmd.Cmd):
 
         if len(argl) == 4:
             obj = objdict["{}.{}".format(argl[0], argl[1])]
-            if argl[2] in obj.__class__.__dict__.keys():
-                valtype = type(obj.__class__.__dict__[argl[2]])
-                obj.__dict__[argl[2]] = valtype(argl[3])
+            valtypes = columns(type(obj))
+            if argl[2] in valtypes:
+                setattr(obj, argl[2], valtypes[argl[2]](argl[3]))
             else:
-                obj.__dict__[argl[2]] = argl[3]
+                setattr(obj, argl[2], argl[3])
         elif type(eval(argl[2])) == dict:
             obj = objdict["{}.{}".format(argl[0], argl[1])]
+            valtypes = columns(type(obj))
             for k, v in eval(argl[2]).items():
-                if (k in obj.__class__.__dict__.keys() and
-                        type(obj.__class__.__dict__[k]) in {str, int, float}):
-                    valtype = type(obj.__class__.__dict__[k])
-                    obj.__dict__[k] = valtype(v)
+                if valtypes.get(k) in {str, int, float}:
+                    setattr(obj, k, valtypes[k](v))
                 else:
-                    obj.__dict__[k] = v
+                    setattr(obj, k, v)
         storage.save()
 
 
@@ -1,6 +1,11 @@
 #!/usr/bin/python3
 """__init__ magic method for models directory"""
+from os import getenv
 
-from models.engine import file_storage
-storage = file_storage.FileStorage()
+if getenv("HBNB_TYPE_STORAGE") == "db":
+    from models.engine import db_storage
+    storage = db_storage.DBStorage()
+else:
+    from models.engine import file_storage
+    storage = file_storage.FileStorage()
 storage.reload()
@@ -2,11 +2,77 @@
 '''BaseModel class'''
 import uuid
 from datetime import datetime
+from sys import intern
 import models
+from models.engine.cache import cache
+
+
+def is_reference(name):
+    '''Returns True if the attribute name holds an id: "id" itself or a
+    foreign key such as "city_id"'''
+    return name == "id" or name.endswith("_id")
+
+
+def canonical(name, value):
+    '''Returns value, or the single shared copy of it if it is the id
+    held by the attribute name, so that every object referencing the
+    same one shares its id string'''
+    if type(value) is str and is_reference(name):
+        return intern(value)
+    return value
+
+
+def record(obj):
+    '''Returns the dictionary of the attributes of obj returned by
+    to_dict(), built without going through the cache; timestamps not read
+    since they were loaded are returned as saved, without formatting'''
+    attributes = obj.__dict__.copy()
+    attributes["__class__"] = obj.__class__.__name__
+    for key in ("created_at", "updated_at"):
+        if not isinstance(attributes.get(key), str):
+            attributes[key] = getattr(obj, key).isoformat()
+    return attributes
+
+
+class Timestamp():
+    '''A timestamp attribute, kept as the ISO format string it was saved
+    as until it is read, then parsed once'''
+    def __set_name__(self, owner, name):
+        '''Remembers the name of the attribute'''
+        self.name = name
+
+    def __get__(self, obj, objtype=None):
+        '''Returns the timestamp of obj as a datetime'''
+        if obj is None:
+            return self
+        attributes = obj.__dict__
+        try:
+            value = attributes[self.name]
+        except KeyError:
+            raise AttributeError(f"'{type(obj).__name__}' object has no "
+                                 f"attribute '{self.name}'") from None
+        if isinstance(value, str):
+            value = datetime.fromisoformat(value)
+            attributes[self.name] = value
+        return value
+
+    def __set__(self, obj, value):
+        '''Sets the timestamp of obj, a datetime or an ISO format string'''
+        obj.__dict__[self.name] = value
+
+    def __delete__(self, obj):
+        '''Deletes the timestamp of obj'''
+        try:
+            del obj.__dict__[self.name]
+        except KeyError:
+            raise AttributeError(self.name) from None
 
 
 class BaseModel():
     '''A class that defines all common attributes/methods for other classes'''
+    created_at = Timestamp()
+    updated_at = Timestamp()
+
     def __init__(self, *args, **kwargs):
         '''Initializing the Basemodel.
         Args:
@@ -16,27 +82,58 @@ class BaseModel():
         if len(kwargs) != 0:
             for key, value in kwargs.items():
                 if key == "created_at" or key == "updated_at":
-                    self.__dict__[key] = datetime.fromisoformat(value)
-                else:
+                    if not isinstance(value, str):
+                        raise TypeError(f"{key} must be an ISO format "
+                                        f"string, not {type(value).__name__}")
                     self.__dict__[key] = value
+                else:
+                    self.__dict__[key] = canonical(key, value)
         else:
             self.id = str(uuid.uuid4())
             self.created_at = datetime.now()
             self.updated_at = datetime.now()
             models.storage.new(self)
 
+    def __setattr__(self, name, value):
+        '''Sets an attribute and marks the instance as changed in storage'''
+        models.storage.touch(self, before=True)
+        super().__setattr__(name, canonical(name, value))
+        cache.discard(self)
+        models.storage.touch(self)
+
+    def __delattr__(self, name):
+        '''Deletes an attribute and marks the instance as changed'''
+        models.storage.touch(self, before=True)
+        super().__delattr__(name)
+        cache.discard(self)
+        models.storage.touch(self)
+
     def __str__(self):
-        '''Returns the string representation of the BaseModel instance'''
-        return f"[{self.__class__.__name__}] ({self.id}) {self.__dict__}"
+        '''Returns the string representation of the BaseModel instance,
+        cached until an attribute changes'''
+        text = cache.get(self, "str")
+        if text is None:
+            generation = cache.generation()
+            attributes = self.__dict__.copy()
+            for key in ("created_at", "updated_at"):
+                if isinstance(attributes.get(key), str):
+                    attributes[key] = getattr(self, key)
+            text = f"[{self.__class__.__name__}] ({self.id}) {attributes}"
+            cache.put(self, "str", text, generation)
+        return text
 
     def save(self):
         '''updates the public instance attribute updated_at'''
         self.updated_at = datetime.now()
+        cache.discard(self)
         models.storage.save()
 
     def to_dict(self):
-        dict_cop = self.__dict__.copy()
-        dict_cop["__class__"] = self.__class__.__name__
-        dict_cop["created_at"] = self.created_at.isoformat()
-        dict_cop["updated_at"] = self.updated_at.isoformat()
-        return dict_cop
+        '''Returns a dictionary of the instance attributes, built once
+        until an attribute changes'''
+        dict_cop = cache.get(self, "dict")
+        if dict_cop is None:
+            generation = cache.generation()
+            dict_cop = record(self)
+            cache.put(self, "dict", dict_cop, generation)
+        return dict_cop.copy()
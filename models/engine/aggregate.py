@@ -0,0 +1,101 @@
+#!/usr/bin/python3
+"""the AggregateView class."""
+from bisect import bisect_left, insort
+from models.engine.index import SortedIndex
+
+functions = ("count", "sum", "min", "max", "avg")
+
+
+class AggregateView():
+    """Representing aggregates of the instances of a class per value of a
+    group-by attribute, kept up to date as instances are added, changed
+    and removed, so reading the aggregate of a group does not scan them.
+
+    Attributes:
+        __groups (dict): The values of the group-by attribute mapped to
+            their number of instances, the sum of their numbers and the
+            sorted list of their numbers, so min and max survive removals.
+        __values (dict): The keys mapped to their (group, number), number
+            being None when missing or not an int or float.
+    """
+
+    def __init__(self, values=()):
+        """Initialize the view with (key, (group,)) pairs, to count the
+        instances per group, or (key, (group, number)) pairs."""
+        self.__groups = {}
+        self.__values = {}
+        for key, value in values:
+            self.add(key, value)
+
+    def __len__(self):
+        """Return the number of keys aggregated."""
+        return len(self.__values)
+
+    def add(self, key, value):
+        """Aggregate key in the group value[0], with the number value[1] if
+        given, replacing its former group and number.
+
+        Keys whose group is None or unhashable are not aggregated.
+        """
+        self.remove(key)
+        group = value[0]
+        number = value[1] if len(value) > 1 else None
+        if group is None:
+            return
+        try:
+            stats = self.__groups.setdefault(group, [0, 0, []])
+        except TypeError:
+            return
+        stats[0] += 1
+        if SortedIndex.numeric(number):
+            stats[1] += number
+            insort(stats[2], number)
+        else:
+            number = None
+        self.__values[key] = (group, number)
+
+    def remove(self, key):
+        """Remove key from its group, if it is inside."""
+        if key not in self.__values:
+            return
+        group, number = self.__values.pop(key)
+        stats = self.__groups[group]
+        stats[0] -= 1
+        if number is not None:
+            del stats[2][bisect_left(stats[2], number)]
+            stats[1] = stats[1] - number if stats[2] else 0
+        if not stats[0]:
+            del self.__groups[group]
+
+    def get(self, function, group):
+        """Return the aggregate of group: 0 for "count" and "sum" and None
+        for "min", "max" and "avg" when it has no number.
+
+        Raises:
+            ValueError: If function is not in functions.
+        """
+        if function not in functions:
+            raise ValueError(f"unknown aggregate {function!r}")
+        try:
+            count, total, numbers = self.__groups.get(group, (0, 0, ()))
+        except TypeError:
+            count, total, numbers = 0, 0, ()
+        if function == "count":
+            return count
+        if function == "sum":
+            return total
+        if not numbers:
+            return None
+        if function == "min":
+            return numbers[0]
+        if function == "max":
+            return numbers[-1]
+        return total / len(numbers)
+
+    def groups(self, function):
+        """Return the groups mapped to their aggregate.
+
+        Raises:
+            ValueError: If function is not in functions.
+        """
+        return {group: self.get(function, group) for group in self.__groups}
@@ -0,0 +1,411 @@
+#!/usr/bin/python3
+"""Compact binary format for the objects saved by FileStorage.
+
+A file starts with the magic bytes and the version of the format,
+followed by sections of the records of a class, one or more per class. A
+section holds the class name, its schema (the declared attributes of the
+class and their types) and its records.
+
+The records of a section are stored in two blocks. The first one holds
+the fixed-size part of every record, packed by a struct compiled once
+per schema: its flags, its id as 16 UUID bytes, its timestamps as
+microseconds since the epoch, a bitmask of the declared attributes set
+on the instance and the values of the number attributes. The second one
+holds, for every record, the values of its text attributes, the JSON of
+its list attributes and the JSON of any other attribute, separated by
+NUL characters, so a single decode and split reads the texts of the
+whole section.
+Version 1 files, which packed every value on its own, are still read.
+
+Usage: python3 -m models.engine.binary_format to-binary|to-json SRC DST
+"""
+import json
+import struct
+import sys
+from datetime import datetime, timedelta
+from functools import lru_cache
+from models.engine.schema import classes, columns
+
+magic = b"HBNB"
+version = 2
+epoch = datetime(1970, 1, 1)
+microsecond = timedelta(microseconds=1)
+type_codes = {str: b"s", int: b"i", float: b"f", list: b"l"}
+code_types = {code: valtype for valtype, code in type_codes.items()}
+number_codes = {int: "q", float: "d"}
+u8 = struct.Struct("<B")
+u16 = struct.Struct("<H")
+u32 = struct.Struct("<I")
+i64 = struct.Struct("<q")
+f64 = struct.Struct("<d")
+stamps = struct.Struct("<qq")
+str_id = 1
+base = ("__class__", "id", "created_at", "updated_at")
+limit = 1 << 63
+packers = {}
+
+
+def is_binary(path):
+    """Return True if the file path starts with the magic bytes."""
+    with open(path, "rb") as f:
+        return f.read(len(magic)) == magic
+
+
+def pack_str(value):
+    """Return value as its length followed by its UTF-8 bytes."""
+    data = value.encode()
+    return u32.pack(len(data)) + data
+
+
+def pack_id(obj_id):
+    """Return the 16 bytes of obj_id if it is a UUID written the way
+    str(uuid) writes it, or None."""
+    if type(obj_id) is str and len(obj_id) == 36 \
+            and obj_id[8] == obj_id[13] == obj_id[18] == obj_id[23] == "-":
+        digits = obj_id.replace("-", "")
+        try:
+            packed = bytes.fromhex(digits)
+        except ValueError:
+            return None
+        if packed.hex() == digits:
+            return packed
+    return None
+
+
+def unpack_id(packed):
+    """Return the UUID string of 16 bytes."""
+    digits = packed.hex()
+    return f"{digits[:8]}-{digits[8:12]}-{digits[12:16]}-" \
+           f"{digits[16:20]}-{digits[20:]}"
+
+
+@lru_cache(maxsize=1 << 12)
+def second_micros(text):
+    """Return the microseconds since the epoch of an ISO timestamp to the
+    second."""
+    return (datetime.fromisoformat(text) - epoch) // microsecond
+
+
+def micros(text):
+    """Return the microseconds since the epoch of an ISO timestamp.
+
+    The timestamps saved together mostly share their second, which is only
+    parsed once.
+    """
+    if len(text) == 26 and text[19] == "." and text[20:].isdigit():
+        return second_micros(text[:19]) + int(text[20:])
+    return (datetime.fromisoformat(text) - epoch) // microsecond
+
+
+@lru_cache(maxsize=1 << 12)
+def second_text(seconds):
+    """Return the ISO timestamp of a number of seconds since the epoch."""
+    return (epoch + timedelta(seconds=seconds)).isoformat()
+
+
+def isoformat(value):
+    """Return the ISO timestamp of value microseconds since the epoch, as
+    datetime.isoformat writes it."""
+    seconds, fraction = divmod(value, 1000000)
+    if fraction:
+        return second_text(seconds) + "." + str(fraction + 1000000)[1:]
+    return second_text(seconds)
+
+
+def schema(class_name):
+    """Return the declared (name, type) attributes saved for class_name."""
+    cls = classes.get(class_name)
+    if cls is None:
+        return {}
+    return {name: valtype for name, valtype in columns(cls).items()
+            if name not in ("id", "created_at", "updated_at")}
+
+
+def fits(value, valtype):
+    """Return True if value can be saved in a column of type valtype."""
+    if type(value) is not valtype:
+        return False
+    if valtype is int:
+        return -limit <= value < limit
+    return valtype is not str or "\0" not in value
+
+
+def record_struct(fields):
+    """Return the struct of the fixed-size part of the records of a class
+    with fields."""
+    return struct.Struct("<B16sqq{}s{}".format(
+        (len(fields) + 7) // 8,
+        "".join(number_codes[valtype] for valtype in fields.values()
+                if valtype in number_codes)))
+
+
+def packer(class_name):
+    """Return the function packing the to_dict() records of class_name,
+    compiled once from its schema."""
+    pack = packers.get(class_name)
+    if pack is None:
+        pack = packers[class_name] = compile_packer(schema(class_name))
+    return pack
+
+
+def compile_packer(fields):
+    """Return the function returning the bytes of a to_dict() record of a
+    class with fields."""
+    bits = {name: 1 << bit for bit, name in enumerate(fields)}
+    numbers = [(bits[name], name, valtype)
+               for name, valtype in fields.items() if valtype in number_codes]
+    texts = [(bits[name], name)
+             for name, valtype in fields.items() if valtype is str]
+    lists = [(bits[name], name)
+             for name, valtype in fields.items() if valtype is list]
+    fixed = record_struct(fields)
+    mask_size = (len(fields) + 7) // 8
+    blank = bytes(16)
+
+    def pack(record):
+        """Return the bytes of record."""
+        obj_id = record["id"]
+        packed_id = pack_id(obj_id)
+        if packed_id is None:
+            flags, packed_id, strings = str_id, blank, [json.dumps(obj_id)]
+        else:
+            flags, strings = 0, []
+        mask = kept = 0
+        values = []
+        for bit, name, valtype in numbers:
+            value = record.get(name, record)
+            if type(value) is valtype and (
+                    valtype is float or -limit <= value < limit):
+                mask |= bit
+                kept += 1
+                values.append(value)
+            else:
+                values.append(0)
+        for bit, name in texts:
+            value = record.get(name, record)
+            if type(value) is str and "\0" not in value:
+                mask |= bit
+                kept += 1
+                strings.append(value)
+        for bit, name in lists:
+            value = record.get(name, record)
+            if type(value) is list:
+                mask |= bit
+                kept += 1
+                strings.append(json.dumps(value))
+        if len(record) > len(base) + kept:
+            strings.append(json.dumps({
+                key: value for key, value in record.items()
+                if key not in base and not (
+                    key in fields and fits(value, fields[key]))}))
+        else:
+            strings.append("")
+        return fixed.pack(flags, packed_id, micros(record["created_at"]),
+                          micros(record["updated_at"]),
+                          mask.to_bytes(mask_size, "little"),
+                          *values) + "\0".join(strings).encode()
+    return pack
+
+
+def dump(entries, f, section_size=1 << 12):
+    """Write the (key, to_dict() record) entries to the binary file f.
+
+    A record can also be given as the bytes packer() returned for it. The
+    records of a class are written in sections of at most section_size
+    records, so they are not all held until the end.
+    """
+    sections = {}
+    f.write(magic + u8.pack(version))
+    for key, record in entries:
+        class_name = key.partition(".")[0]
+        if type(record) is not bytes:
+            class_name = record["__class__"]
+            record = packer(class_name)(record)
+        section = sections.setdefault(class_name, [])
+        section.append(record)
+        if len(section) >= section_size:
+            write_section(f, class_name, section)
+            section.clear()
+    for class_name, section in sections.items():
+        if section:
+            write_section(f, class_name, section)
+    f.write(u8.pack(0))
+
+
+def write_section(f, class_name, records):
+    """Write the section of the packed records of class_name to f."""
+    fields = schema(class_name)
+    size = record_struct(fields).size
+    text = b"\0".join(record[size:] for record in records)
+    f.write(u8.pack(1) + pack_str(class_name) + u16.pack(len(fields)))
+    for name, valtype in fields.items():
+        f.write(pack_str(name) + type_codes[valtype])
+    f.write(u32.pack(len(records)))
+    f.writelines(record[:size] for record in records)
+    f.write(u32.pack(len(text)) + text)
+
+
+def load(f):
+    """Yield the (key, to_dict() record) entries of the binary file f.
+
+    Raises:
+        ValueError: If f does not start with the magic bytes of a known
+            version.
+    """
+    data = f.read()
+    start = len(magic) + u8.size
+    if data[:len(magic)] != magic or len(data) < start \
+            or data[len(magic)] not in readers:
+        raise ValueError("not a binary storage file")
+    return readers[data[len(magic)]](memoryview(data), start)
+
+
+def unpack_str(data, pos):
+    """Return the string at pos in data and the position after it."""
+    size, = u32.unpack_from(data, pos)
+    pos += u32.size + size
+    return str(data[pos - size:pos], "utf-8"), pos
+
+
+def read_section(data, pos):
+    """Return the class name, the fields, the number of records and the
+    position of the records of the section at pos in data, or None at the
+    end of the sections."""
+    if not data[pos]:
+        return None
+    class_name, pos = unpack_str(data, pos + u8.size)
+    count, = u16.unpack_from(data, pos)
+    pos += u16.size
+    fields = {}
+    for i in range(count):
+        name, pos = unpack_str(data, pos)
+        fields[name] = code_types[bytes(data[pos:pos + 1])]
+        pos += 1
+    count, = u32.unpack_from(data, pos)
+    return class_name, fields, count, pos + u32.size
+
+
+def read_records(data, pos):
+    """Yield the entries of the version 2 records of data, from pos."""
+    section = read_section(data, pos)
+    while section is not None:
+        class_name, fields, count, pos = section
+        fixed = record_struct(fields)
+        rows = fixed.iter_unpack(data[pos:pos + count * fixed.size])
+        text, pos = unpack_str(data, pos + count * fixed.size)
+        strings = iter(text.split("\0"))
+        plans = {}
+        for values in rows:
+            if values[0] & str_id:
+                obj_id = json.loads(next(strings))
+            else:
+                obj_id = unpack_id(values[1])
+            plan = plans.get(values[4])
+            if plan is None:
+                plan = plans[values[4]] = read_plan(fields, values[4])
+            numbers, texts, lists = plan
+            record = {
+                "__class__": class_name,
+                "id": obj_id,
+                "created_at": isoformat(values[2]),
+                "updated_at": isoformat(values[3])
+            }
+            for name, index in numbers:
+                record[name] = values[index]
+            record.update(zip(texts, strings))
+            for name in lists:
+                record[name] = json.loads(next(strings))
+            extra = next(strings)
+            if extra:
+                record.update(json.loads(extra))
+            yield f"{class_name}.{obj_id}", record
+        section = read_section(data, pos)
+
+
+def read_plan(fields, mask):
+    """Return where the attributes set in mask are in a record of a class
+    with fields: the names of the numbers with their index in the fixed
+    part, then the names of the texts and of the lists, in the order of
+    the text part."""
+    mask = int.from_bytes(mask, "little")
+    numbers, texts, lists = [], [], []
+    index = 5
+    for bit, (name, valtype) in enumerate(fields.items()):
+        if valtype in number_codes:
+            if mask & (1 << bit):
+                numbers.append((name, index))
+            index += 1
+        elif mask & (1 << bit):
+            (texts if valtype is str else lists).append(name)
+    return numbers, texts, lists
+
+
+def read_records_v1(data, pos):
+    """Yield the entries of the version 1 records of data, from pos, which
+    packed their values one after the other."""
+    section = read_section(data, pos)
+    while section is not None:
+        class_name, fields, count, pos = section
+        mask_size = (len(fields) + 7) // 8
+        for i in range(count):
+            flags = data[pos]
+            pos += u8.size
+            if flags & str_id:
+                obj_id, pos = unpack_str(data, pos)
+            else:
+                obj_id = unpack_id(bytes(data[pos:pos + 16]))
+                pos += 16
+            created_at, updated_at = stamps.unpack_from(data, pos)
+            pos += stamps.size
+            record = {
+                "__class__": class_name,
+                "id": obj_id,
+                "created_at": isoformat(created_at),
+                "updated_at": isoformat(updated_at)
+            }
+            mask = int.from_bytes(data[pos:pos + mask_size], "little")
+            pos += mask_size
+            for bit, (name, valtype) in enumerate(fields.items()):
+                if not mask & (1 << bit):
+                    continue
+                if valtype is int:
+                    record[name], = i64.unpack_from(data, pos)
+                    pos += i64.size
+                elif valtype is float:
+                    record[name], = f64.unpack_from(data, pos)
+                    pos += f64.size
+                elif valtype is str:
+                    record[name], pos = unpack_str(data, pos)
+                else:
+                    value, pos = unpack_str(data, pos)
+                    record[name] = json.loads(value)
+            extra, pos = unpack_str(data, pos)
+            if extra:
+                record.update(json.loads(extra))
+            yield f"{class_name}.{obj_id}", record
+        section = read_section(data, pos)
+
+
+readers = {1: read_records_v1, 2: read_records}
+
+
+def main(argv):
+    """Convert a storage file between the JSON and binary formats."""
+    if len(argv) != 4 or argv[1] not in ("to-binary", "to-json"):
+        print(__doc__.splitlines()[-1])
+        return 1
+    if argv[1] == "to-binary":
+        with open(argv[2], "r") as f:
+            entries = json.load(f)
+        with open(argv[3], "wb") as f:
+            dump(entries.items(), f)
+    else:
+        with open(argv[2], "rb") as f:
+            entries = dict(load(f))
+        with open(argv[3], "w") as f:
+            json.dump(entries, f)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,126 @@
+#!/usr/bin/python3
+"""the SerialCache class and the cache shared by the models."""
+import sys
+import threading
+import weakref
+from collections import OrderedDict
+from os import getenv
+
+
+def footprint(value):
+    """Return an estimate of the bytes held by a cached form."""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(sys.getsizeof(item) for item in value.values())
+    return size
+
+
+class SerialCache():
+    """Representing the serialized forms of instances, such as their
+    string and to_dict() forms, evicted least recently used first once
+    they hold more than max_bytes.
+
+    Instances are held through weak references, so caching them does not
+    keep them alive, and the forms of collected ones age out like the
+    others.
+
+    Attributes:
+        max_bytes (int): The estimated size of the forms kept, 0 to keep
+            none.
+        hits (int): The number of forms found.
+        misses (int): The number of forms not found.
+        __entries (OrderedDict): The ids of the instances mapped to a
+            weak reference to them and the dictionary of their forms, from
+            the least recently used.
+        __size (int): The estimated size of the forms kept.
+        __generation (int): The number of discards so far, so a form
+            built while an instance changed is not cached.
+    """
+
+    def __init__(self, max_bytes):
+        """Initialize an empty cache of at most max_bytes."""
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.__entries = OrderedDict()
+        self.__size = 0
+        self.__generation = 0
+        self.__lock = threading.Lock()
+
+    def __len__(self):
+        """Return the number of instances with cached forms."""
+        return len(self.__entries)
+
+    def size(self):
+        """Return the estimated size of the forms kept."""
+        return self.__size
+
+    def get(self, obj, form):
+        """Return the form of obj, or None if it is not cached."""
+        with self.__lock:
+            entry = self.__entries.get(id(obj))
+            if entry is None or entry[0]() is not obj \
+                    or form not in entry[1]:
+                self.misses += 1
+                return None
+            self.__entries.move_to_end(id(obj))
+            self.hits += 1
+            return entry[1][form][0]
+
+    def generation(self):
+        """Return the generation to pass to put for a form about to be
+        built."""
+        return self.__generation
+
+    def put(self, obj, form, value, generation=None):
+        """Cache value as the form of obj, then evict the least recently
+        used instances until the cache fits in max_bytes.
+
+        If generation is given and an instance was discarded since it was
+        returned by generation(), value may have been built from an
+        instance that changed meanwhile, on another thread, and it is not
+        cached.
+        """
+        size = footprint(value)
+        if size > self.max_bytes:
+            return
+        with self.__lock:
+            if generation is not None and generation != self.__generation:
+                return
+            entry = self.__entries.get(id(obj))
+            if entry is None or entry[0]() is not obj:
+                self.__drop(id(obj))
+                entry = (weakref.ref(obj), {})
+                self.__entries[id(obj)] = entry
+            if form in entry[1]:
+                self.__size -= entry[1][form][1]
+            entry[1][form] = (value, size)
+            self.__size += size
+            self.__entries.move_to_end(id(obj))
+            while self.__size > self.max_bytes:
+                self.__drop(next(iter(self.__entries)))
+
+    def discard(self, obj):
+        """Forget every form of obj, after it changed."""
+        self.__generation += 1
+        if id(obj) in self.__entries:
+            with self.__lock:
+                entry = self.__entries.get(id(obj))
+                if entry is not None and entry[0]() is obj:
+                    self.__drop(id(obj))
+
+    def clear(self):
+        """Forget every form."""
+        with self.__lock:
+            self.__generation += 1
+            self.__entries.clear()
+            self.__size = 0
+
+    def __drop(self, obj_id):
+        """Forget the forms cached under obj_id."""
+        entry = self.__entries.pop(obj_id, None)
+        if entry is not None:
+            self.__size -= sum(size for _, size in entry[1].values())
+
+
+cache = SerialCache(int(getenv("HBNB_CACHE_BYTES", str(32 << 20))))
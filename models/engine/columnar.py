@@ -0,0 +1,262 @@
+#!/usr/bin/python3
+"""the ColumnView class."""
+from models.engine.query import operators
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+aggregates = ("count", "sum", "min", "max", "avg")
+
+
+def table(entries, dtype):
+    """Return the array of entries, indexed by the codes of a column of
+    texts, whose last entry is read for the code -1."""
+    found = np.empty(len(entries), dtype=dtype)
+    found[:] = entries
+    return found
+
+
+class ColumnView():
+    """Representing the attributes of the instances of a class as columns,
+    for vectorized filters and aggregates. It needs numpy.
+
+    Numbers are stored in float64 arrays, with NaN where the value is
+    missing or not a number. Texts are dictionary encoded: an int32 array
+    of codes into the list of the distinct texts, -1 where the value is
+    missing or not a text. A removed row is replaced by the last one, so
+    the rows are not in any order.
+
+    Attributes:
+        names (tuple): The names of the columns.
+        __kinds (dict): The names mapped to float for a column of numbers
+            or to str for a column of texts.
+        __keys (list): The key of each row.
+        __rows (dict): The keys mapped to their row.
+        __capacity (int): The length of the arrays, doubled when full.
+        __arrays (dict): The names mapped to their array, longer than the
+            number of rows so appending is amortized.
+        __texts (dict): The names of the text columns mapped to the list
+            of their distinct texts.
+        __codes (dict): The names of the text columns mapped to the
+            dictionary of their texts and codes.
+    """
+
+    def __init__(self, kinds, values=()):
+        """Initialize the view with (key, tuple of values) pairs.
+
+        Args:
+            kinds (dict): The names of the columns mapped to int or float
+                for numbers and to str for texts.
+            values (iterable): The keys and their values, in the order of
+                kinds.
+
+        Raises:
+            ImportError: If numpy is not installed.
+        """
+        if np is None:
+            raise ImportError("the columnar view needs numpy")
+        self.names = tuple(kinds)
+        self.__kinds = {name: str if kind is str else float
+                        for name, kind in kinds.items()}
+        self.__keys = []
+        self.__rows = {}
+        self.__capacity = 16
+        self.__arrays = {name: self.__empty(name, self.__capacity)
+                         for name in self.names}
+        self.__texts = {name: [] for name, kind in self.__kinds.items()
+                        if kind is str}
+        self.__codes = {name: {} for name in self.__texts}
+        for key, value in values:
+            self.add(key, value)
+
+    def __len__(self):
+        """Return the number of rows."""
+        return len(self.__keys)
+
+    def __empty(self, name, size):
+        """Return an array of size missing values of the column name."""
+        if self.__kinds[name] is str:
+            return np.full(size, -1, dtype=np.int32)
+        return np.full(size, np.nan)
+
+    def add(self, key, value):
+        """Store the tuple value of key in its row, appending a row if key
+        is not inside."""
+        row = self.__rows.get(key)
+        if row is None:
+            row = len(self.__keys)
+            if row == self.__capacity:
+                self.__capacity *= 2
+                for name, array in self.__arrays.items():
+                    grown = self.__empty(name, self.__capacity)
+                    grown[:row] = array
+                    self.__arrays[name] = grown
+            self.__keys.append(key)
+            self.__rows[key] = row
+        for name, item in zip(self.names, value):
+            self.__arrays[name][row] = self.__encode(name, item)
+
+    def __encode(self, name, item):
+        """Return the number stored for item in the column name."""
+        if self.__kinds[name] is str:
+            if not isinstance(item, str):
+                return -1
+            codes = self.__codes[name]
+            if item not in codes:
+                codes[item] = len(codes)
+                self.__texts[name].append(item)
+            return codes[item]
+        if type(item) in (int, float):
+            return item
+        return np.nan
+
+    def remove(self, key):
+        """Remove the row of key, if it is inside."""
+        row = self.__rows.pop(key, None)
+        if row is None:
+            return
+        last = len(self.__keys) - 1
+        if row != last:
+            moved = self.__keys[last]
+            self.__keys[row] = moved
+            self.__rows[moved] = row
+            for array in self.__arrays.values():
+                array[row] = array[last]
+        self.__keys.pop()
+        for name, array in self.__arrays.items():
+            array[last] = -1 if self.__kinds[name] is str else np.nan
+
+    def keys(self, mask=None):
+        """Return the keys of the rows, of the ones set in mask if given."""
+        if mask is None:
+            return list(self.__keys)
+        return [self.__keys[row] for row in np.flatnonzero(mask)]
+
+    def column(self, name):
+        """Return a read-only array of the values of the column name, with
+        the texts decoded into an array of objects, None where missing.
+
+        Raises:
+            KeyError: If name is not a column.
+        """
+        array = self.__arrays[name][:len(self.__keys)]
+        if self.__kinds[name] is str:
+            return table(self.__texts[name] + [None], object)[array]
+        array = array.view()
+        array.flags.writeable = False
+        return array
+
+    def mask(self, name, op, value):
+        """Return the boolean array of the rows whose value of the column
+        name meets the condition op value. Missing values never do.
+
+        Raises:
+            KeyError: If name is not a column.
+            ValueError: If op is not a known operator.
+        """
+        if op not in operators:
+            raise ValueError(f"unknown operator {op!r}")
+        array = self.__arrays[name][:len(self.__keys)]
+        if self.__kinds[name] is str:
+            matches = []
+            for text in self.__texts[name]:
+                try:
+                    matches.append(bool(operators[op](text, value)))
+                except TypeError:
+                    matches.append(False)
+            return table(matches + [False], bool)[array]
+        present = ~np.isnan(array)
+        if op == "in":
+            return np.isin(array, [item for item in value
+                                   if type(item) in (int, float)])
+        if op == "contains" or type(value) not in (int, float):
+            return present if op == "!=" else np.zeros(len(array), bool)
+        with np.errstate(invalid="ignore"):
+            return operators[op](array, value) & present
+
+    def where(self, *conditions):
+        """Return the boolean array of the rows meeting every (name, op,
+        value) condition."""
+        found = np.ones(len(self.__keys), dtype=bool)
+        for name, op, value in conditions:
+            found &= self.mask(name, op, value)
+        return found
+
+    def aggregate(self, function, name=None, mask=None):
+        """Return an aggregate of the column name over the rows set in
+        mask, or over every row. Missing values are skipped.
+
+        Args:
+            function (str): "count", "sum", "min", "max" or "avg".
+            name (str): The column of numbers, or None to count the rows.
+            mask (array): The boolean array of the rows, or None for all.
+
+        Raises:
+            ValueError: If function is unknown, or if it is not "count" and
+                name is not a column of numbers.
+        """
+        result = self.group_by(None, function, name, mask)
+        return result.get(None, 0 if function in ("count", "sum") else None)
+
+    def group_by(self, by, function, name=None, mask=None):
+        """Return the values of the column by mapped to the aggregate of
+        the column name over their rows set in mask, or over every row.
+        Rows whose value of by is missing are skipped.
+
+        Args:
+            by (str): The column grouped by, or None for a single group
+                keyed by None.
+            function (str): "count", "sum", "min", "max" or "avg".
+            name (str): The column of numbers, or None to count the rows.
+            mask (array): The boolean array of the rows, or None for all.
+
+        Raises:
+            ValueError: If function is unknown, or if it is not "count" and
+                name is not a column of numbers.
+        """
+        if function not in aggregates:
+            raise ValueError(f"unknown aggregate {function!r}")
+        if function != "count" and self.__kinds.get(name) is not float:
+            raise ValueError(f"{name!r} is not a column of numbers")
+        size = len(self.__keys)
+        rows = np.ones(size, dtype=bool) if mask is None else mask.copy()
+        if name is not None:
+            values = self.__arrays[name][:size]
+            if self.__kinds[name] is float:
+                rows &= ~np.isnan(values)
+            else:
+                rows &= values >= 0
+        if by is None:
+            labels = [None]
+            groups = np.zeros(size, dtype=np.intp)
+        elif self.__kinds[by] is str:
+            labels = self.__texts[by]
+            groups = self.__arrays[by][:size].astype(np.intp)
+            rows &= groups >= 0
+        else:
+            column = self.__arrays[by][:size]
+            rows &= ~np.isnan(column)
+            found, inverse = np.unique(column[rows], return_inverse=True)
+            labels = [int(label) if label.is_integer() else float(label)
+                      for label in found.tolist()]
+            groups = np.zeros(size, dtype=np.intp)
+            groups[rows] = inverse
+        groups = groups[rows]
+        counts = np.bincount(groups, minlength=len(labels))
+        if function == "count":
+            results = counts
+        else:
+            values = self.__arrays[name][:size][rows]
+            if function in ("sum", "avg"):
+                results = np.bincount(groups, weights=values,
+                                      minlength=len(labels))
+                if function == "avg":
+                    results = results / np.maximum(counts, 1)
+            else:
+                fill = np.inf if function == "min" else -np.inf
+                results = np.full(len(labels), fill)
+                ufunc = np.minimum if function == "min" else np.maximum
+                ufunc.at(results, groups, values)
+        return {label: results[group].item()
+                for group, label in enumerate(labels) if counts[group]}
@@ -0,0 +1,196 @@
+#!/usr/bin/python3
+"""The compact variants of the model classes, keeping their attributes in
+slots instead of a dictionary per instance."""
+from collections.abc import MutableMapping
+
+base = ("id", "created_at", "updated_at")
+variants = {}
+
+
+class Compact():
+    """Representing the storage of the attributes of a compact instance.
+
+    Declared attributes live in slots, unset ones read as their class
+    default, and ad-hoc ones live in an overflow dictionary only created
+    for the instances that have some.
+
+    Attributes:
+        _slots (dict): The names of the attributes kept in slots mapped to
+            the descriptors of their slots.
+        _defaults (dict): The declared attributes mapped to their class
+            default.
+    """
+    __slots__ = ()
+    _slots = {}
+    _defaults = {}
+
+    def __getattr__(self, name):
+        """Return an ad-hoc attribute, or the class default of an unset
+        declared one."""
+        if name != "_extra":
+            try:
+                return self._extra[name]
+            except (AttributeError, KeyError):
+                pass
+            if name in self._defaults:
+                return self._defaults[name]
+        raise AttributeError(f"'{type(self).__name__}' object has no "
+                             f"attribute '{name}'")
+
+    def __setattr__(self, name, value):
+        """Set an attribute in its slot or in the overflow dictionary."""
+        if name in self._slots:
+            self._slots[name].__set__(self, value)
+        else:
+            try:
+                self._extra[name] = value
+            except AttributeError:
+                object.__setattr__(self, "_extra", {name: value})
+
+    def __delattr__(self, name):
+        """Delete an attribute from its slot or the overflow dictionary."""
+        if name in self._slots:
+            self._slots[name].__delete__(self)
+            return
+        try:
+            del self._extra[name]
+        except (AttributeError, KeyError):
+            raise AttributeError(name) from None
+
+    def __reduce__(self):
+        """Return how to copy or pickle the instance through the class it
+        is the variant of."""
+        return restore, (type(self).__base__, self.__dict__.copy())
+
+
+class Attributes(MutableMapping):
+    """Representing the attributes of a compact instance as its __dict__
+    would: changes go straight to the instance, without marking it as
+    changed.
+
+    Attributes:
+        obj (Compact): The instance.
+    """
+
+    def __init__(self, obj):
+        """Initialize the view of the attributes of obj."""
+        self.obj = obj
+
+    def copy(self):
+        """Return a dictionary of the attributes, slots first."""
+        obj = self.obj
+        attributes = {}
+        for name, slot in obj._slots.items():
+            try:
+                attributes[name] = slot.__get__(obj)
+            except AttributeError:
+                pass
+        try:
+            attributes.update(obj._extra)
+        except AttributeError:
+            pass
+        return attributes
+
+    def __getitem__(self, name):
+        """Return the attribute name."""
+        obj = self.obj
+        if name in obj._slots:
+            try:
+                return obj._slots[name].__get__(obj)
+            except AttributeError:
+                raise KeyError(name) from None
+        try:
+            return obj._extra[name]
+        except AttributeError:
+            raise KeyError(name) from None
+
+    def __setitem__(self, name, value):
+        """Set the attribute name to value."""
+        Compact.__setattr__(self.obj, name, value)
+
+    def __delitem__(self, name):
+        """Delete the attribute name."""
+        try:
+            Compact.__delattr__(self.obj, name)
+        except AttributeError:
+            raise KeyError(name) from None
+
+    def __iter__(self):
+        """Return an iterator over the names of the attributes."""
+        return iter(self.copy())
+
+    def __len__(self):
+        """Return the number of attributes."""
+        return len(self.copy())
+
+    def __repr__(self):
+        """Return the representation of the attributes as a dictionary."""
+        return repr(self.copy())
+
+    def clear(self):
+        """Delete every attribute."""
+        obj = self.obj
+        for slot in obj._slots.values():
+            try:
+                slot.__delete__(obj)
+            except AttributeError:
+                pass
+        try:
+            object.__delattr__(obj, "_extra")
+        except AttributeError:
+            pass
+
+
+def get_attributes(obj):
+    """Return the view of the attributes of obj."""
+    return Attributes(obj)
+
+
+def set_attributes(obj, attributes):
+    """Replace the attributes of obj by attributes."""
+    Attributes(obj).clear()
+    fill(obj, attributes)
+
+
+def fill(obj, attributes):
+    """Set attributes on obj, without marking it as changed."""
+    for name, value in attributes.items():
+        Compact.__setattr__(obj, name, value)
+
+
+def restore(cls, attributes):
+    """Return an instance of the compact variant of cls, or of cls if it
+    has none, holding attributes."""
+    obj = object.__new__(variants.get(cls, cls))
+    object.__setattr__(obj, "__dict__", attributes)
+    return obj
+
+
+def compact(cls, names):
+    """Return the compact variant of the model class cls, keeping the id,
+    the timestamps and the attributes declared in names in slots.
+
+    The variant subclasses cls under the same name, so instances keep
+    their class name, isinstance checks and class defaults. Attributes
+    that cls manages through a descriptor, such as the timestamps, keep
+    it and store their value in the slot. Each class has a single
+    variant, built on the first call.
+    """
+    if cls in variants:
+        return variants[cls]
+    members = tuple(dict.fromkeys(base + tuple(names)))
+    variant = type(cls.__name__, (cls, Compact), {
+        "__slots__": members + ("_extra",),
+        "__module__": cls.__module__,
+        "__qualname__": cls.__qualname__,
+        "__doc__": cls.__doc__,
+        "__dict__": property(get_attributes, set_attributes),
+        "_defaults": {name: getattr(cls, name) for name in names
+                      if name not in base}
+    })
+    variant._slots = {name: vars(variant)[name] for name in members}
+    for name in members:
+        if hasattr(getattr(cls, name, None), "__set__"):
+            delattr(variant, name)
+    variants[cls] = variant
+    return variant
@@ -0,0 +1,110 @@
+#!/usr/bin/python3
+"""Streaming compression codecs for the files saved by FileStorage.
+
+The codec used to write a file is picked by name or by the extension of
+the file, the one used to read it is picked from its first bytes.
+"""
+import gzip
+import io
+import lzma
+import os
+import zlib
+
+extensions = {".gz": "gzip", ".zz": "zlib", ".xz": "lzma"}
+signatures = {b"\x1f\x8b": "gzip", b"\xfd7zXZ\x00": "lzma",
+              b"\x78\x01": "zlib", b"\x78\x5e": "zlib",
+              b"\x78\x9c": "zlib", b"\x78\xda": "zlib"}
+
+
+class ZlibFile(io.RawIOBase):
+    """Representing a zlib stream read or written one chunk at a time.
+
+    Attributes:
+        __file (file): The underlying binary file.
+        __codec (object): The zlib compressor or decompressor.
+        __pending (bytes): Decompressed bytes not read yet.
+    """
+
+    def __init__(self, f, mode):
+        """Initialize a zlib stream over the binary file f."""
+        self.__file = f
+        self.__writing = "w" in mode
+        if self.__writing:
+            self.__codec = zlib.compressobj()
+        else:
+            self.__codec = zlib.decompressobj()
+        self.__pending = b""
+
+    def readable(self):
+        """Return True if the stream is read."""
+        return not self.__writing
+
+    def writable(self):
+        """Return True if the stream is written."""
+        return self.__writing
+
+    def readinto(self, b):
+        """Decompress into b and return the number of bytes written."""
+        while not self.__pending and not self.__codec.eof:
+            chunk = self.__codec.unconsumed_tail or self.__file.read(1 << 16)
+            if not chunk:
+                break
+            self.__pending = self.__codec.decompress(chunk, len(b))
+        size = min(len(b), len(self.__pending))
+        b[:size] = self.__pending[:size]
+        self.__pending = self.__pending[size:]
+        return size
+
+    def write(self, b):
+        """Compress b and return its length."""
+        self.__file.write(self.__codec.compress(b))
+        return len(b)
+
+    def close(self):
+        """Flush the stream and close the underlying file."""
+        if not self.closed:
+            if self.__writing:
+                self.__file.write(self.__codec.flush())
+            self.__file.close()
+        super().close()
+
+
+def codec_for(path):
+    """Return the name of the codec matching the extension of path."""
+    return extensions.get(os.path.splitext(path)[1])
+
+
+def detect(path):
+    """Return the name of the codec that compressed path, or None."""
+    with open(path, "rb") as f:
+        head = f.read(6)
+    for signature, codec in signatures.items():
+        if head.startswith(signature):
+            return codec
+    return None
+
+
+def open_file(path, mode, codec=None):
+    """Open path in binary mode through a streaming codec.
+
+    Args:
+        path (str): The name of the file.
+        mode (str): "rb" or "wb".
+        codec (str): "gzip", "zlib", "lzma" or None for no compression.
+            When reading, it is detected from the file if None.
+
+    Returns:
+        A buffered binary file.
+    """
+    if "r" in mode and codec is None:
+        codec = detect(path)
+    if codec == "gzip":
+        return gzip.open(path, mode)
+    if codec == "lzma":
+        return lzma.open(path, mode)
+    if codec == "zlib":
+        raw = ZlibFile(open(path, mode), mode)
+        if "r" in mode:
+            return io.BufferedReader(raw)
+        return io.BufferedWriter(raw)
+    return open(path, mode)
@@ -0,0 +1,472 @@
+#!/usr/bin/python3
+"""the DBStorage class."""
+import json
+import sqlite3
+import weakref
+from collections.abc import Mapping
+from contextlib import contextmanager
+from os import getenv
+from models.engine.aggregate import AggregateView
+from models.engine.cache import cache as serial_cache
+from models.engine.columnar import ColumnView
+from models.engine.decoder import decoders
+from models.engine.geo import GridIndex
+from models.engine.index import SortedIndex
+from models.engine.query import Query
+from models.engine.schema import aggregates, classes, columns, tables
+from models.engine.schema import texts
+from models.engine.text_index import TextIndex
+
+sql_types = {str: "TEXT", int: "INTEGER", float: "REAL", list: "TEXT"}
+
+
+class DBObjects(Mapping):
+    """Representing the objects of a DBStorage as a read-only dictionary.
+
+    Rows are only turned into instances when they are looked up, so the
+    console can show, update and count without loading the whole database.
+    """
+
+    def __init__(self, storage):
+        """Initialize a view over storage."""
+        self.__storage = storage
+
+    def __getitem__(self, key):
+        """Return the instance stored at key."""
+        obj = self.__storage.get(key)
+        if obj is None:
+            raise KeyError(key)
+        return obj
+
+    def __contains__(self, key):
+        """Return True if key is stored."""
+        return self.__storage.get(key) is not None
+
+    def __iter__(self):
+        """Iterate over every stored key."""
+        for key, obj in self.items():
+            yield key
+
+    def __len__(self):
+        """Return the number of stored objects."""
+        return self.__storage.count()
+
+    def items(self):
+        """Iterate over every (key, instance) pair, one table at a time."""
+        for class_name in classes:
+            for obj in self.__storage.query(class_name):
+                yield f"{class_name}.{obj.id}", obj
+
+    def keys(self):
+        """Iterate over every stored key."""
+        return iter(self)
+
+    def values(self):
+        """Iterate over every stored instance."""
+        for key, obj in self.items():
+            yield obj
+
+
+class DBStorage():
+    """Representing a SQLite storage engine with one table per class.
+
+    Attributes:
+        __path (str): The name of the SQLite database file.
+        __connection (sqlite3.Connection): The open database connection.
+        __objects (WeakValueDictionary): The instances already built from
+            rows, so a key always maps to the same instance.
+        __dirty (dict): The instances changed since the last save, or None
+            for the keys deleted since the last save.
+        __batched (dict): Inside a batch, __dirty as it was when the batch
+            began, None outside of a batch.
+        __undo (list): Inside a batch, the functions undoing the changes
+            made inside it, in the order they were made.
+        __kept (set): The ids of the instances whose attributes __undo
+            already restores.
+    """
+
+    def __init__(self):
+        """Initialize a new DBStorage on $HBNB_DB_PATH or hbnb.db."""
+        self.__path = getenv("HBNB_DB_PATH", "hbnb.db")
+        self.__connection = None
+        self.__objects = weakref.WeakValueDictionary()
+        self.__dirty = {}
+        self.__batched = None
+        self.__undo = []
+        self.__kept = set()
+
+    def all(self):
+        """Return a dictionary view of every stored object."""
+        return DBObjects(self)
+
+    def new(self, obj):
+        """Add obj to the objects written on the next save."""
+        key_name = f"{obj.__class__.__name__}.{obj.id}"
+        if self.__batched is not None:
+            self.__undo.append(self.__undo_set(key_name))
+        self.__objects[key_name] = obj
+        self.__dirty[key_name] = obj
+
+    def touch(self, obj, before=False):
+        """Mark obj as changed if it is stored, once the change is made
+        rather than before.
+
+        Inside a batch, the attributes of obj are kept on its first change
+        to undo the batch.
+        """
+        key_name = f"{obj.__class__.__name__}.{getattr(obj, 'id', None)}"
+        if self.__objects.get(key_name) is not obj:
+            return
+        if self.__batched is not None and id(obj) not in self.__kept:
+            self.__kept.add(id(obj))
+            self.__undo.append(self.__undo_attributes(obj))
+        if not before:
+            self.__dirty[key_name] = obj
+
+    def delete(self, obj=None):
+        """Delete obj from the database on the next save."""
+        if obj is not None:
+            key_name = f"{obj.__class__.__name__}.{obj.id}"
+            if self.__batched is not None:
+                self.__undo.append(self.__undo_set(key_name))
+            self.__objects.pop(key_name, None)
+            self.__dirty[key_name] = None
+
+    def get(self, key):
+        """Return the instance stored at key, or None."""
+        if key in self.__dirty:
+            return self.__dirty[key]
+        obj = self.__objects.get(key)
+        if obj is None:
+            class_name, _, obj_id = key.partition(".")
+            if class_name not in classes:
+                return None
+            cur = self.__connection.execute(
+                f"SELECT * FROM {class_name} WHERE id = ?", (obj_id,))
+            row = cur.fetchone()
+            if row is None:
+                return None
+            obj = self.__build(class_name, cur.description, row)
+        return obj
+
+    def query(self, class_name):
+        """Return a Query over the stored instances of class_name, planned
+        over the indexed *_id columns and the numeric columns."""
+        cols = columns(classes[class_name]) if class_name in classes else {}
+        return Query(class_name, {
+            "scan": self.__scan,
+            "lookup": lambda *args: iter(self.lookup(*args)),
+            "between": lambda *args: iter(self.between(*args)),
+            "count": self.count
+        }, hashed=[name for name, valtype in cols.items()
+                   if name.endswith("_id") and valtype is str],
+            ordered=[name for name, valtype in cols.items()
+                     if valtype in (int, float)])
+
+    def __scan(self, class_name):
+        """Iterate over every stored instance of class_name."""
+        if class_name not in classes:
+            return
+        pending = {key: obj for key, obj in self.__dirty.items()
+                   if key.partition(".")[0] == class_name}
+        cur = self.__connection.execute(f"SELECT * FROM {class_name}")
+        for row in cur:
+            key = f"{class_name}.{row[0]}"
+            if key in pending:
+                continue
+            obj = self.__objects.get(key)
+            yield obj or self.__build(class_name, cur.description, row)
+        for obj in pending.values():
+            if obj is not None:
+                yield obj
+
+    def lookup(self, class_name, name, value):
+        """Return the stored instances of class_name whose attribute name
+        equals value, through the column index when it has one."""
+        if class_name not in classes:
+            return []
+        if type(value) is not columns(classes[class_name]).get(name) \
+                or type(value) is list:
+            return [obj for obj in self.__scan(class_name)
+                    if getattr(obj, name, None) == value]
+        pending = {key: obj for key, obj in self.__dirty.items()
+                   if key.partition(".")[0] == class_name}
+        cur = self.__connection.execute(
+            f"SELECT * FROM {class_name} WHERE {name} = ?", (value,))
+        found = []
+        for row in cur:
+            key = f"{class_name}.{row[0]}"
+            if key not in pending:
+                obj = self.__objects.get(key)
+                found.append(obj or self.__build(class_name, cur.description,
+                                                 row))
+        found.extend(obj for obj in pending.values()
+                     if obj is not None and getattr(obj, name, None) == value)
+        return found
+
+    def between(self, class_name, name, low=None, high=None, reverse=False):
+        """Return the stored instances of class_name whose numeric attribute
+        name is between low and high included, ordered by that attribute."""
+        if class_name not in classes:
+            return []
+        if columns(classes[class_name]).get(name) not in (int, float):
+            candidates = self.__scan(class_name)
+        else:
+            pending = {key: obj for key, obj in self.__dirty.items()
+                       if key.partition(".")[0] == class_name}
+            where = [f"{name} IS NOT NULL"]
+            params = []
+            if low is not None:
+                where.append(f"{name} >= ?")
+                params.append(low)
+            if high is not None:
+                where.append(f"{name} <= ?")
+                params.append(high)
+            cur = self.__connection.execute(
+                f"SELECT * FROM {class_name} WHERE {' AND '.join(where)}",
+                params)
+            candidates = [self.__objects.get(f"{class_name}.{row[0]}")
+                          or self.__build(class_name, cur.description, row)
+                          for row in cur
+                          if f"{class_name}.{row[0]}" not in pending]
+            candidates.extend(obj for obj in pending.values()
+                              if obj is not None)
+        found = [obj for obj in candidates
+                 if SortedIndex.numeric(getattr(obj, name, None))
+                 and (low is None or getattr(obj, name) >= low)
+                 and (high is None or getattr(obj, name) <= high)]
+        found.sort(key=lambda obj: getattr(obj, name), reverse=reverse)
+        return found
+
+    def bbox(self, class_name, south, west, north, east):
+        """Return the stored instances of class_name located inside a box,
+        which crosses the antimeridian when west is greater than east."""
+        grid, found = self.__grid(class_name)
+        return [found[key] for key in grid.bbox(south, west, north, east)]
+
+    def radius(self, class_name, lat, lon, km):
+        """Return the stored instances of class_name at most km away from
+        a point, from the closest."""
+        grid, found = self.__grid(class_name)
+        return [found[key] for _, key in grid.radius(lat, lon, km)]
+
+    def nearest(self, class_name, lat, lon, k):
+        """Return the k stored instances of class_name closest to a point,
+        from the closest."""
+        grid, found = self.__grid(class_name)
+        return [found[key] for _, key in grid.nearest(lat, lon, k)]
+
+    def search(self, words, class_name=None, limit=None):
+        """Return the stored instances whose attributes declared in
+        schema.texts hold one of words, from the best BM25 score."""
+        found = {}
+        ranked = []
+        for name in [class_name] if class_name else list(texts):
+            if name in texts:
+                for obj in self.__scan(name):
+                    found[f"{name}.{obj.id}"] = obj
+                ranked.extend(TextIndex(
+                    (key, tuple(getattr(obj, attr, None)
+                                for attr in texts[name]))
+                    for key, obj in found.items()
+                    if key.partition(".")[0] == name).search(words, limit))
+        ranked.sort(key=lambda pair: (-pair[0], pair[1]))
+        return [found[key] for _, key in ranked[:limit]]
+
+    def columns(self, class_name):
+        """Return a ColumnView of the attributes of class_name declared in
+        schema.tables, read from the stored instances.
+
+        Raises:
+            ImportError: If numpy is not installed.
+        """
+        kinds = tables.get(class_name, {})
+        return ColumnView(kinds, ((f"{class_name}.{obj.id}",
+                                   tuple(getattr(obj, name, None)
+                                         for name in kinds))
+                                  for obj in self.__scan(class_name)))
+
+    def aggregate(self, name, group=None):
+        """Return the aggregate of the view name declared in
+        schema.aggregates for group, or the dictionary of every group and
+        its aggregate if group is None, read from the stored instances.
+
+        Raises:
+            KeyError: If name is not declared in schema.aggregates.
+        """
+        class_name, by, function, *attribute = aggregates[name]
+        view = AggregateView((f"{class_name}.{obj.id}",
+                              tuple(getattr(obj, each, None)
+                                    for each in (by, *attribute)))
+                             for obj in self.__scan(class_name))
+        if group is None:
+            return view.groups(function)
+        return view.get(function, group)
+
+    def count(self, class_name=None):
+        """Return the number of stored objects, of class_name if given."""
+        names = [class_name] if class_name else list(classes)
+        total = 0
+        for name in names:
+            if name not in classes:
+                continue
+            total += self.__connection.execute(
+                f"SELECT COUNT(*) FROM {name}").fetchone()[0]
+        for key, obj in self.__dirty.items():
+            name, _, obj_id = key.partition(".")
+            if name in names:
+                stored = self.__connection.execute(
+                    f"SELECT 1 FROM {name} WHERE id = ?",
+                    (obj_id,)).fetchone() is not None
+                total += (obj is not None) - stored
+        return total
+
+    def save(self):
+        """Write the objects changed since the last save to the database.
+
+        Inside a batch nothing is written until the batch ends.
+        """
+        if self.__batched is not None:
+            return
+        for key, obj in self.__dirty.items():
+            class_name, _, obj_id = key.partition(".")
+            if obj is None:
+                self.__connection.execute(
+                    f"DELETE FROM {class_name} WHERE id = ?", (obj_id,))
+            else:
+                self.__write(class_name, obj)
+        self.__connection.commit()
+        self.__dirty.clear()
+
+    @contextmanager
+    def batch(self):
+        """Group changes so they are saved by a single transaction.
+
+        The saves requested inside the with block are skipped and the
+        storage is saved once when the block ends. If an exception escapes
+        the block, the stored instances and their attributes are restored
+        to their state before the block, and so are the changes waiting
+        for the next save. Nested batches join the outer one.
+        """
+        if self.__batched is not None:
+            yield self
+            return
+        self.__batched = dict(self.__dirty)
+        try:
+            yield self
+        except BaseException:
+            for undo in reversed(self.__undo):
+                undo()
+            self.__dirty.clear()
+            self.__dirty.update(self.__batched)
+            self.__end_batch()
+            raise
+        self.__end_batch()
+        self.save()
+
+    def __end_batch(self):
+        """Forget the state kept to undo the batch."""
+        self.__batched = None
+        self.__undo.clear()
+        self.__kept.clear()
+
+    def __undo_set(self, key):
+        """Return a function putting back the instance stored at key."""
+        obj = self.__objects.get(key)
+
+        def undo():
+            """Restore the instance stored at key."""
+            if obj is None:
+                self.__objects.pop(key, None)
+            else:
+                self.__objects[key] = obj
+        return undo
+
+    @staticmethod
+    def __undo_attributes(obj):
+        """Return a function putting back the current attributes of obj."""
+        attributes = obj.__dict__.copy()
+
+        def undo():
+            """Restore the attributes of obj."""
+            obj.__dict__.clear()
+            obj.__dict__.update(attributes)
+            serial_cache.discard(obj)
+        return undo
+
+    transaction = batch
+
+    def flush(self):
+        """Do nothing, every save is written right away."""
+        pass
+
+    def compact(self, wait=True):
+        """Save, then rebuild the database file without its free pages."""
+        self.save()
+        self.__connection.execute("VACUUM")
+
+    def reload(self):
+        """Open the database and create the missing tables."""
+        if self.__connection is not None:
+            self.__connection.close()
+        self.__connection = sqlite3.connect(self.__path)
+        self.__objects.clear()
+        self.__dirty.clear()
+        for class_name, cls in classes.items():
+            cols = columns(cls)
+            definition = ", ".join(f"{name} {sql_types[valtype]}"
+                                   for name, valtype in cols.items())
+            self.__connection.execute(
+                f"CREATE TABLE IF NOT EXISTS {class_name} "
+                f"(id TEXT PRIMARY KEY, created_at TEXT, updated_at TEXT, "
+                f"{definition + ', ' if definition else ''}extra TEXT)")
+            for name in cols:
+                if name.endswith("_id"):
+                    self.__connection.execute(
+                        f"CREATE INDEX IF NOT EXISTS {class_name}_{name} "
+                        f"ON {class_name} ({name})")
+        self.__connection.commit()
+
+    def __write(self, class_name, obj):
+        """Insert or replace the row of obj."""
+        cols = columns(classes[class_name])
+        values = obj.to_dict()
+        del values["__class__"]
+        row = [values.pop("id"), values.pop("created_at"),
+               values.pop("updated_at")]
+        for name, valtype in cols.items():
+            value = values.get(name)
+            if type(value) is valtype:
+                del values[name]
+                row.append(json.dumps(value) if valtype is list else value)
+            else:
+                row.append(None)
+        row.append(json.dumps(values))
+        self.__connection.execute(
+            f"INSERT OR REPLACE INTO {class_name} "
+            f"VALUES ({', '.join('?' * len(row))})", row)
+
+    def __grid(self, class_name):
+        """Return a GridIndex of the instances of class_name located by
+        their latitude and longitude, and the dictionary of the instances."""
+        found = {f"{class_name}.{obj.id}": obj
+                 for obj in (self.__scan(class_name)
+                             if class_name in classes else ())}
+        return GridIndex((key, (getattr(obj, "latitude", None),
+                                getattr(obj, "longitude", None)))
+                         for key, obj in found.items()), found
+
+    def __build(self, class_name, description, row):
+        """Return the instance stored in a row of the class_name table."""
+        cols = columns(classes[class_name])
+        kwargs = {}
+        for (name, *_), value in zip(description, row):
+            if name == "extra":
+                kwargs.update(json.loads(value))
+            elif value is not None:
+                if cols.get(name) is list:
+                    value = json.loads(value)
+                kwargs[name] = value
+        obj = decoders[class_name](kwargs)
+        self.__objects[f"{class_name}.{obj.id}"] = obj
+        return obj
@@ -0,0 +1,61 @@
+#!/usr/bin/python3
+"""The decoders building the instances of the model classes from their
+to_dict() records."""
+from sys import intern
+from models.base_model import BaseModel, is_reference
+from models.engine.compact import Compact, fill
+from models.engine.schema import classes, columns
+
+
+def compile_decoder(cls, references=None):
+    """Return a function building an instance of cls from a to_dict()
+    record, like cls(**record) without its "__class__" key would.
+
+    The ids held by the attributes named in references, by default the id
+    and the declared foreign keys, are interned so that the objects
+    referencing the same one share its id string.
+
+    The instance is created without calling __init__ or __setattr__, so it
+    is neither registered in storage nor marked as changed, and keeps its
+    timestamps as saved until they are read. Records without both
+    timestamps as strings, and the classes that override __init__, are
+    built through __init__. Compact instances get their slots filled
+    instead of a __dict__.
+    """
+    def construct(record):
+        """Return the instance of cls described by record."""
+        kwargs = dict(record)
+        kwargs.pop("__class__", None)
+        return cls(**kwargs)
+
+    if cls.__init__ is not BaseModel.__init__:
+        return construct
+    new = object.__new__
+    set_dict = object.__setattr__
+    slotted = issubclass(cls, Compact)
+    if references is None:
+        references = ("id",) + tuple(name for name in columns(cls)
+                                     if is_reference(name))
+
+    def decode(record):
+        """Return the instance of cls described by record."""
+        attributes = record.copy()
+        attributes.pop("__class__", None)
+        if type(attributes.get("created_at")) is not str \
+                or type(attributes.get("updated_at")) is not str:
+            return construct(record)
+        for name in references:
+            value = attributes.get(name)
+            if type(value) is str:
+                attributes[name] = intern(value)
+        obj = new(cls)
+        if slotted:
+            fill(obj, attributes)
+        else:
+            set_dict(obj, "__dict__", attributes)
+        return obj
+    return decode
+
+
+decoders = {class_name: compile_decoder(cls)
+            for class_name, cls in classes.items()}
@@ -1,13 +1,118 @@
 #!/usr/bin/python3
 """the FileStorage class."""
+import atexit
+import io
 import json
-from models.base_model import BaseModel
-from models.user import User
-from models.state import State
-from models.city import City
-from models.amenity import Amenity
-from models.place import Place
-from models.review import Review
+import multiprocessing
+import os
+import threading
+import zlib
+from contextlib import contextmanager
+from functools import partial
+from os import getenv
+from models import base_model
+from models.engine import binary_format
+from models.engine import compression
+from models.engine.aggregate import AggregateView
+from models.engine.cache import cache as serial_cache
+from models.engine.columnar import ColumnView
+from models.engine.decoder import decoders
+from models.engine.geo import GridIndex
+from models.engine.index import AttributeIndex, ClassIndex, SortedIndex
+from models.engine.journal import Journal
+from models.engine.json_stream import iter_entries
+from models.engine.lazy import LazyObjects
+from models.engine.mapped import MappedFile, write_index
+from models.engine.query import Query
+from models.engine.schema import aggregates, declared, foreign_keys
+from models.engine.schema import locations, ranges, tables, texts
+from models.engine.text_index import TextIndex
+from models.engine.write_behind import WriteBehind
+
+
+def build(object_value):
+    """Return the instance described by a to_dict() dictionary, through
+    the decoder of its class."""
+    return decoders[object_value["__class__"]](object_value)
+
+
+def iter_records(path, stream_size=1 << 20, texts=False):
+    """Yield the (key, to_dict() record) entries stored in the file path.
+
+    Compressed and binary files are recognized by their first bytes. JSON
+    files larger than stream_size bytes are decoded one entry at a time.
+    If texts is True, (key, record, text) entries are yielded instead,
+    where text is the JSON the record was read from, or None.
+    """
+    with compression.open_file(path, "rb") as f:
+        if f.peek(len(binary_format.magic)).startswith(binary_format.magic):
+            for key, record in binary_format.load(f):
+                yield (key, record, None) if texts else (key, record)
+            return
+        text = io.TextIOWrapper(f, encoding="utf-8")
+        if texts:
+            yield from iter_entries(text, texts=True)
+        elif os.stat(path).st_size < stream_size:
+            yield from json.load(text).items()
+        else:
+            yield from iter_entries(text)
+
+
+def iter_shard(path, stream_size=1 << 20):
+    """Yield the (key, instance) pairs stored in the file path.
+
+    Large JSON files are decoded one entry at a time, so each instance is
+    built before the next entry is parsed.
+    """
+    for key, value in iter_records(path, stream_size):
+        yield key, build(value)
+
+
+def aggregated(class_name):
+    """Return the tuples of the group-by attribute and of the attribute
+    aggregated, if any, of the views of class_name declared in
+    schema.aggregates."""
+    names = ()
+    for view_class, by, _, *attribute in aggregates.values():
+        if view_class == class_name and (by, *attribute) not in names:
+            names += ((by, *attribute),)
+    return names
+
+
+def indexed(class_name):
+    """Return the attributes of class_name declared in schema.foreign_keys
+    or schema.ranges, and its tuples of attributes declared in
+    schema.locations, schema.texts, schema.tables or schema.aggregates."""
+    names = foreign_keys.get(class_name, ()) + ranges.get(class_name, ())
+    for tuples in (locations, texts):
+        if class_name in tuples:
+            names += (tuples[class_name],)
+    if class_name in tables:
+        names += (tuple(tables[class_name]),)
+    return names + aggregated(class_name)
+
+
+def send_records(paths, conn):
+    """Send the list of (key, to_dict() record) entries of each file of
+    paths through the Connection conn, then close it.
+
+    It runs in the processes forked to parse shards in parallel. Only
+    plain records are sent, the instances being built by the parent, so
+    nothing refers to the models package while it may still be imported.
+    """
+    try:
+        for path in paths:
+            conn.send(list(iter_records(path)))
+    finally:
+        conn.close()
+
+
+def processors():
+    """Return the number of processors this process may run on."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
 
 class FileStorage():
     """Representing an abstract storage engine.
@@ -15,33 +120,1049 @@ class FileStorage():
     Attributes:
         __file_path (str): The name of the file to save objects.
         __objects (dict): A dictionary of instantiated objects.
+        __journaled (bool): Append changed objects to a journal next to
+            __file_path on save instead of rewriting the whole file.
+        __shards (int): When set, save one JSON file per class, split in
+            that many partitions by key hash, in __file_path.shards.
+        __lazy (bool): Only parse the JSON files and build the objects
+            when their keys are looked up.
+        __binary (bool): Save in the compact binary format instead of
+            JSON. Both formats are read whatever this is set to.
+        __codec (str): The compression of the saved files, "gzip", "zlib"
+            or "lzma", found from the extension of __file_path if None.
+        __mapped (bool): Like __lazy, but read each record on its own from
+            the memory-mapped JSON file through an offset index saved next
+            to it.
+        __write_behind (float): When set, save() only asks a background
+            thread to write, and the requests made within that many seconds
+            are written at once.
+        __undo (list): Inside a batch, the functions undoing each change
+            made since the batch began, None outside of a batch.
+        __kept (set): The ids of the objects whose attributes were kept by
+            __undo.
+        __deferred (bool): A write was asked for inside a batch, so the
+            storage is saved when the batch ends, even if it is undone.
+        __dirty (set): The keys changed since the last save.
+        __fragments (dict): The keys of the saved instances mapped to the
+            instance, whether the encoding is binary, and its JSON or
+            binary encoding, until the key changes.
+        __compact_entries (int): In journaled mode, the number of records
+            appended to the journal that starts a compaction, 0 for never.
+        __compact_bytes (int): The size of the journal in bytes that starts
+            a compaction, 0 for never.
+        __journal_entries (int): The number of records in the journal.
+        __compactor (Thread): The thread writing the last snapshot.
+        __index (ClassIndex): The keys of __objects grouped by class name.
+        __indexed (dict): The __objects that __index was built from, so a
+            replaced dictionary is indexed again.
+        __indexed_classes (set): In lazy mode, the class names whose keys
+            were all added to __index, or None once every class was.
+        __attribute_indexes (dict): The AttributeIndex of the foreign keys,
+            the SortedIndex of the ranges, the GridIndex of the locations,
+            the TextIndex of the texts, the ColumnView of the tables and
+            the AggregateView of the aggregates looked up so far, keyed by
+            (class name, attribute name or names).
+        __attribute_base (ClassIndex): The __index the attribute indexes
+            were built along, so they are dropped when it is rebuilt.
+        __retouched (set): The keys of the objects with indexed attributes
+            changed since the attribute indexes were last refreshed.
+        __saved_texts (dict): The class names mapped to the TextIndex read
+            from the file saved next to __file_path, or None until that
+            file is read on the first search, and the set of keys changed
+            since, until the index is first used.
     """
     __file_path = "file.json"
     __objects = {}
+    __journaled = getenv("HBNB_FILE_JOURNAL") == "1"
+    __shards = int(getenv("HBNB_FILE_SHARDS", "0"))
+    __lazy = getenv("HBNB_FILE_LAZY") == "1"
+    __binary = getenv("HBNB_FILE_FORMAT") == "binary"
+    __codec = getenv("HBNB_FILE_CODEC")
+    __mapped = getenv("HBNB_FILE_MMAP") == "1"
+    __write_behind = float(getenv("HBNB_FILE_WRITE_BEHIND", "0"))
+    __flusher = None
+    __lock = threading.RLock()
+    __undo = None
+    __kept = set()
+    __deferred = False
+    __dirty = set()
+    __fragments = {}
+    __compact_entries = int(getenv("HBNB_JOURNAL_MAX_ENTRIES", "100000"))
+    __compact_bytes = int(getenv("HBNB_JOURNAL_MAX_BYTES", str(64 << 20)))
+    __journal_entries = 0
+    __compactor = None
+    __index = ClassIndex()
+    __indexed = None
+    __indexed_classes = None
+    __attribute_indexes = {}
+    __attribute_base = None
+    __retouched = set()
+    __saved_texts = {}
 
     def all(self):
         """Return the dictionary __objects."""
         return self.__objects
-    
+
     def new(self, obj):
         """Set in __objects obj with key <obj_class_name>.id"""
         key_name = f"{obj.__class__.__name__}.{obj.id}"
-        self.__objects[key_name] = obj
+        with self.__lock:
+            if self.__undo is not None:
+                self.__undo.append(self.__undo_set(key_name))
+            self.__set(key_name, obj)
+            self.__dirty.add(key_name)
+
+    def count(self, class_name=None):
+        """Return the number of stored objects, of class_name if given.
+
+        In lazy and mapped modes the keys are counted where they are kept
+        until the class index holds them, so only the shards of class_name
+        are parsed and a mapped file is counted from its offset index
+        without listing its keys.
+        """
+        with self.__lock:
+            objects = self.__objects
+            if isinstance(objects, LazyObjects) \
+                    and not self.__class_indexed(class_name):
+                return objects.count(class_name)
+            index = self.__class_index(class_name)
+            if class_name is None:
+                return len(index)
+            return index.count(class_name)
+
+    def query(self, class_name):
+        """Return a Query over the stored instances of class_name, planned
+        over the indexes declared in schema.foreign_keys and schema.ranges.
+        """
+        return Query(class_name, {"scan": self.__scan, "lookup": self.__find,
+                                  "between": self.__range,
+                                  "count": self.count},
+                     hashed=foreign_keys.get(class_name, ()) +
+                     ranges.get(class_name, ()),
+                     ordered=ranges.get(class_name, ()))
+
+    def lookup(self, class_name, name, value):
+        """Return the stored instances of class_name whose attribute name
+        equals value.
+
+        The attributes declared in schema.foreign_keys or schema.ranges
+        are found through an index, other attributes by scanning the class.
+        """
+        with self.__lock:
+            index = self.__attribute_index(class_name, name)
+            if index is None or isinstance(index, SortedIndex) \
+                    and not SortedIndex.numeric(value):
+                return [obj for obj in self.__scan(class_name)
+                        if getattr(obj, name, None) == value]
+            return list(self.__find(class_name, name, value))
+
+    def between(self, class_name, name, low=None, high=None, reverse=False):
+        """Return the stored instances of class_name whose numeric attribute
+        name is between low and high included, ordered by that attribute.
+
+        The attributes declared in schema.ranges are scanned through a
+        sorted index, the others by sorting the class.
+
+        Args:
+            class_name (str): The name of the class.
+            name (str): The name of the attribute.
+            low (number): The lowest value, or None for no bound.
+            high (number): The highest value, or None for no bound.
+            reverse (bool): Order by descending value.
+        """
+        return list(self.__range(class_name, name, low, high, reverse))
+
+    def bbox(self, class_name, south, west, north, east):
+        """Return the stored instances of class_name located inside a box,
+        which crosses the antimeridian when west is greater than east."""
+        with self.__lock:
+            return [self.__objects[key] for key in
+                    self.__grid(class_name).bbox(south, west, north, east)]
+
+    def radius(self, class_name, lat, lon, km):
+        """Return the stored instances of class_name at most km away from
+        a point, from the closest."""
+        with self.__lock:
+            return [self.__objects[key] for _, key in
+                    self.__grid(class_name).radius(lat, lon, km)]
+
+    def nearest(self, class_name, lat, lon, k):
+        """Return the k stored instances of class_name closest to a point,
+        from the closest."""
+        with self.__lock:
+            return [self.__objects[key] for _, key in
+                    self.__grid(class_name).nearest(lat, lon, k)]
+
+    def search(self, words, class_name=None, limit=None):
+        """Return the stored instances whose attributes declared in
+        schema.texts hold one of words, from the best BM25 score.
+
+        Args:
+            words (str): The words searched.
+            class_name (str): The class searched, or None for every class
+                declared in schema.texts.
+            limit (int): The number of instances returned, or None for all.
+        """
+        with self.__lock:
+            ranked = []
+            for name in [class_name] if class_name else list(texts):
+                if name in texts:
+                    index = self.__attribute_index(name, texts[name])
+                    ranked.extend(index.search(words, limit))
+            ranked.sort(key=lambda pair: (-pair[0], pair[1]))
+            return [self.__objects[key] for _, key in ranked[:limit]]
+
+    def columns(self, class_name):
+        """Return the ColumnView of the attributes of class_name declared
+        in schema.tables, for vectorized filters and aggregates.
+
+        It is built on first use, then kept in sync as instances are added
+        or deleted. Instances changed in place are updated the next time
+        it is asked for.
+
+        Raises:
+            ImportError: If numpy is not installed.
+        """
+        with self.__lock:
+            if class_name not in tables:
+                return ColumnView({})
+            return self.__attribute_index(class_name,
+                                          tuple(tables[class_name]))
+
+    def aggregate(self, name, group=None):
+        """Return the aggregate of the view name declared in
+        schema.aggregates for group, or the dictionary of every group and
+        its aggregate if group is None.
+
+        The view is built on first use, then updated as instances are
+        created, changed and deleted, so reading a group does not scan its
+        instances.
+
+        Raises:
+            KeyError: If name is not declared in schema.aggregates.
+        """
+        class_name, by, function, *attribute = aggregates[name]
+        with self.__lock:
+            view = self.__attribute_index(class_name, (by, *attribute))
+            if group is None:
+                return view.groups(function)
+            return view.get(function, group)
+
+    def touch(self, obj, before=False):
+        """Mark obj as changed if it is stored in __objects.
+
+        Args:
+            obj: The instance being changed.
+            before (bool): The change is about to be made, so only keep
+                the attributes of obj for a batch to undo it. It is marked
+                as changed once made, so a write landing in between cannot
+                clear the mark before the change.
+        """
+        key_name = f"{obj.__class__.__name__}.{getattr(obj, 'id', None)}"
+        if dict.get(self.__objects, key_name) is obj:
+            with self.__lock:
+                if self.__undo is not None and id(obj) not in self.__kept:
+                    self.__kept.add(id(obj))
+                    self.__undo.append(self.__undo_attributes(obj))
+                if before:
+                    return
+                self.__dirty.add(key_name)
+                if indexed(obj.__class__.__name__):
+                    self.__retouched.add(key_name)
+
+    def delete(self, obj=None):
+        """Delete obj from __objects if it's inside."""
+        if obj is not None:
+            key_name = f"{obj.__class__.__name__}.{obj.id}"
+            with self.__lock:
+                if self.__undo is not None:
+                    self.__undo.append(self.__undo_set(key_name))
+                if self.__pop(key_name) is not None:
+                    self.__dirty.add(key_name)
 
     def save(self):
-        """Serialize __objects to the JSON file __file_path."""
-        with open(self.__file_path, 'w') as f:
-            dic = {key : value.to_dict() for key, value in self.__objects.items()}
-            json.dump(dic, f)
-    
+        """Serialize __objects to the JSON file __file_path.
+
+        In write-behind mode the write is left to a background thread,
+        which coalesces the saves requested close together. Inside a batch
+        nothing is written until the batch ends.
+        """
+        if self.__undo is not None:
+            return
+        if self.__write_behind:
+            if self.__flusher is None:
+                FileStorage.__flusher = WriteBehind(self.__commit,
+                                                    self.__write_behind)
+                atexit.register(self.flush)
+            self.__flusher.request()
+        else:
+            self.__commit()
+
+    @contextmanager
+    def batch(self):
+        """Group changes so they are saved by a single write.
+
+        The saves requested inside the with block are skipped and the
+        storage is saved once when the block ends. If an exception escapes
+        the block, __objects and the changed objects are restored to their
+        state before the block and stay marked as changed, so the restored
+        state is what the next save writes. Nested batches join the outer
+        one.
+        """
+        if self.__undo is not None:
+            yield self
+            return
+        with self.__lock:
+            FileStorage.__undo = []
+        try:
+            yield self
+        except BaseException:
+            with self.__lock:
+                for undo in reversed(self.__undo):
+                    undo()
+                FileStorage.__undo = None
+                FileStorage.__attribute_base = None
+                self.__kept.clear()
+                deferred = self.__deferred
+                FileStorage.__deferred = False
+            if deferred:
+                self.save()
+            raise
+        with self.__lock:
+            FileStorage.__undo = None
+            FileStorage.__deferred = False
+            self.__kept.clear()
+        self.save()
+
+    transaction = batch
+
+    def flush(self):
+        """Write the save requested in write-behind mode now, and wait for
+        the running compaction."""
+        if self.__flusher is not None:
+            self.__flusher.flush()
+        compactor = self.__compactor
+        if compactor is not None:
+            compactor.join()
+
+    def compact(self, wait=True):
+        """Write a snapshot of __objects and empty the journal.
+
+        In journaled mode the journal is moved aside and the snapshot is
+        written by a background thread while new saves go to a fresh
+        journal, so the moved records are replayed until the snapshot is
+        done. Otherwise the storage is rewritten at once. Nothing is done
+        inside a batch, and a compaction already running is joined.
+
+        Args:
+            wait (bool): Return only once the snapshot is written.
+        """
+        if self.__undo is not None:
+            return
+        with self.__lock:
+            compactor = self.__compactor
+            if compactor is None or not compactor.is_alive():
+                journal = self.__journal()
+                journal.rotate()
+                FileStorage.__journal_entries = 0
+                documents = self.__text_documents()
+                if not self.__journaled:
+                    self.__snapshot(self.__entries(self.__objects))
+                    self.__save_texts(documents)
+                    journal.drop_old()
+                    return
+                entries = list(self.__entries(self.__objects))
+                compactor = threading.Thread(target=self.__compact,
+                                             args=(entries, documents,
+                                                   journal),
+                                             daemon=True)
+                FileStorage.__compactor = compactor
+                compactor.start()
+        if wait:
+            compactor.join()
+
+    def __compact(self, entries, documents, journal):
+        """Write the snapshot entries and the text documents, then drop the
+        records the snapshot holds."""
+        self.__snapshot(entries, cache=False)
+        self.__save_texts(documents)
+        journal.drop_old()
+
+    def __commit(self):
+        """Write __objects to disk.
+
+        Only the objects changed since the last save are encoded again,
+        the others reuse their encoding kept in __fragments. With __shards
+        set only the shards holding a changed key are rewritten, and in
+        journaled mode the changed keys are appended to the journal
+        instead. When files are rewritten, the changed keys are logged next
+        to the saved text index, so it still matches them. Inside a batch,
+        such as when the write-behind thread fires, the write is left until
+        the batch ends.
+        """
+        with self.__lock:
+            if self.__undo is not None:
+                FileStorage.__deferred = True
+                return
+            for key in self.__dirty:
+                serial_cache.discard(dict.get(self.__objects, key))
+                self.__fragments.pop(key, None)
+            if self.__journaled:
+                records = [(key,
+                            base_model.record(dict.get(self.__objects, key))
+                            if dict.__contains__(self.__objects, key)
+                            else None) for key in self.__dirty]
+                journal = self.__journal()
+                journal.append(records)
+                FileStorage.__journal_entries += len(records)
+                self.__dirty.clear()
+                if 0 < self.__compact_entries <= self.__journal_entries \
+                        or 0 < self.__compact_bytes <= journal.size():
+                    self.compact(wait=False)
+                return
+            before = self.__signature()
+            if self.__shards:
+                self.__save_shards()
+                self.__remove(self.__file_path)
+            else:
+                self.__snapshot(self.__entries(self.__objects))
+            self.__log_texts(before, self.__dirty)
+            self.__journal().truncate()
+            self.__dirty.clear()
+
     def reload(self):
-        """Deserialize the JSON file __file_path to __objects, if it exists."""
+        """Deserialize the JSON file __file_path to __objects, if it exists,
+        then replay its journal on top of it.
+
+        Shards are read instead of __file_path when they are the current
+        layout, parsed by several processes. In lazy mode the files are
+        only registered along the class of their keys, to be parsed when
+        one of their keys or classes is looked up, and in mapped mode they
+        are memory-mapped along their index. The text indexes saved along
+        the files are only read on the first search, if they still match
+        them.
+        """
+        with self.__lock:
+            shard_dir = self.__file_path + ".shards"
+            names = self.__shard_names()
+            if not names or (not self.__shards
+                             and os.path.exists(self.__file_path)):
+                paths = {self.__file_path: self.__file_path}
+                locate = None
+                classes = {}
+            else:
+                paths = {name: os.path.join(shard_dir, name) for name in names}
+                locate = self.__shard if all(map(self.__valid_shard, names)) \
+                    else None
+                classes = {name: name.partition(".")[0] for name in names}
+            if self.__lazy or self.__mapped:
+                lazy = LazyObjects(dict.items(self.__objects), build,
+                                   locate or (lambda key: None),
+                                   partial(iter_records, texts=True))
+                for name, path in paths.items():
+                    mapped = self.__map(path) if self.__mapped else None
+                    if mapped is not None:
+                        lazy.add_mapped(name, mapped, classes.get(name))
+                    else:
+                        lazy.add_source(name, path, classes.get(name))
+                FileStorage.__objects = lazy
+            else:
+                self.__load(list(paths.values()))
+            FileStorage.__saved_texts = {
+                class_name: (None, set()) for class_name in texts
+            } if os.path.exists(self.__file_path + ".text") else {}
+            self.__fragments.clear()
+            FileStorage.__journal_entries = 0
+            for key, object_value in self.__journal().replay():
+                FileStorage.__journal_entries += 1
+                saved = self.__saved_texts.get(key.partition(".")[0])
+                if saved is not None:
+                    saved[1].add(key)
+                if isinstance(self.__objects, LazyObjects):
+                    if object_value is None:
+                        self.__objects.discard(key)
+                    else:
+                        self.__objects.add_record(key, object_value)
+                elif object_value is None:
+                    self.__pop(key)
+                else:
+                    self.__set(key, build(object_value))
+
+    def __undo_set(self, key):
+        """Return a function putting back the current object of key."""
+        obj = dict.get(self.__objects, key)
+        if obj is None:
+            return lambda: self.__pop(key)
+        return lambda: self.__set(key, obj)
+
+    def __set(self, key, obj):
+        """Store obj at key in __objects and in its indexes."""
+        self.__objects[key] = obj
+        self.__saved_stale(key)
+        if self.__indexed is self.__objects:
+            self.__index.add(key, obj)
+            if self.__attribute_base is self.__index:
+                class_name = key.partition(".")[0]
+                for name in indexed(class_name):
+                    index = self.__attribute_indexes.get((class_name, name))
+                    if index is not None:
+                        index.add(key, self.__attribute(key, name))
+
+    def __pop(self, key):
+        """Remove key from __objects and from its indexes, and return its
+        instance, or None if it was not stored."""
+        obj = self.__objects.pop(key, None)
+        self.__saved_stale(key)
+        if self.__indexed is self.__objects:
+            self.__index.remove(key)
+            if self.__attribute_base is self.__index:
+                class_name = key.partition(".")[0]
+                for name in indexed(class_name):
+                    index = self.__attribute_indexes.get((class_name, name))
+                    if index is not None:
+                        index.remove(key)
+        return obj
+
+    def __resolve(self, keys):
+        """Yield the instances stored at keys, skipping the ones deleted
+        since, so lazy mode only builds the instances read."""
+        for key in keys:
+            obj = self.__objects.get(key)
+            if obj is not None:
+                yield obj
+
+    def __scan(self, class_name):
+        """Return an iterator over the stored instances of class_name."""
+        with self.__lock:
+            index = self.__class_index(class_name)
+            keys = [f"{class_name}.{obj_id}"
+                    for obj_id in index.ids(class_name)]
+        return self.__resolve(keys)
+
+    def __find(self, class_name, name, value):
+        """Return an iterator over the stored instances of class_name whose
+        indexed attribute name equals value."""
+        with self.__lock:
+            keys = self.__attribute_index(class_name, name).get(value)
+        return self.__resolve(keys)
+
+    def __range(self, class_name, name, low, high, reverse):
+        """Return an iterator over the stored instances of class_name whose
+        numeric attribute name is between low and high, in order."""
+        with self.__lock:
+            index = self.__attribute_index(class_name, name)
+            if not isinstance(index, SortedIndex):
+                index = SortedIndex((f"{class_name}.{obj.id}",
+                                     getattr(obj, name, None))
+                                    for obj in self.__scan(class_name))
+            keys = index.range(low, high, reverse)
+        return self.__resolve(keys)
+
+    def __saved_stale(self, key):
+        """Mark key as changed in the saved TextIndex of its class."""
+        saved = self.__saved_texts.get(key.partition(".")[0])
+        if saved is not None:
+            saved[1].add(key)
+
+    def __class_index(self, class_name=None):
+        """Return the ClassIndex of __objects, holding every key of
+        class_name if given, or every key.
+
+        It is built again when __objects was replaced, or when keys were
+        added or removed without going through the storage. In lazy mode
+        it is built from the keys, without building the instances, one
+        class at a time, so only the sources holding class_name are parsed.
+        """
+        objects = self.__objects
+        if not isinstance(objects, LazyObjects):
+            if objects is not self.__indexed \
+                    or dict.__len__(objects) != len(self.__index):
+                FileStorage.__index = ClassIndex(dict.items(objects))
+                FileStorage.__indexed = objects
+            return self.__index
+        if objects is not self.__indexed:
+            FileStorage.__index = ClassIndex()
+            FileStorage.__indexed = objects
+            FileStorage.__indexed_classes = set()
+        if not self.__class_indexed(class_name):
+            for key in objects.keys(class_name):
+                self.__index.add(key, dict.get(objects, key))
+            if class_name is None:
+                FileStorage.__indexed_classes = None
+            else:
+                self.__indexed_classes.add(class_name)
+        return self.__index
+
+    def __class_indexed(self, class_name=None):
+        """Return True if __index holds every key of class_name, or every
+        key if class_name is None."""
+        if self.__objects is not self.__indexed:
+            return False
+        return self.__indexed_classes is None \
+            or class_name in self.__indexed_classes
+
+    def __attribute_index(self, class_name, name):
+        """Return the AttributeIndex of the foreign key name of class_name,
+        its SortedIndex if it is a range, its GridIndex if it is a location,
+        its TextIndex if it is a text, its ColumnView if it is a table, its
+        AggregateView if it is aggregated, or None if it is not declared in
+        schema.
+
+        The index is built on first use, from the saved TextIndex for a
+        text, and the keys touched since the last lookup are indexed again
+        under their current value.
+        """
+        if name in foreign_keys.get(class_name, ()):
+            factory = AttributeIndex
+        elif name in ranges.get(class_name, ()):
+            factory = SortedIndex
+        elif name == locations.get(class_name):
+            factory = GridIndex
+        elif name == texts.get(class_name):
+            factory = TextIndex
+        elif class_name in tables and name == tuple(tables[class_name]):
+            factory = partial(ColumnView, tables[class_name])
+        elif name in aggregated(class_name):
+            factory = AggregateView
+        else:
+            return None
+        classes = self.__class_index(class_name)
+        indexes = self.__attribute_indexes
+        if self.__attribute_base is not classes:
+            indexes.clear()
+            FileStorage.__attribute_base = classes
+        for key in self.__retouched:
+            key_class, _, obj_id = key.partition(".")
+            self.__saved_stale(key)
+            for key_name in indexed(key_class):
+                index = indexes.get((key_class, key_name))
+                if index is None:
+                    continue
+                if obj_id in classes.ids(key_class):
+                    index.add(key, self.__attribute(key, key_name))
+                else:
+                    index.remove(key)
+        self.__retouched.clear()
+        saved = self.__saved_text(class_name) if factory is TextIndex \
+            else None
+        if saved is not None and (class_name, name) not in indexes:
+            index, stale = saved
+            ids = classes.ids(class_name)
+            documents = index.documents()
+            for key in documents:
+                if key.partition(".")[2] not in ids:
+                    index.remove(key)
+            for obj_id in ids:
+                key = f"{class_name}.{obj_id}"
+                if key in stale or key not in documents:
+                    index.add(key, self.__attribute(key, name))
+            indexes[(class_name, name)] = index
+        if (class_name, name) not in indexes:
+            indexes[(class_name, name)] = factory(
+                (f"{class_name}.{obj_id}",
+                 self.__attribute(f"{class_name}.{obj_id}", name))
+                for obj_id in classes.ids(class_name))
+        return indexes[(class_name, name)]
+
+    def __text_documents(self):
+        """Return the class names mapped to a copy of the words of their
+        TextIndex, for the ones built or read so far."""
+        documents = {}
+        for class_name, name in texts.items():
+            if (class_name, name) in self.__attribute_indexes \
+                    or class_name in self.__saved_texts:
+                index = self.__attribute_index(class_name, name)
+                documents[class_name] = index.documents()
+        return documents
+
+    def __save_texts(self, documents):
+        """Write the words of the TextIndex of each class next to
+        __file_path, along the sizes and times of the saved files, and
+        empty the log of the keys changed since."""
+        path = self.__file_path + ".text"
+        self.__text_journal().truncate()
+        if not documents:
+            if os.path.exists(path):
+                os.remove(path)
+            return
+        with open(path + ".tmp", "w") as f:
+            json.dump({"signature": self.__signature(),
+                       "documents": documents}, f)
+        os.replace(path + ".tmp", path)
+
+    def __log_texts(self, before, keys):
+        """Keep the saved text index matching the files just rewritten.
+
+        The keys changed are appended to the text journal, along the
+        signature of the saved files before and after the write, so only
+        those are indexed again when it is read. The whole index is
+        written instead when none is saved yet but one was built, or when
+        the text journal grew larger than it.
+        """
+        path = self.__file_path + ".text"
+        journal = self.__text_journal()
         try:
-            with open(self.__file_path, "r") as f:
-                obj_dict = json.load(f)
-                for object_value in obj_dict.values():
-                    class_name = object_value["__class__"]
-                    del object_value["__class__"]
-                    self.new(eval(f"{class_name}")(**object_value))
+            size = os.path.getsize(path)
         except FileNotFoundError:
-            pass
+            size = None
+        if size is None or journal.size() > size:
+            documents = self.__text_documents()
+            if documents or size is not None:
+                self.__save_texts(documents)
+            return
+        journal.append([(key, None) for key in keys
+                        if key.partition(".")[0] in texts] +
+                       [("signature", [before, self.__signature()])])
+
+    def __load_texts(self):
+        """Return the class names mapped to their saved TextIndex and the
+        set of keys logged as changed since, or an empty dictionary if the
+        saved files changed otherwise."""
+        try:
+            with open(self.__file_path + ".text", "r") as f:
+                saved = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+        signature = saved.get("signature")
+        changed = set()
+        for key, value in self.__text_journal().replay():
+            if key != "signature":
+                changed.add(key)
+            elif value[0] != signature:
+                return {}
+            else:
+                signature = value[1]
+        if signature != self.__signature():
+            return {}
+        return {class_name: (TextIndex.restore(documents),
+                             {key for key in changed
+                              if key.partition(".")[0] == class_name})
+                for class_name, documents in saved["documents"].items()}
+
+    def __saved_text(self, class_name):
+        """Remove and return the saved TextIndex of class_name and the set
+        of keys changed since, or None, reading the saved file if it was
+        not read yet."""
+        saved = self.__saved_texts.pop(class_name, None)
+        if saved is None or saved[0] is not None:
+            return saved
+        loaded = self.__load_texts()
+        for name, (index, stale) in list(self.__saved_texts.items()):
+            if index is None:
+                if name in loaded:
+                    self.__saved_texts[name] = (loaded[name][0],
+                                                stale | loaded[name][1])
+                else:
+                    del self.__saved_texts[name]
+        if class_name not in loaded:
+            return None
+        return loaded[class_name][0], saved[1] | loaded[class_name][1]
+
+    def __text_journal(self):
+        """Return the log of the keys changed since the text index was
+        saved next to __file_path."""
+        return Journal(self.__file_path + ".text.journal")
+
+    def __signature(self):
+        """Return the names, sizes and modification times of the saved
+        files."""
+        shard_dir = self.__file_path + ".shards"
+        paths = [self.__file_path] + [os.path.join(shard_dir, name) for name
+                                      in sorted(self.__shard_names())]
+        signature = []
+        for path in paths:
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            signature.append([path, stat.st_size, stat.st_mtime_ns])
+        return signature
+
+    def __grid(self, class_name):
+        """Return the GridIndex of the locations of class_name, built from
+        a scan if they are not declared in schema.locations."""
+        if class_name in locations:
+            return self.__attribute_index(class_name, locations[class_name])
+        return GridIndex((f"{class_name}.{obj.id}",
+                          (getattr(obj, "latitude", None),
+                           getattr(obj, "longitude", None)))
+                         for obj in self.__scan(class_name))
+
+    def __attribute(self, key, name):
+        """Return the attribute name of the object stored at key, read from
+        its raw record if lazy mode has not built it yet. A tuple of names
+        returns the tuple of their values."""
+        if isinstance(name, tuple):
+            return tuple(self.__attribute(key, each) for each in name)
+        obj = dict.get(self.__objects, key)
+        if obj is None and isinstance(self.__objects, LazyObjects):
+            text = self.__objects.text(key)
+            obj = json.loads(text) if text is not None \
+                else self.__objects.peek(key)
+        if isinstance(obj, dict):
+            cls = declared[obj["__class__"]]
+            return obj.get(name, getattr(cls, name, None))
+        return getattr(obj, name, None)
+
+    @staticmethod
+    def __undo_attributes(obj):
+        """Return a function putting back the current attributes of obj."""
+        attributes = obj.__dict__.copy()
+
+        def undo():
+            """Restore the attributes of obj."""
+            obj.__dict__.clear()
+            obj.__dict__.update(attributes)
+            serial_cache.discard(obj)
+        return undo
+
+    @staticmethod
+    def __map(path):
+        """Return the MappedFile of path, or None if it has no valid index."""
+        try:
+            return MappedFile(path)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def __load(self, paths):
+        """Build the objects of the JSON files paths and add them to
+        __objects.
+
+        The files are parsed by __parse(), and the instances built as their
+        records arrive. The indexes of __objects are then built again on
+        their next use.
+        """
+        paths = [path for path in paths if os.path.exists(path)]
+        objects = self.__objects
+        for records in self.__parse(paths):
+            if type(objects) is dict:
+                objects.update((key, build(record))
+                               for key, record in records)
+            else:
+                for key, record in records:
+                    objects[key] = build(record)
+        FileStorage.__indexed = None
+
+    @staticmethod
+    def __parse(paths):
+        """Yield the (key, to_dict() record) entries of each file of paths.
+
+        With several files and processors, and where processes can be
+        forked, the files are parsed by forked processes running
+        send_records(), while the caller builds the records already
+        received. A file whose process failed is parsed again here.
+        """
+        workers = min(len(paths), processors())
+        if workers < 2 \
+                or "fork" not in multiprocessing.get_all_start_methods():
+            for path in paths:
+                yield iter_records(path)
+            return
+        context = multiprocessing.get_context("fork")
+        readers = []
+        received = False
+        try:
+            for i in range(workers):
+                receiver, sender = context.Pipe(duplex=False)
+                process = context.Process(target=send_records,
+                                          args=(paths[i::workers], sender),
+                                          daemon=True)
+                process.start()
+                sender.close()
+                readers.append((process, receiver, paths[i::workers]))
+            for process, receiver, group in readers:
+                for path in group:
+                    try:
+                        records = receiver.recv()
+                    except EOFError:
+                        records = iter_records(path)
+                    yield records
+            received = True
+        finally:
+            for process, receiver, group in readers:
+                receiver.close()
+                if not received:
+                    process.terminate()
+                process.join()
+
+    def __snapshot(self, entries, cache=True):
+        """Write the (key, value) entries as the whole storage, in the
+        current layout, and remove the files of the other layout."""
+        shard_dir = self.__file_path + ".shards"
+        if not self.__shards:
+            self.__write(self.__file_path, entries, cache)
+            for name in self.__shard_names():
+                self.__remove(os.path.join(shard_dir, name))
+            return
+        groups = {}
+        for key, value in entries:
+            groups.setdefault(self.__shard(key), []).append((key, value))
+        os.makedirs(shard_dir, exist_ok=True)
+        for name, group in groups.items():
+            self.__write(os.path.join(shard_dir, name), group, cache)
+        for name in set(self.__shard_names()) - set(groups):
+            self.__remove(os.path.join(shard_dir, name))
+        self.__remove(self.__file_path)
+
+    def __write(self, path, entries, cache=True, chunk_size=1 << 16):
+        """Write the (key, value) entries returned by __entries() to the
+        file path.
+
+        The file is replaced at once, so a memory-mapped copy stays valid,
+        and in mapped mode the offset index of an uncompressed JSON file is
+        written next to it. The encodings are only kept in __fragments if
+        cache is True, and they are handed to the file, or to its codec,
+        about chunk_size bytes at a time rather than joined in a single
+        document.
+        """
+        codec = self.__codec or compression.codec_for(self.__file_path)
+        with compression.open_file(path + ".tmp", 'wb', codec) as f:
+            if self.__binary:
+                binary_format.dump(((key, self.__packed(key, value, cache))
+                                    for key, value in entries), f)
+            else:
+                parts = [b"{"]
+                index = []
+                offset = written = 1
+                for key, value in entries:
+                    prefix = f"{',' if index else ''}\n{json.dumps(key)}: "
+                    fragment = self.__fragment(key, value, cache)
+                    offset += len(prefix)
+                    index.append((key, offset, len(fragment)))
+                    offset += len(fragment)
+                    parts += [prefix.encode(), fragment]
+                    if offset - written >= chunk_size:
+                        f.write(b"".join(parts))
+                        parts = []
+                        written = offset
+                parts.append(b"\n}")
+                f.write(b"".join(parts))
+        os.replace(path + ".tmp", path)
+        if self.__mapped and not self.__binary and codec is None:
+            write_index(path, index)
+
+    def __entries(self, keys):
+        """Yield the (key, value) pairs of keys, where value is the stored
+        instance, the JSON text still in a mapped file or that a record not
+        built yet by lazy mode was read from, or that raw record.
+
+        The values are read as they are written, so a mapped file is not
+        copied to memory whole.
+        """
+        for key in list(keys):
+            if isinstance(self.__objects, LazyObjects):
+                value = self.__objects.text(key)
+                if value is None:
+                    value = self.__objects.saved(key)
+                if value is None:
+                    value = self.__objects.peek(key)
+            else:
+                value = self.__objects[key]
+            yield key, value
+
+    def __packed(self, key, value, cache=True):
+        """Return the to_dict() record of a value returned by __entries()
+        for key, or the binary encoding of an instance."""
+        if isinstance(value, str):
+            return json.loads(value)
+        if isinstance(value, dict):
+            return value
+        return self.__encoded(key, value, True, cache)
+
+    @staticmethod
+    def __remove(path):
+        """Remove the JSON file path and its index, if they exist."""
+        for name in (path, path + ".idx"):
+            if os.path.exists(name):
+                os.remove(name)
+
+    def __shard(self, key):
+        """Return the name of the shard file holding key."""
+        class_name = key.partition(".")[0]
+        if self.__shards > 1:
+            part = zlib.crc32(key.encode()) % self.__shards
+            return f"{class_name}.{part}.json"
+        return f"{class_name}.json"
+
+    def __shard_names(self):
+        """Return the names of the shard files on disk."""
+        try:
+            return [name for name in os.listdir(self.__file_path + ".shards")
+                    if name.endswith(".json")]
+        except FileNotFoundError:
+            return []
+
+    def __valid_shard(self, name):
+        """Return True if the shard file name fits the current partitions."""
+        parts = name.split(".")
+        if self.__shards > 1:
+            return (len(parts) == 3 and parts[1].isdigit()
+                    and int(parts[1]) < self.__shards)
+        return len(parts) == 2
+
+    def __save_shards(self):
+        """Rewrite the shards holding a key changed since the last save.
+
+        Every shard is rewritten when the files on disk were saved with
+        other partitions, and shards without any stored object are removed.
+        """
+        shard_dir = self.__file_path + ".shards"
+        on_disk = set(self.__shard_names())
+        stale = None
+        if on_disk and all(map(self.__valid_shard, on_disk)):
+            stale = {self.__shard(key) for key in self.__dirty}
+        keys = self.__objects
+        if isinstance(keys, LazyObjects):
+            for name in stale if stale is not None else [None]:
+                keys.load(name)
+            keys = keys.loaded()
+        groups = {}
+        for key in keys:
+            name = self.__shard(key)
+            if stale is None or name in stale:
+                groups.setdefault(name, []).append(key)
+        os.makedirs(shard_dir, exist_ok=True)
+        for name, keys in groups.items():
+            self.__write(os.path.join(shard_dir, name), self.__entries(keys))
+        for name in on_disk - set(groups):
+            if stale is None or name in stale:
+                self.__remove(os.path.join(shard_dir, name))
+
+    def __fragment(self, key, value, cache=True):
+        """Return the JSON encoding, in bytes, of a value returned by
+        __entries() for key.
+
+        The JSON texts of the records still in a mapped file or not built
+        yet by lazy mode are copied as they are, and raw records read
+        without their text are encoded again.
+        """
+        if isinstance(value, str):
+            return value.encode()
+        if isinstance(value, dict):
+            return json.dumps(value).encode()
+        return self.__encoded(key, value, False, cache)
+
+    def __encoded(self, key, obj, binary, cache):
+        """Return the binary or JSON encoding of the instance obj stored at
+        key.
+
+        It is kept in __fragments until key changes if cache is True, so
+        a save only encodes the changed instances, whatever their number.
+        The dictionary of obj is built without going through the cache of
+        its serialized forms, which every save would sweep.
+        """
+        kept = self.__fragments.get(key)
+        if kept is not None and kept[0] is obj and kept[1] == binary:
+            return kept[2]
+        record = base_model.record(obj)
+        if binary:
+            encoded = binary_format.packer(obj.__class__.__name__)(record)
+        else:
+            encoded = json.dumps(record).encode()
+        if cache:
+            self.__fragments[key] = (obj, binary, encoded)
+        return encoded
+
+    def __journal(self):
+        """Return the journal kept next to __file_path."""
+        return Journal(self.__file_path + ".journal")
@@ -0,0 +1,169 @@
+#!/usr/bin/python3
+"""the GridIndex class and the great-circle distance it is queried by."""
+from math import asin, cos, degrees, floor, isfinite, radians, sin, sqrt
+
+earth_radius = 6371.0088
+
+
+def distance(lat1, lon1, lat2, lon2):
+    """Return the great-circle distance in km between two points."""
+    phi1 = radians(lat1)
+    phi2 = radians(lat2)
+    a = sin((phi2 - phi1) / 2) ** 2 + \
+        cos(phi1) * cos(phi2) * sin(radians(lon2 - lon1) / 2) ** 2
+    return 2 * earth_radius * asin(min(1.0, sqrt(a)))
+
+
+def located(point):
+    """Return True if point is a valid (latitude, longitude) pair."""
+    if not isinstance(point, tuple) or len(point) != 2:
+        return False
+    lat, lon = point
+    return (type(lat) in (int, float) and type(lon) in (int, float)
+            and isfinite(lat) and isfinite(lon) and -90 <= lat <= 90)
+
+
+class GridIndex():
+    """Representing keys located by latitude and longitude.
+
+    The globe is cut in square cells of cell_size degrees, and each key is
+    stored in the cell holding its point, so a query only reads the cells
+    it overlaps.
+
+    Attributes:
+        __size (float): The side of a cell in degrees.
+        __columns (int): The number of cells around a parallel.
+        __cells (dict): The (row, column) of the cells mapped to
+            dictionaries of their keys and points.
+        __points (dict): The keys mapped to their (latitude, longitude).
+    """
+
+    def __init__(self, points=(), cell_size=0.1):
+        """Initialize the index with (key, (latitude, longitude)) pairs."""
+        self.__size = cell_size
+        self.__columns = int(-(-360 // cell_size))
+        self.__cells = {}
+        self.__points = {}
+        for key, point in points:
+            self.add(key, point)
+
+    def __len__(self):
+        """Return the number of keys indexed."""
+        return len(self.__points)
+
+    def __cell(self, lat, lon):
+        """Return the (row, column) of the cell holding a point."""
+        return (floor((lat + 90) / self.__size),
+                floor(((lon + 180) % 360) / self.__size) % self.__columns)
+
+    def add(self, key, point):
+        """Index key at point, replacing its former point.
+
+        Points that are not a valid (latitude, longitude) are not indexed.
+        """
+        self.remove(key)
+        if located(point):
+            self.__cells.setdefault(self.__cell(*point), {})[key] = point
+            self.__points[key] = point
+
+    def remove(self, key):
+        """Remove key from the index, if it is inside."""
+        if key in self.__points:
+            cell = self.__cell(*self.__points.pop(key))
+            del self.__cells[cell][key]
+            if not self.__cells[cell]:
+                del self.__cells[cell]
+
+    def get(self, point):
+        """Return the list of keys indexed at point."""
+        if not located(point):
+            return []
+        return [key for key, at in self.__cells.get(self.__cell(*point),
+                                                    {}).items()
+                if at == point]
+
+    def bbox(self, south, west, north, east):
+        """Return the keys inside a box, which crosses the antimeridian
+        when west is greater than east."""
+        full = west <= east and east - west >= 360
+        bottom, left = self.__cell(max(south, -90), west)
+        top, right = self.__cell(min(north, 90), east)
+        if full:
+            columns = range(self.__columns)
+        elif right < left or (west > east and right == left):
+            columns = list(range(left, self.__columns)) + \
+                list(range(right + 1))
+        else:
+            columns = range(left, right + 1)
+        if (top - bottom + 1) * len(columns) > len(self.__cells):
+            column_set = set(columns)
+            cells = [cell for cell in self.__cells
+                     if bottom <= cell[0] <= top and cell[1] in column_set]
+        else:
+            cells = [(row, column) for row in range(bottom, top + 1)
+                     for column in columns]
+        west = (west + 180) % 360
+        east = (east + 180) % 360
+        keys = []
+        for cell in cells:
+            for key, (lat, lon) in self.__cells.get(cell, {}).items():
+                lon = (lon + 180) % 360
+                if south <= lat <= north and (
+                        full or west <= lon <= east if west <= east
+                        else lon >= west or lon <= east):
+                    keys.append(key)
+        return keys
+
+    def radius(self, lat, lon, km):
+        """Return the (distance, key) pairs of the keys at most km away
+        from a point, from the closest."""
+        if km < 0:
+            return []
+        arc = km / earth_radius
+        south = lat - degrees(arc)
+        north = lat + degrees(arc)
+        if south <= -90 or north >= 90 or arc >= radians(90 - abs(lat)):
+            west, east = -180, 180
+        else:
+            spread = degrees(asin(min(1.0, sin(arc) / cos(radians(lat)))))
+            west, east = lon - spread, lon + spread
+            if east - west >= 360:
+                west, east = -180, 180
+            else:
+                west = (west + 180) % 360 - 180
+                east = (east + 180) % 360 - 180
+        found = []
+        for key in self.bbox(south, west, north, east):
+            dist = distance(lat, lon, *self.__points[key])
+            if dist <= km:
+                found.append((dist, key))
+        found.sort()
+        return found
+
+    def nearest(self, lat, lon, k):
+        """Return the (distance, key) pairs of the k keys closest to a
+        point, from the closest.
+
+        Rings of cells around the point are read until k keys are found,
+        then every key not farther than the kth one is measured.
+        """
+        if k <= 0 or not self.__points:
+            return []
+        row, column = self.__cell(lat, lon)
+        found = []
+        seen = set()
+        ring = 0
+        while len(found) < k:
+            if len(seen) > len(self.__cells):
+                return sorted((distance(lat, lon, *point), key)
+                              for key, point in self.__points.items())[:k]
+            for dr in range(-ring, ring + 1):
+                step = 1 if abs(dr) == ring else 2 * ring
+                for dc in range(-ring, ring + 1, step):
+                    cell = (row + dr, (column + dc) % self.__columns)
+                    if cell not in seen:
+                        seen.add(cell)
+                        found.extend(self.__cells.get(cell, {}).values())
+            ring += 1
+        limit = sorted(distance(lat, lon, *point) for point in found)[k - 1]
+        return self.radius(lat, lon, limit + 1e-9)[:k]
@@ -0,0 +1,166 @@
+#!/usr/bin/python3
+"""the ClassIndex, AttributeIndex and SortedIndex classes."""
+from bisect import bisect_left, bisect_right, insort
+from operator import itemgetter
+
+
+class ClassIndex():
+    """Representing the keys of a storage grouped by class name.
+
+    Attributes:
+        __classes (dict): The class names mapped to dictionaries of ids
+            mapped to their instance, or to None while lazy mode has not
+            built it yet.
+        __size (int): The number of keys indexed.
+    """
+
+    def __init__(self, objects=()):
+        """Initialize the index with (key, instance) pairs."""
+        self.__classes = {}
+        self.__size = 0
+        for key, obj in objects:
+            self.add(key, obj)
+
+    def __len__(self):
+        """Return the number of keys indexed."""
+        return self.__size
+
+    def add(self, key, obj=None):
+        """Index the instance obj stored at key."""
+        class_name, _, obj_id = key.partition(".")
+        ids = self.__classes.setdefault(class_name, {})
+        if obj_id not in ids:
+            self.__size += 1
+        ids[obj_id] = obj
+
+    def remove(self, key):
+        """Remove key from the index, if it is inside."""
+        class_name, _, obj_id = key.partition(".")
+        ids = self.__classes.get(class_name)
+        if ids is not None and obj_id in ids:
+            del ids[obj_id]
+            self.__size -= 1
+
+    def count(self, class_name):
+        """Return the number of keys of class_name."""
+        return len(self.__classes.get(class_name, ()))
+
+    def ids(self, class_name):
+        """Return the dictionary of ids and instances of class_name."""
+        return self.__classes.get(class_name, {})
+
+
+class AttributeIndex():
+    """Representing the keys of a storage grouped by an attribute value.
+
+    Attributes:
+        __keys (dict): The values mapped to dictionaries of the keys
+            holding them, used as ordered sets.
+        __values (dict): The keys mapped to their indexed value.
+    """
+
+    def __init__(self, values=()):
+        """Initialize the index with (key, value) pairs."""
+        self.__keys = {}
+        self.__values = {}
+        for key, value in values:
+            self.add(key, value)
+
+    def __len__(self):
+        """Return the number of keys indexed."""
+        return len(self.__values)
+
+    def add(self, key, value):
+        """Index key under value, replacing its former value.
+
+        Unhashable values are not indexed.
+        """
+        self.remove(key)
+        try:
+            self.__keys.setdefault(value, {})[key] = None
+        except TypeError:
+            return
+        self.__values[key] = value
+
+    def remove(self, key):
+        """Remove key from the index, if it is inside."""
+        if key not in self.__values:
+            return
+        value = self.__values.pop(key)
+        keys = self.__keys[value]
+        del keys[key]
+        if not keys:
+            del self.__keys[value]
+
+    def get(self, value):
+        """Return the list of keys indexed under value."""
+        try:
+            return list(self.__keys.get(value, ()))
+        except TypeError:
+            return []
+
+
+class SortedIndex():
+    """Representing the keys of a storage ordered by a numeric attribute.
+
+    Attributes:
+        __entries (list): The (value, key) pairs in ascending order.
+        __values (dict): The keys mapped to their indexed value.
+    """
+
+    def __init__(self, values=()):
+        """Initialize the index with (key, value) pairs."""
+        self.__values = {key: value for key, value in values
+                         if self.numeric(value)}
+        self.__entries = sorted((value, key)
+                                for key, value in self.__values.items())
+
+    def __len__(self):
+        """Return the number of keys indexed."""
+        return len(self.__values)
+
+    @staticmethod
+    def numeric(value):
+        """Return True if value is an int or float that can be ordered."""
+        return type(value) in (int, float) and value == value
+
+    def add(self, key, value):
+        """Index key under value, replacing its former value.
+
+        Values other than numbers are not indexed.
+        """
+        self.remove(key)
+        if self.numeric(value):
+            insort(self.__entries, (value, key))
+            self.__values[key] = value
+
+    def remove(self, key):
+        """Remove key from the index, if it is inside."""
+        if key in self.__values:
+            value = self.__values.pop(key)
+            del self.__entries[bisect_left(self.__entries, (value, key))]
+
+    def get(self, value):
+        """Return the list of keys indexed under value."""
+        if not self.numeric(value):
+            return []
+        return self.range(value, value)
+
+    def range(self, low=None, high=None, reverse=False):
+        """Return the keys whose value is between low and high included,
+        ordered by value.
+
+        Args:
+            low (number): The lowest value, or None for no bound.
+            high (number): The highest value, or None for no bound.
+            reverse (bool): Order by descending value.
+        """
+        value = itemgetter(0)
+        start = 0 if low is None else \
+            bisect_left(self.__entries, low, key=value)
+        end = len(self.__entries) if high is None else \
+            bisect_right(self.__entries, high, key=value)
+        keys = [key for _, key in self.__entries[start:end]]
+        if reverse:
+            keys.reverse()
+        return keys
@@ -0,0 +1,116 @@
+#!/usr/bin/python3
+"""the Journal class."""
+import json
+import os
+
+
+class Journal():
+    """Representing an append-only log of storage mutations.
+
+    Each line of the journal is a JSON record {"key": <key>, "value": <dict>}
+    where a null value means the key was deleted. While a snapshot is
+    written, the records it holds are kept in path.old and new records go
+    to path, so both files are replayed until the snapshot is done.
+
+    Attributes:
+        path (str): The name of the journal file.
+        old (str): The name of the records moved aside by rotate().
+    """
+
+    def __init__(self, path):
+        """Initialize a journal writing to path."""
+        self.path = path
+        self.old = path + ".old"
+
+    def append(self, records):
+        """Append (key, value) records to the journal and flush them to disk.
+
+        A torn last line left by an interrupted append is cut first, so
+        the records are not glued onto it and skipped by replay().
+
+        Args:
+            records (iterable): pairs of key and to_dict() value, or None
+                for a deletion.
+        """
+        lines = [json.dumps({"key": key, "value": value}) + "\n"
+                 for key, value in records]
+        if not lines:
+            return
+        with open(self.path, "a+b") as f:
+            self.__cut_torn_line(f)
+            f.write("".join(lines).encode("utf-8"))
+            f.flush()
+            os.fsync(f.fileno())
+
+    @staticmethod
+    def __cut_torn_line(f, chunk_size=1 << 12):
+        """Truncate the file f after its last complete line."""
+        end = f.seek(0, os.SEEK_END)
+        if end == 0:
+            return
+        f.seek(end - 1)
+        if f.read(1) == b"\n":
+            return
+        pos = end
+        while pos > 0:
+            start = max(0, pos - chunk_size)
+            f.seek(start)
+            cut = f.read(pos - start).rfind(b"\n")
+            if cut >= 0:
+                f.truncate(start + cut + 1)
+                return
+            pos = start
+        f.truncate(0)
+
+    def replay(self):
+        """Yield the (key, value) records of the journal in write order.
+
+        A torn last line left by an interrupted append is ignored.
+        """
+        for path in (self.old, self.path):
+            try:
+                with open(path, "r") as f:
+                    for line in f:
+                        try:
+                            record = json.loads(line)
+                        except ValueError:
+                            break
+                        yield record["key"], record["value"]
+            except FileNotFoundError:
+                pass
+
+    def size(self):
+        """Return the number of bytes appended since the last rotate()."""
+        try:
+            return os.path.getsize(self.path)
+        except FileNotFoundError:
+            return 0
+
+    def rotate(self):
+        """Move the records aside to old, after the ones already there."""
+        if not os.path.exists(self.path):
+            return
+        if not os.path.exists(self.old):
+            os.replace(self.path, self.old)
+            return
+        with open(self.path, "rb") as src, open(self.old, "a+b") as dst:
+            self.__cut_torn_line(dst)
+            dst.writelines(line for line in src if line.endswith(b"\n"))
+            dst.flush()
+            os.fsync(dst.fileno())
+        os.remove(self.path)
+
+    def drop_old(self):
+        """Remove the records moved aside by rotate()."""
+        try:
+            os.remove(self.old)
+        except FileNotFoundError:
+            pass
+
+    def truncate(self):
+        """Remove every record from the journal."""
+        self.drop_old()
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
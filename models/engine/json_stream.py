@@ -0,0 +1,152 @@
+#!/usr/bin/python3
+"""Incremental reader for the JSON files saved by FileStorage."""
+import json
+
+decoder = json.JSONDecoder()
+whitespace = " \t\n\r"
+
+
+def iter_entries(f, chunk_size=1 << 16, texts=False):
+    """Yield the (key, value) entries of the JSON object in the file f.
+
+    Only the text read so far is decoded, and the text already decoded is
+    dropped, so memory stays close to the size of a chunk or of the largest
+    entry. Files written by FileStorage hold one entry per line, after a
+    line holding "{": the complete lines read are then decoded at once,
+    as long as each of them holds exactly one entry. Other files have the
+    entries read so far decoded at once, up to the last "}," that ends
+    one of them, while only entries are found there and texts is False.
+
+    Args:
+        f (file): A file opened in text mode on a JSON object.
+        chunk_size (int): The number of characters read at a time.
+        texts (bool): Yield (key, value, text) entries instead, where text
+            is the JSON of value as it is written in f, or None if it
+            spans several lines.
+
+    Raises:
+        ValueError: If the file is not a JSON object.
+    """
+    buf = ""
+    pos = 0
+    eof = False
+    decoded = None
+
+    def more():
+        """Read the next chunk, return False at the end of the file."""
+        nonlocal buf, pos, eof
+        chunk = f.read(chunk_size)
+        if not chunk:
+            eof = True
+            return False
+        buf = buf[pos:] + chunk
+        pos = 0
+        return True
+
+    def skip():
+        """Move past whitespace and return the next character, or ''."""
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in whitespace:
+                pos += 1
+            if pos < len(buf) or not more():
+                return buf[pos:pos + 1]
+
+    def decode():
+        """Decode the JSON value starting at pos, keeping its text in
+        decoded if texts is True."""
+        nonlocal pos, decoded
+        while True:
+            try:
+                value, end = decoder.raw_decode(buf, pos)
+                if end < len(buf) or eof:
+                    if texts:
+                        decoded = buf[pos:end]
+                    pos = end
+                    return value
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            more()
+
+    if skip() != "{":
+        raise ValueError("expected a JSON object")
+    pos += 1
+    if pos == len(buf):
+        more()
+    by_line = buf.startswith("\n", pos)
+    batched = not by_line and not texts
+    if skip() == "}":
+        return
+    while True:
+        if by_line:
+            cut = buf.rfind("\n", pos)
+            if cut < pos:
+                if more():
+                    continue
+            else:
+                lines = buf[pos:cut]
+                try:
+                    batch = json.loads("{" + lines.removesuffix(",") + "}")
+                except ValueError:
+                    batch = None
+                if isinstance(batch, dict) and \
+                        len(batch) == lines.count("\n") + 1:
+                    if texts:
+                        yield from line_texts(batch, lines)
+                    else:
+                        yield from batch.items()
+                    pos = cut
+                    if not lines.endswith(","):
+                        if skip() != "}":
+                            raise ValueError("expected '}' after the last "
+                                             "line")
+                        return
+                    skip()
+                    continue
+            by_line = False
+        elif batched:
+            cut = buf.rfind("},", pos)
+            if cut < pos:
+                if more():
+                    continue
+            else:
+                try:
+                    batch = json.loads("{" + buf[pos:cut + 1] + "}")
+                except ValueError:
+                    batch = None
+                if isinstance(batch, dict):
+                    yield from batch.items()
+                    pos = cut + 2
+                    skip()
+                    continue
+            batched = False
+        key = decode()
+        if not isinstance(key, str) or skip() != ":":
+            raise ValueError("expected ':' after an object key")
+        pos += 1
+        skip()
+        value = decode()
+        if texts:
+            yield key, value, decoded if "\n" not in decoded else None
+        else:
+            yield key, value
+        sep = skip()
+        pos += 1
+        if sep == "}":
+            return
+        if sep != ",":
+            raise ValueError("expected ',' or '}' after an object value")
+        skip()
+
+
+def line_texts(batch, lines):
+    """Yield the (key, value, text) entries of batch, decoded from lines
+    holding one entry each, where text is the JSON of value on its line."""
+    for (key, value), line in zip(batch.items(), lines.split("\n")):
+        line = line.lstrip()
+        prefix = json.dumps(key) + ": "
+        text = None
+        if line.startswith(prefix):
+            text = line[len(prefix):].rstrip().removesuffix(",").rstrip()
+        yield key, value, text
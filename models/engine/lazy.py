@@ -0,0 +1,272 @@
+#!/usr/bin/python3
+"""the LazyObjects class."""
+
+
+class LazyObjects(dict):
+    """Representing a dictionary of objects built on first access.
+
+    Keys are found in four layers: the instances already built (the dict
+    itself), the raw to_dict() records not built yet, the memory-mapped
+    files read one record at a time, and the files (sources) not parsed
+    yet. A source is only parsed when one of its keys is looked up,
+    and a record is only built when its key is read.
+
+    Attributes:
+        __records (dict): The raw records not built yet.
+        __texts (dict): The JSON texts the records not built yet were read
+            from, while they are unchanged.
+        __mapped (dict): The MappedFile of the indexed JSON files.
+        __sources (dict): The paths of the files not parsed yet.
+        __classes (dict): The class name of the keys of each source or
+            mapped file holding a single class.
+        __deleted (set): The keys deleted before their source was parsed.
+        __build (function): Returns the instance of a raw record.
+        __locate (function): Returns the source name holding a key, or
+            None if every source has to be parsed to find it.
+        __read (function): Returns the (key, record) entries of a file, or
+            (key, record, text) entries, text being the JSON the record was
+            read from or None.
+    """
+
+    def __init__(self, objects, build, locate, read):
+        """Initialize the dictionary with already built objects."""
+        super().__init__(objects)
+        self.__records = {}
+        self.__texts = {}
+        self.__mapped = {}
+        self.__sources = {}
+        self.__classes = {}
+        self.__deleted = set()
+        self.__build = build
+        self.__locate = locate
+        self.__read = read
+
+    def add_source(self, name, path, class_name=None):
+        """Register the file path as the source name, holding only keys of
+        class_name if given."""
+        self.__sources[name] = path
+        if class_name is not None:
+            self.__classes[name] = class_name
+
+    def add_mapped(self, name, mapped, class_name=None):
+        """Register the MappedFile mapped as the source name, holding only
+        keys of class_name if given."""
+        self.__mapped[name] = mapped
+        if class_name is not None:
+            self.__classes[name] = class_name
+
+    def add_record(self, key, record):
+        """Store the raw record at key, replacing any older value."""
+        super().pop(key, None)
+        self.__records[key] = record
+        self.__texts.pop(key, None)
+        self.__deleted.discard(key)
+
+    def discard(self, key):
+        """Remove key, even if its source is not parsed yet."""
+        super().pop(key, None)
+        self.__records.pop(key, None)
+        self.__texts.pop(key, None)
+        if self.__sources or self.__mapped:
+            self.__deleted.add(key)
+
+    def load(self, name=None, class_name=None):
+        """Parse the source name, or every source that may hold keys of
+        class_name, or every source if both are None."""
+        if name is not None:
+            names = [name]
+        else:
+            names = [source for source in self.__sources
+                     if self.__holds(source, class_name)]
+        for source in names:
+            path = self.__sources.pop(source, None)
+            if path is None:
+                continue
+            try:
+                records = list(self.__read(path))
+            except FileNotFoundError:
+                continue
+            for key, record, *text in records:
+                if key in self.__deleted:
+                    self.__deleted.discard(key)
+                elif not super().__contains__(key) \
+                        and key not in self.__records:
+                    self.__records[key] = record
+                    if text and text[0] is not None:
+                        self.__texts[key] = text[0]
+
+    def loaded(self, class_name=None):
+        """Return the keys known without parsing another source, of
+        class_name if given."""
+        keys = list(super().keys()) + list(self.__records)
+        prefix = "" if class_name is None else f"{class_name}."
+        if prefix:
+            keys = [key for key in keys if key.startswith(prefix)]
+        for name, mapped in self.__mapped.items():
+            if not self.__holds(name, class_name):
+                continue
+            keys.extend(key for key in mapped.keys(prefix)
+                        if key not in self.__deleted
+                        and not dict.__contains__(self, key)
+                        and key not in self.__records)
+        return keys
+
+    def __holds(self, name, class_name):
+        """Return True if the source or mapped file name may hold keys of
+        class_name, or any key if class_name is None."""
+        return class_name is None \
+            or self.__classes.get(name, class_name) == class_name
+
+    def text(self, key):
+        """Return the JSON text of key if it is only known from a mapped
+        file, or None."""
+        if super().__contains__(key) or key in self.__records \
+                or key in self.__deleted:
+            return None
+        for mapped in self.__mapped.values():
+            text = mapped.text(key)
+            if text is not None:
+                return text
+        return None
+
+    def saved(self, key):
+        """Return the JSON text the record of key was read from, if it is
+        not built nor replaced since, or None."""
+        return self.__texts.get(key)
+
+    def peek(self, key):
+        """Return the instance or the raw record at key without building it.
+
+        Raises:
+            KeyError: If key is not stored.
+        """
+        self.__find(key)
+        if key in self.__records:
+            return self.__records[key]
+        return super().__getitem__(key)
+
+    def __find(self, key):
+        """Parse the source that may hold key if it is not known yet."""
+        if super().__contains__(key) or key in self.__records:
+            return
+        if self.__mapped and key not in self.__deleted:
+            name = self.__locate(key)
+            for mapped in ([self.__mapped[name]] if name in self.__mapped
+                           else self.__mapped.values()):
+                try:
+                    self.__records[key] = mapped.read(key)
+                    return
+                except KeyError:
+                    pass
+        if self.__sources:
+            self.load(self.__locate(key))
+
+    def __missing__(self, key):
+        """Build the instance stored at key."""
+        self.__find(key)
+        if key not in self.__records:
+            raise KeyError(key)
+        obj = self.__build(self.__records.pop(key))
+        self.__texts.pop(key, None)
+        super().__setitem__(key, obj)
+        return obj
+
+    def __contains__(self, key):
+        """Return True if key is stored."""
+        self.__find(key)
+        return super().__contains__(key) or key in self.__records
+
+    def __setitem__(self, key, obj):
+        """Store the instance obj at key."""
+        self.__records.pop(key, None)
+        self.__texts.pop(key, None)
+        super().__setitem__(key, obj)
+
+    def __delitem__(self, key):
+        """Remove key."""
+        if key not in self:
+            raise KeyError(key)
+        self.discard(key)
+
+    def get(self, key, default=None):
+        """Return the instance at key, or default."""
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def pop(self, key, *default):
+        """Remove key and return its instance, or default."""
+        try:
+            obj = self[key]
+        except KeyError:
+            if default:
+                return default[0]
+            raise
+        self.discard(key)
+        return obj
+
+    def clear(self):
+        """Remove every key."""
+        super().clear()
+        self.__records.clear()
+        self.__texts.clear()
+        self.__mapped.clear()
+        self.__sources.clear()
+        self.__classes.clear()
+        self.__deleted.clear()
+
+    def __iter__(self):
+        """Iterate over every key."""
+        self.load()
+        return iter(self.loaded())
+
+    def __len__(self):
+        """Return the number of keys."""
+        return self.count()
+
+    def count(self, class_name=None):
+        """Return the number of keys, of class_name if given.
+
+        Only the sources that may hold keys of class_name are parsed, and
+        the keys of the mapped files are counted from their offset index,
+        without listing them.
+        """
+        self.load(class_name=class_name)
+        prefix = "" if class_name is None else f"{class_name}."
+        if not prefix and not self.__mapped:
+            return super().__len__() + len(self.__records)
+        known = {key for key in list(super().keys()) + list(self.__records)
+                 if key.startswith(prefix)}
+        total = len(known)
+        if not self.__mapped:
+            return total
+        hidden = known | {key for key in self.__deleted
+                          if key.startswith(prefix)}
+        for name, mapped in self.__mapped.items():
+            if self.__holds(name, class_name):
+                total += mapped.count(prefix) - sum(key in mapped
+                                                    for key in hidden)
+        return total
+
+    def keys(self, class_name=None):
+        """Return every key, or the keys of class_name if given, parsing
+        only the sources that may hold them."""
+        self.load(class_name=class_name)
+        return self.loaded(class_name)
+
+    def values(self):
+        """Return every instance, building the missing ones."""
+        self.__build_all()
+        return super().values()
+
+    def items(self):
+        """Return every (key, instance) pair, building the missing ones."""
+        self.__build_all()
+        return super().items()
+
+    def __build_all(self):
+        """Build the instance of every key."""
+        self.load()
+        for key in self.loaded():
+            self[key]
@@ -0,0 +1,140 @@
+#!/usr/bin/python3
+"""the MappedFile class."""
+import json
+import mmap
+import os
+import struct
+
+header = struct.Struct("<4sHQQq")
+magic = b"HBX1"
+
+
+def write_index(path, entries):
+    """Write the offset index of the JSON file path.
+
+    Args:
+        path (str): The name of the JSON file, the index is path.idx.
+        entries (iterable): (key, offset, length) of every record in path.
+    """
+    entries = sorted((key.encode(), offset, length)
+                     for key, offset, length in entries)
+    width = max((len(key) for key, offset, length in entries), default=1)
+    record = struct.Struct(f"<{width}sQI")
+    stat = os.stat(path)
+    with open(path + ".idx.tmp", "wb") as f:
+        f.write(header.pack(magic, width, len(entries), stat.st_size,
+                            stat.st_mtime_ns))
+        f.writelines(record.pack(*entry) for entry in entries)
+    os.replace(path + ".idx.tmp", path + ".idx")
+
+
+class MappedFile():
+    """Representing a JSON file and its offset index, both memory-mapped.
+
+    The index holds the keys sorted, each with the byte offset and length
+    of its record in the JSON file, so a record is found by binary search
+    and decoded on its own.
+
+    Attributes:
+        path (str): The name of the JSON file.
+    """
+
+    def __init__(self, path):
+        """Map path and its index.
+
+        Raises:
+            FileNotFoundError: If path or its index is missing.
+            ValueError: If the index does not describe path any more.
+        """
+        self.path = path
+        stat = os.stat(path)
+        with open(path + ".idx", "rb") as f:
+            self.__index = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        tag, self.__width, self.__count, size, mtime = \
+            header.unpack_from(self.__index)
+        if tag != magic or (size, mtime) != (stat.st_size, stat.st_mtime_ns):
+            self.__index.close()
+            raise ValueError(f"stale index for {path}")
+        self.__record = struct.Struct(f"<{self.__width}sQI")
+        with open(path, "rb") as f:
+            self.__data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __len__(self):
+        """Return the number of records."""
+        return self.__count
+
+    def __contains__(self, key):
+        """Return True if key has a record."""
+        return self.__find(key) is not None
+
+    def __entry(self, i):
+        """Return the (key, offset, length) entry i of the index."""
+        return self.__record.unpack_from(
+            self.__index, header.size + i * self.__record.size)
+
+    def __bisect(self, key):
+        """Return the position of the first key not lower than key."""
+        key = key.ljust(self.__width, b"\0")
+        lo, hi = 0, self.__count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.__entry(mid)[0] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def __find(self, key):
+        """Return the (offset, length) of the record of key, or None."""
+        key = key.encode()
+        if len(key) > self.__width:
+            return None
+        i = self.__bisect(key)
+        if i < self.__count:
+            found, offset, length = self.__entry(i)
+            if found.rstrip(b"\0") == key:
+                return offset, length
+        return None
+
+    def text(self, key):
+        """Return the JSON text of the record of key, or None."""
+        found = self.__find(key)
+        if found is None:
+            return None
+        offset, length = found
+        return self.__data[offset:offset + length].decode()
+
+    def read(self, key):
+        """Return the decoded record of key.
+
+        Raises:
+            KeyError: If key has no record.
+        """
+        text = self.text(key)
+        if text is None:
+            raise KeyError(key)
+        return json.loads(text)
+
+    def __range(self, prefix):
+        """Return the index positions of the keys starting with prefix."""
+        prefix = prefix.encode()
+        if not prefix:
+            return 0, self.__count
+        upper = prefix[:-1] + bytes([prefix[-1] + 1])
+        return self.__bisect(prefix), self.__bisect(upper)
+
+    def keys(self, prefix=""):
+        """Iterate over the keys starting with prefix, in sorted order."""
+        start, stop = self.__range(prefix)
+        for i in range(start, stop):
+            yield self.__entry(i)[0].rstrip(b"\0").decode()
+
+    def count(self, prefix=""):
+        """Return the number of keys starting with prefix."""
+        start, stop = self.__range(prefix)
+        return stop - start
+
+    def close(self):
+        """Unmap the file and its index."""
+        self.__index.close()
+        self.__data.close()
@@ -0,0 +1,224 @@
+#!/usr/bin/python3
+"""the Query class."""
+import operator
+from itertools import islice
+
+operators = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "in": lambda value, values: value in values,
+    "contains": lambda value, part: part in value
+}
+
+
+def numeric(value):
+    """Return True if value is an int or float that can be ordered."""
+    return type(value) in (int, float) and value == value
+
+
+def compile_condition(name, op, value):
+    """Return a function telling if an instance meets a condition.
+
+    Raises:
+        ValueError: If op is not a known operator.
+    """
+    if op not in operators:
+        raise ValueError(f"unknown operator {op!r}")
+    test = operators[op]
+
+    def predicate(obj):
+        """Return True if obj meets the condition."""
+        try:
+            return bool(test(getattr(obj, name, None), value))
+        except TypeError:
+            return False
+    return predicate
+
+
+class Query():
+    """Representing a lazy query over the stored instances of a class.
+
+    Each call to where(), order_by() or limit() returns a new query. The
+    instances are only read when the query is iterated, through the index
+    chosen by the planner: an index lookup for an equality on an indexed
+    attribute, else a range scan for bounds on an ordered attribute, else a
+    scan of the class.
+
+    Attributes:
+        class_name (str): The name of the class queried.
+        __conditions (list): The (name, operator, value) conditions.
+        __order (list): The (name, reverse) sort keys.
+        __limit (int): The maximum number of instances, or None.
+        __source (dict): The functions reading the storage: "scan" yields
+            the instances of a class, "lookup" the ones with an attribute
+            equal to a value, "between" the ones with an attribute in a
+            range, in order, and "count" counts the instances of a class.
+        __hashed (tuple): The attributes "lookup" finds through an index.
+        __ordered (tuple): The attributes "between" scans through an index.
+    """
+
+    def __init__(self, class_name, source, hashed=(), ordered=()):
+        """Initialize a query over every instance of class_name."""
+        self.class_name = class_name
+        self.__source = source
+        self.__hashed = tuple(hashed)
+        self.__ordered = tuple(ordered)
+        self.__conditions = []
+        self.__order = []
+        self.__limit = None
+
+    def __copy(self):
+        """Return a new query with the same clauses."""
+        query = Query(self.class_name, self.__source, self.__hashed,
+                      self.__ordered)
+        query.__conditions = list(self.__conditions)
+        query.__order = list(self.__order)
+        query.__limit = self.__limit
+        return query
+
+    def where(self, *condition, **equals):
+        """Return the query restricted to the instances meeting condition.
+
+        Args:
+            condition: A name, an operator among operators and a value,
+                e.g. where("price_by_night", "<=", 100).
+            equals: Attributes equal to a value, e.g. where(city_id=id).
+
+        Raises:
+            ValueError: If condition is not a name, a known operator and
+                a value.
+        """
+        query = self.__copy()
+        if condition:
+            if len(condition) != 3:
+                raise ValueError("expected a name, an operator and a value")
+            compile_condition(*condition)
+            query.__conditions.append(tuple(condition))
+        for name, value in equals.items():
+            query.__conditions.append((name, "==", value))
+        return query
+
+    def order_by(self, *names):
+        """Return the query sorted by the attributes names, in descending
+        order for the ones starting with '-'."""
+        query = self.__copy()
+        for name in names:
+            if name.startswith("-"):
+                query.__order.append((name[1:], True))
+            else:
+                query.__order.append((name, False))
+        return query
+
+    def limit(self, n):
+        """Return the query stopping after n instances."""
+        query = self.__copy()
+        query.__limit = n
+        return query
+
+    def __plan(self):
+        """Return the access path, the remaining conditions and whether the
+        instances are read in the requested order.
+
+        The access path is ("lookup", name, value), ("between", name, low,
+        high, reverse) or ("scan",).
+        """
+        conditions = list(self.__conditions)
+        for condition in conditions:
+            name, op, value = condition
+            if op == "==" and name in self.__hashed and (
+                    name not in self.__ordered or numeric(value)):
+                try:
+                    hash(value)
+                except TypeError:
+                    continue
+                conditions.remove(condition)
+                return ("lookup", name, value), conditions, not self.__order
+        bounds = {}
+        for name, op, value in conditions:
+            if name in self.__ordered and numeric(value) and \
+                    op in ("==", "<", "<=", ">", ">="):
+                low, high = bounds.get(name, (None, None))
+                if op in ("==", ">", ">=") and (low is None or value > low):
+                    low = value
+                if op in ("==", "<", "<=") and (high is None or value < high):
+                    high = value
+                bounds[name] = (low, high)
+        first = self.__order[0] if self.__order else (None, False)
+        if first[0] in self.__ordered and len(self.__order) == 1 and (
+                first[0] in bounds or not conditions and
+                self.__limit is not None):
+            name, reverse = first
+        elif bounds:
+            name, reverse = next(iter(bounds)), False
+        else:
+            return ("scan",), conditions, not self.__order
+        low, high = bounds.get(name, (None, None))
+        conditions = [(cname, op, value) for cname, op, value in conditions
+                      if cname != name or op not in ("==", "<=", ">=")
+                      or not numeric(value)]
+        in_order = not self.__order or self.__order == [(name, reverse)]
+        return ("between", name, low, high, reverse), conditions, in_order
+
+    def explain(self):
+        """Return the plan of the query, one step per line."""
+        path, conditions, in_order = self.__plan()
+        if path[0] == "lookup":
+            lines = [f"index lookup {self.class_name}.{path[1]} == "
+                     f"{path[2]!r}"]
+        elif path[0] == "between":
+            lines = [f"range scan {self.class_name}.{path[1]} from "
+                     f"{'-inf' if path[2] is None else path[2]} to "
+                     f"{'inf' if path[3] is None else path[3]}"
+                     f"{' descending' if path[4] else ''}"]
+        else:
+            lines = [f"class scan {self.class_name}"]
+        lines.extend(f"filter {name} {op} {value!r}"
+                     for name, op, value in conditions)
+        if not in_order:
+            lines.append("sort by " + ", ".join(
+                ("-" if reverse else "") + name
+                for name, reverse in self.__order))
+        if self.__limit is not None:
+            lines.append(f"limit {self.__limit}")
+        return "\n".join(lines)
+
+    def __iter__(self):
+        """Iterate over the instances of the query."""
+        path, conditions, in_order = self.__plan()
+        if path[0] == "lookup":
+            found = self.__source["lookup"](self.class_name, *path[1:])
+        elif path[0] == "between":
+            found = self.__source["between"](self.class_name, *path[1:])
+        else:
+            found = self.__source["scan"](self.class_name)
+        predicates = [compile_condition(*condition)
+                      for condition in conditions]
+        if predicates:
+            found = (obj for obj in found
+                     if all(predicate(obj) for predicate in predicates))
+        if not in_order:
+            found = list(found)
+            for name, reverse in reversed(self.__order):
+                found.sort(key=lambda obj: getattr(obj, name, None),
+                           reverse=reverse)
+        if self.__limit is not None:
+            found = islice(found, self.__limit)
+        return iter(found)
+
+    def all(self):
+        """Return the list of the instances of the query."""
+        return list(self)
+
+    def first(self):
+        """Return the first instance of the query, or None."""
+        return next(iter(self.limit(1)), None)
+
+    def count(self):
+        """Return the number of instances of the query."""
+        if not self.__conditions and self.__limit is None:
+            return self.__source["count"](self.class_name)
+        return sum(1 for _ in self)
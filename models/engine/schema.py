@@ -0,0 +1,76 @@
+#!/usr/bin/python3
+"""The model classes known to the storage engines and their attributes."""
+from os import getenv
+from models.base_model import BaseModel
+from models.user import User
+from models.state import State
+from models.city import City
+from models.amenity import Amenity
+from models.place import Place
+from models.review import Review
+from models.engine.compact import compact
+
+classes = {
+    "BaseModel": BaseModel,
+    "User": User,
+    "State": State,
+    "City": City,
+    "Amenity": Amenity,
+    "Place": Place,
+    "Review": Review
+}
+
+types = (str, int, float, list)
+
+
+def columns(cls):
+    """Return the declared (name, type) attributes of a model class."""
+    cols = {}
+    for klass in reversed(cls.__mro__):
+        for name, value in vars(klass).items():
+            if not name.startswith("_") and type(value) in types:
+                cols[name] = type(value)
+    return cols
+
+
+# The classes declaring the attributes and their defaults, which classes
+# replaces by their compact variants when HBNB_COMPACT_MODELS is 1.
+declared = classes
+
+if getenv("HBNB_COMPACT_MODELS") == "1":
+    classes = {class_name: compact(cls, columns(cls))
+               for class_name, cls in classes.items()}
+
+foreign_keys = {
+    "City": ("state_id",),
+    "Place": ("city_id", "user_id"),
+    "Review": ("place_id", "user_id")
+}
+
+ranges = {
+    "Place": ("price_by_night", "max_guest", "number_rooms")
+}
+
+locations = {
+    "Place": ("latitude", "longitude")
+}
+
+texts = {
+    "Place": ("name", "description"),
+    "Review": ("text",)
+}
+
+aggregates = {
+    "cities_per_state": ("City", "state_id", "count"),
+    "places_per_city": ("Place", "city_id", "count"),
+    "places_per_user": ("Place", "user_id", "count"),
+    "price_per_city": ("Place", "city_id", "avg", "price_by_night"),
+    "reviews_per_place": ("Review", "place_id", "count"),
+    "reviews_per_user": ("Review", "user_id", "count")
+}
+
+tables = {
+    class_name: {name: kind for name, kind in columns(cls).items()
+                 if kind is not list}
+    for class_name, cls in classes.items()
+}
@@ -0,0 +1,117 @@
+#!/usr/bin/python3
+"""the TextIndex class."""
+import heapq
+import re
+from collections import Counter
+from math import log
+
+word = re.compile(r"\w+")
+
+
+def tokenize(text):
+    """Return the lowercase words of text."""
+    return word.findall(text.lower())
+
+
+class TextIndex():
+    """Representing an inverted index of the words of text attributes,
+    ranked with BM25.
+
+    Attributes:
+        k1 (float): How fast the score of a word saturates as it repeats.
+        b (float): How much long documents are penalized.
+        __documents (dict): The keys mapped to the Counter of their words.
+        __postings (dict): The words mapped to dictionaries of the keys
+            holding them and their number of occurrences.
+        __lengths (dict): The keys mapped to their number of words.
+        __total (int): The number of words of every document.
+    """
+    k1 = 1.2
+    b = 0.75
+
+    def __init__(self, values=()):
+        """Initialize the index with (key, tuple of texts) pairs."""
+        self.__documents = {}
+        self.__postings = {}
+        self.__lengths = {}
+        self.__total = 0
+        for key, value in values:
+            self.add(key, value)
+
+    @classmethod
+    def restore(cls, documents):
+        """Return the index of the words saved by documents()."""
+        index = cls()
+        for key, words in documents.items():
+            index.__insert(key, Counter(words))
+        return index
+
+    def __len__(self):
+        """Return the number of keys indexed."""
+        return len(self.__documents)
+
+    def documents(self):
+        """Return a copy of the keys mapped to the Counter of their words."""
+        return dict(self.__documents)
+
+    def add(self, key, value):
+        """Index the words of value, a text or a tuple of texts, at key,
+        replacing the former ones. Values other than text are skipped."""
+        self.remove(key)
+        texts = value if isinstance(value, tuple) else (value,)
+        words = Counter()
+        for text in texts:
+            if isinstance(text, str):
+                words.update(tokenize(text))
+        if words:
+            self.__insert(key, words)
+
+    def __insert(self, key, words):
+        """Index the Counter words at key."""
+        self.__documents[key] = words
+        self.__lengths[key] = sum(words.values())
+        self.__total += self.__lengths[key]
+        for term, count in words.items():
+            self.__postings.setdefault(term, {})[key] = count
+
+    def remove(self, key):
+        """Remove key from the index, if it is inside."""
+        words = self.__documents.pop(key, None)
+        if words is None:
+            return
+        self.__total -= self.__lengths.pop(key)
+        for term in words:
+            postings = self.__postings[term]
+            del postings[key]
+            if not postings:
+                del self.__postings[term]
+
+    def search(self, query, limit=None):
+        """Return the (score, key) pairs of the keys holding a word of
+        query, from the best BM25 score.
+
+        Args:
+            query (str): The words searched.
+            limit (int): The number of pairs returned, or None for all.
+        """
+        if not self.__documents:
+            return []
+        size = len(self.__documents)
+        average = self.__total / size
+        scores = {}
+        for term in set(tokenize(query)):
+            postings = self.__postings.get(term)
+            if not postings:
+                continue
+            found = len(postings)
+            idf = log(1 + (size - found + 0.5) / (found + 0.5))
+            for key, count in postings.items():
+                norm = count + self.k1 * (1 - self.b + self.b *
+                                          self.__lengths[key] / average)
+                scores[key] = scores.get(key, 0) + \
+                    idf * count * (self.k1 + 1) / norm
+        ranked = ((score, key) for key, score in scores.items())
+        if limit is not None:
+            return heapq.nsmallest(limit, ranked,
+                                   key=lambda pair: (-pair[0], pair[1]))
+        return sorted(ranked, key=lambda pair: (-pair[0], pair[1]))
@@ -0,0 +1,54 @@
+#!/usr/bin/python3
+"""the WriteBehind class."""
+import threading
+import time
+
+
+class WriteBehind():
+    """Representing a background thread coalescing save requests.
+
+    Every request made within delay seconds of the first pending one is
+    written by a single call to commit.
+
+    Attributes:
+        __commit (function): Writes the storage to disk.
+        __delay (float): The number of seconds requests are coalesced.
+        __pending (bool): True if a request was not written yet.
+    """
+
+    def __init__(self, commit, delay):
+        """Initialize a write-behind calling commit at most every delay."""
+        self.__commit = commit
+        self.__delay = delay
+        self.__pending = False
+        self.__condition = threading.Condition()
+        self.__writing = threading.Lock()
+        self.__thread = None
+
+    def request(self):
+        """Ask for a write within the next delay seconds."""
+        with self.__condition:
+            self.__pending = True
+            if self.__thread is None or not self.__thread.is_alive():
+                self.__thread = threading.Thread(target=self.__run,
+                                                 daemon=True)
+                self.__thread.start()
+            self.__condition.notify()
+
+    def flush(self):
+        """Write the pending request now, or wait for the running write."""
+        with self.__writing:
+            with self.__condition:
+                if not self.__pending:
+                    return
+                self.__pending = False
+            self.__commit()
+
+    def __run(self):
+        """Write the coalesced requests until the interpreter exits."""
+        while True:
+            with self.__condition:
+                while not self.__pending:
+                    self.__condition.wait()
+            time.sleep(self.__delay)
+            self.flush()
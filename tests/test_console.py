@@ -112,7 +112,8 @@ class TestHBNBCommandHelp(unittest.TestCase):
         """Test the general 'help' command message."""
         help_message = ("Documented commands (type help <topic>):\n"
                         "========================================\n"
-                        "EOF  all  count  create  destroy  help  quit  show  update")
+                        "EOF  compact  create   geo   quit    show   update\n"
+                        "all  count    destroy  help  search  stats")
         with patch("sys.stdout", new=StringIO()) as output:
             self.assertFalse(HBNBCommand().onecmd("help"))
             self.assertEqual(help_message, output.getvalue().strip())
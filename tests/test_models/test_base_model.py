@@ -5,12 +5,15 @@ Unit test classes:
     TestBaseModelInstantiation
     TestBaseModelSave
     TestBaseModelToDict
+    TestBaseModelCache
 """
 import os
 import unittest
 from datetime import datetime
 from time import sleep
+from unittest.mock import patch
 from models.base_model import BaseModel
+from models.engine.cache import cache
 import models
 
 
@@ -153,6 +156,134 @@ class TestBaseModelToDict(unittest.TestCase):
         self.assertEqual(str, type(base_model_dict["updated_at"]))
 
 
+class TestBaseModelCache(unittest.TestCase):
+    """Unit tests for the cached forms of the BaseModel class."""
+
+    def test_cached_forms_are_reused(self):
+        """Test that unchanged instances are not formatted again."""
+        base_model_instance = BaseModel()
+        first_str = str(base_model_instance)
+        self.assertIs(first_str, str(base_model_instance))
+        first_dict = base_model_instance.to_dict()
+        self.assertEqual(first_dict, base_model_instance.to_dict())
+
+    def test_to_dict_returns_a_copy(self):
+        """Test that changing the returned dictionary changes nothing."""
+        base_model_instance = BaseModel()
+        base_model_instance.to_dict()["name"] = "changed"
+        self.assertNotIn("name", base_model_instance.to_dict())
+
+    def test_setattr_invalidates(self):
+        """Test that changing an attribute updates the cached forms."""
+        base_model_instance = BaseModel()
+        str(base_model_instance)
+        base_model_instance.to_dict()
+        base_model_instance.name = "My Airbnb"
+        self.assertIn("My Airbnb", str(base_model_instance))
+        self.assertEqual("My Airbnb", base_model_instance.to_dict()["name"])
+        del base_model_instance.name
+        self.assertNotIn("My Airbnb", str(base_model_instance))
+        self.assertNotIn("name", base_model_instance.to_dict())
+
+    def test_save_invalidates(self):
+        """Test that save updates the cached updated_at."""
+        base_model_instance = BaseModel()
+        first_dict = base_model_instance.to_dict()
+        sleep(0.01)
+        with patch.object(models.storage, "save"):
+            base_model_instance.save()
+        self.assertNotEqual(first_dict["updated_at"],
+                            base_model_instance.to_dict()["updated_at"])
+
+    def test_change_while_building(self):
+        """Test that a form built while the instance changed, as when
+        another thread changes it, is not cached."""
+        base_model_instance = BaseModel()
+        put = cache.put
+
+        def changing(*args):
+            base_model_instance.name = "My Airbnb"
+            put(*args)
+        with patch.object(cache, "put", changing):
+            self.assertNotIn("name", base_model_instance.to_dict())
+        self.assertEqual("My Airbnb", base_model_instance.to_dict()["name"])
+
+
+class TestBaseModelReferences(unittest.TestCase):
+    """Test cases for the ids shared between referencing objects."""
+
+    def test_foreign_keys_share_the_id(self):
+        """Test that ids set as foreign keys are the referenced string."""
+        referenced = BaseModel()
+        referencing = BaseModel()
+        referencing.place_id = "".join(referenced.id)
+        self.assertIs(referenced.id, referencing.place_id)
+        self.assertEqual(referenced.id, referencing.to_dict()["place_id"])
+
+    def test_kwargs_share_the_id(self):
+        """Test that ids passed as keyword arguments are shared too."""
+        referenced = BaseModel()
+        built = BaseModel(id="".join(referenced.id),
+                          user_id="".join(referenced.id))
+        self.assertIs(referenced.id, built.id)
+        self.assertIs(referenced.id, built.user_id)
+
+    def test_other_attributes_are_kept(self):
+        """Test that other attributes and non-string ids are kept as is."""
+        base_model_instance = BaseModel()
+        name = "".join(["My ", "Airbnb"])
+        base_model_instance.name = name
+        base_model_instance.state_id = 89
+        self.assertIs(name, base_model_instance.name)
+        self.assertEqual(89, base_model_instance.state_id)
+
+
+class TestBaseModelTimestamps(unittest.TestCase):
+    """Test cases for the timestamps kept as saved until read."""
+
+    def setUp(self):
+        """Build an instance from a saved record."""
+        self.created = "2017-09-28 21:03:54.052298"
+        self.updated = "2017-09-28T21:05:54.052302"
+        self.instance = BaseModel(id="1", created_at=self.created,
+                                  updated_at=self.updated)
+
+    def test_to_dict_passes_saved_timestamps(self):
+        """Test that unread timestamps are returned as saved."""
+        dictionary = self.instance.to_dict()
+        self.assertIs(self.created, dictionary["created_at"])
+        self.assertIs(self.updated, dictionary["updated_at"])
+        self.assertIs(self.created, self.instance.__dict__["created_at"])
+
+    def test_read_parses_once(self):
+        """Test that reading a timestamp parses and keeps the datetime."""
+        created_at = self.instance.created_at
+        self.assertEqual(datetime(2017, 9, 28, 21, 3, 54, 52298), created_at)
+        self.assertIs(created_at, self.instance.__dict__["created_at"])
+        self.assertIs(created_at, self.instance.created_at)
+        self.assertEqual("2017-09-28T21:03:54.052298",
+                         self.instance.to_dict()["created_at"])
+
+    def test_str_shows_datetimes(self):
+        """Test that the string representation shows datetimes."""
+        self.assertIn("'updated_at': " +
+                      repr(datetime(2017, 9, 28, 21, 5, 54, 52302)),
+                      str(self.instance))
+
+    def test_set_datetime(self):
+        """Test that timestamps set as datetimes are formatted."""
+        with patch.object(models.storage, "touch"):
+            self.instance.updated_at = datetime(2020, 1, 2)
+        self.assertEqual("2020-01-02T00:00:00",
+                         self.instance.to_dict()["updated_at"])
+
+    def test_missing_timestamp(self):
+        """Test that a missing timestamp is an AttributeError."""
+        instance = BaseModel(id="2")
+        with self.assertRaises(AttributeError):
+            instance.created_at
+        self.assertFalse(hasattr(instance, "updated_at"))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,79 @@
+#!/usr/bin/python3
+"""Unit tests for the AggregateView class."""
+import unittest
+from models.engine.aggregate import AggregateView
+
+
+class TestAggregateView(unittest.TestCase):
+    """Test cases for the AggregateView class."""
+
+    def setUp(self):
+        """Build a view of the prices of a few places per city."""
+        self.view = AggregateView([("Place.1", ("c1", 80)),
+                                   ("Place.2", ("c2", 20)),
+                                   ("Place.3", ("c1", 50)),
+                                   ("Place.4", ("c1", "free")),
+                                   ("Place.5", (None, 10)),
+                                   ("Place.6", (["c1"], 10))])
+
+    def test_get(self):
+        """Test every aggregate of a group."""
+        view = self.view
+        self.assertEqual(4, len(view))
+        self.assertEqual(3, view.get("count", "c1"))
+        self.assertEqual(130, view.get("sum", "c1"))
+        self.assertEqual(50, view.get("min", "c1"))
+        self.assertEqual(80, view.get("max", "c1"))
+        self.assertEqual(65, view.get("avg", "c1"))
+        with self.assertRaises(ValueError):
+            view.get("median", "c1")
+
+    def test_missing_group(self):
+        """Test the aggregates of a group without instances."""
+        view = self.view
+        self.assertEqual(0, view.get("count", "c9"))
+        self.assertEqual(0, view.get("sum", "c9"))
+        self.assertIsNone(view.get("max", "c9"))
+        self.assertIsNone(view.get("avg", "c9"))
+        self.assertEqual(0, view.get("count", ["c1"]))
+
+    def test_groups(self):
+        """Test the aggregates of every group."""
+        self.assertEqual({"c1": 3, "c2": 1}, self.view.groups("count"))
+        self.assertEqual({"c1": 80, "c2": 20}, self.view.groups("max"))
+
+    def test_counts(self):
+        """Test a view counting the instances per group."""
+        view = AggregateView([("Review.1", ("p1",)), ("Review.2", ("p1",)),
+                              ("Review.3", ("p2",))])
+        self.assertEqual({"p1": 2, "p2": 1}, view.groups("count"))
+        self.assertEqual(0, view.get("sum", "p1"))
+        self.assertIsNone(view.get("avg", "p1"))
+
+    def test_add_and_remove(self):
+        """Test that changes update min and max, and empty groups go."""
+        view = self.view
+        view.add("Place.1", ("c2", 90))
+        self.assertEqual(50, view.get("max", "c1"))
+        self.assertEqual(90, view.get("max", "c2"))
+        self.assertEqual(55, view.get("avg", "c2"))
+        view.remove("Place.3")
+        view.remove("Place.9")
+        self.assertIsNone(view.get("min", "c1"))
+        self.assertEqual(1, view.get("count", "c1"))
+        self.assertEqual(0, view.get("sum", "c1"))
+        view.remove("Place.4")
+        self.assertEqual({"c2": 2}, view.groups("count"))
+
+    def test_float_sums_reset(self):
+        """Test that a group left without numbers sums to exactly 0."""
+        view = AggregateView([("Place.1", ("c1", 0.1)),
+                              ("Place.2", ("c1", 0.2))])
+        view.add("Place.3", ("c1", "x"))
+        view.remove("Place.1")
+        view.remove("Place.2")
+        self.assertEqual(0, view.get("sum", "c1"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+#!/usr/bin/python3
+"""Unit tests for the compact binary storage format."""
+import io
+import json
+import os
+import unittest
+from models.engine import binary_format
+from models.place import Place
+from models.user import User
+
+
+class TestBinaryFormat(unittest.TestCase):
+    """Test cases for the dump and load functions."""
+
+    def round_trip(self, entries):
+        """Return the entries dumped then loaded back."""
+        f = io.BytesIO()
+        binary_format.dump(entries, f)
+        f.seek(0)
+        return list(binary_format.load(f))
+
+    def test_round_trip_models(self):
+        """Test that to_dict() records are loaded back unchanged."""
+        us = User()
+        us.email = "b@b.com"
+        us.nickname = "B"
+        pl = Place()
+        pl.max_guest = 4
+        pl.latitude = 37.77
+        pl.amenity_ids = ["a", "b"]
+        entries = [(f"User.{us.id}", us.to_dict()),
+                   (f"Place.{pl.id}", pl.to_dict())]
+        self.assertEqual(entries, self.round_trip(entries))
+
+    def test_round_trip_unusual_values(self):
+        """Test ids that are not UUIDs and values that don't fit the schema."""
+        record = {"__class__": "Place", "id": "123",
+                  "created_at": "2017-09-28T21:05:54.119427",
+                  "updated_at": "2017-09-28T21:05:54.119572",
+                  "name": 7, "max_guest": 1 << 70, "price_by_night": "cheap",
+                  "owner": {"name": "Betty"}}
+        self.assertEqual([("Place.123", record)],
+                         self.round_trip([("Place.123", record)]))
+
+    def test_smaller_than_json(self):
+        """Test that the binary format is smaller than JSON."""
+        entries = {f"User.{us.id}": us.to_dict()
+                   for us in (User() for i in range(20))}
+        f = io.BytesIO()
+        binary_format.dump(entries.items(), f)
+        self.assertLess(len(f.getvalue()), len(json.dumps(entries)) / 2)
+
+    def test_round_trip_sections(self):
+        """Test that the records of a class split in several sections, and
+        texts holding NUL characters, are loaded back unchanged."""
+        users = [User() for i in range(5)]
+        users[0].first_name = "Bet\0ty"
+        users[1].id = users[1].id.upper()
+        entries = [(f"User.{us.id}", us.to_dict()) for us in users]
+        f = io.BytesIO()
+        binary_format.dump(entries, f, section_size=2)
+        self.assertEqual(3, f.getvalue().count(b"\x01\x04\x00\x00\x00User"))
+        f.seek(0)
+        self.assertEqual(entries, list(binary_format.load(f)))
+
+    def test_load_version_1(self):
+        """Test that files of the first version, packing every value on its
+        own, are still read."""
+        record = {"__class__": "User", "id": "123", "email": "b@b.com",
+                  "created_at": "2017-09-28T21:05:54.119427",
+                  "updated_at": "2017-09-28T21:05:54"}
+        fields = binary_format.schema("User")
+        data = [binary_format.magic, b"\x01\x01",
+                binary_format.pack_str("User"),
+                binary_format.u16.pack(len(fields))]
+        data += [binary_format.pack_str(name) +
+                 binary_format.type_codes[valtype]
+                 for name, valtype in fields.items()]
+        data += [binary_format.u32.pack(1), b"\x01",
+                 binary_format.pack_str("123"),
+                 binary_format.stamps.pack(
+                     binary_format.micros(record["created_at"]),
+                     binary_format.micros(record["updated_at"])),
+                 (1 << list(fields).index("email")).to_bytes(1, "little"),
+                 binary_format.pack_str("b@b.com"),
+                 binary_format.pack_str(json.dumps({"age": 7})), b"\x00"]
+        record["age"] = 7
+        self.assertEqual([("User.123", record)], list(
+            binary_format.load(io.BytesIO(b"".join(data)))))
+
+    def test_load_refuses_json(self):
+        """Test that a file without the magic bytes is refused."""
+        with self.assertRaises(ValueError):
+            list(binary_format.load(io.BytesIO(b"{}")))
+
+
+class TestBinaryConverter(unittest.TestCase):
+    """Test cases for the converter between JSON and binary files."""
+
+    def tearDown(self):
+        """Remove the converted files."""
+        for name in ("test.json", "test.bin", "test2.json"):
+            if os.path.exists(name):
+                os.remove(name)
+
+    def test_convert_both_ways(self):
+        """Test that converting to binary and back keeps every record."""
+        us = User()
+        entries = {f"User.{us.id}": us.to_dict()}
+        with open("test.json", "w") as f:
+            json.dump(entries, f)
+        self.assertEqual(0, binary_format.main(
+            ["", "to-binary", "test.json", "test.bin"]))
+        self.assertTrue(binary_format.is_binary("test.bin"))
+        self.assertFalse(binary_format.is_binary("test.json"))
+        self.assertEqual(0, binary_format.main(
+            ["", "to-json", "test.bin", "test2.json"]))
+        with open("test2.json", "r") as f:
+            self.assertEqual(entries, json.load(f))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+#!/usr/bin/python3
+"""Unit tests for the SerialCache class."""
+import gc
+import unittest
+from models.engine.cache import SerialCache, footprint
+
+
+class Item():
+    """A weakly referenceable object to cache forms of."""
+
+
+class TestSerialCache(unittest.TestCase):
+    """Test cases for the SerialCache class."""
+
+    def setUp(self):
+        """Build an empty cache and a few items."""
+        self.cache = SerialCache(1 << 20)
+        self.items = [Item() for _ in range(3)]
+
+    def test_get_and_put(self):
+        """Test that forms are found per instance and per form."""
+        item = self.items[0]
+        self.assertIsNone(self.cache.get(item, "str"))
+        self.cache.put(item, "str", "text")
+        self.cache.put(item, "json", "{}")
+        self.assertEqual("text", self.cache.get(item, "str"))
+        self.assertEqual("{}", self.cache.get(item, "json"))
+        self.assertIsNone(self.cache.get(self.items[1], "str"))
+        self.assertEqual(2, self.cache.hits)
+        self.assertEqual(2, self.cache.misses)
+        self.assertEqual(1, len(self.cache))
+        self.assertEqual(footprint("text") + footprint("{}"),
+                         self.cache.size())
+
+    def test_put_replaces(self):
+        """Test that a form put again replaces the former one."""
+        item = self.items[0]
+        self.cache.put(item, "str", "old")
+        self.cache.put(item, "str", "newer")
+        self.assertEqual("newer", self.cache.get(item, "str"))
+        self.assertEqual(footprint("newer"), self.cache.size())
+
+    def test_discard(self):
+        """Test that every form of a changed instance is forgotten."""
+        item = self.items[0]
+        self.cache.put(item, "str", "text")
+        self.cache.put(item, "dict", {"id": "1"})
+        self.cache.discard(item)
+        self.cache.discard(self.items[1])
+        self.assertIsNone(self.cache.get(item, "str"))
+        self.assertIsNone(self.cache.get(item, "dict"))
+        self.assertEqual(0, self.cache.size())
+
+    def test_stale_generation(self):
+        """Test that a form built before a discard is not cached."""
+        item = self.items[0]
+        generation = self.cache.generation()
+        self.cache.discard(item)
+        self.cache.put(item, "str", "old", generation)
+        self.assertIsNone(self.cache.get(item, "str"))
+        self.cache.put(item, "str", "new", self.cache.generation())
+        self.assertEqual("new", self.cache.get(item, "str"))
+
+    def test_lru_eviction(self):
+        """Test that the least recently used instances go first."""
+        size = footprint("x" * 100)
+        cache = SerialCache(2 * size)
+        first, second, third = self.items
+        cache.put(first, "str", "x" * 100)
+        cache.put(second, "str", "y" * 100)
+        cache.get(first, "str")
+        cache.put(third, "str", "z" * 100)
+        self.assertEqual("x" * 100, cache.get(first, "str"))
+        self.assertIsNone(cache.get(second, "str"))
+        self.assertEqual("z" * 100, cache.get(third, "str"))
+        self.assertLessEqual(cache.size(), 2 * size)
+
+    def test_disabled(self):
+        """Test that a cache of 0 bytes keeps nothing."""
+        cache = SerialCache(0)
+        cache.put(self.items[0], "str", "text")
+        self.assertIsNone(cache.get(self.items[0], "str"))
+        self.assertEqual(0, len(cache))
+
+    def test_weak_references(self):
+        """Test that the cache does not keep instances alive, nor hands
+        their forms to a new instance reusing their id."""
+        item = self.items.pop()
+        self.cache.put(item, "str", "text")
+        item_id = id(item)
+        del item
+        gc.collect()
+        for _ in range(100):
+            other = Item()
+            if id(other) == item_id:
+                break
+        self.assertIsNone(self.cache.get(other, "str"))
+
+    def test_clear(self):
+        """Test that clear forgets every form."""
+        for item in self.items:
+            self.cache.put(item, "str", "text")
+        self.cache.clear()
+        self.assertEqual(0, len(self.cache))
+        self.assertEqual(0, self.cache.size())
+
+
+if __name__ == "__main__":
+    unittest.main()
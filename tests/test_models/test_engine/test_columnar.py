@@ -0,0 +1,121 @@
+#!/usr/bin/python3
+"""Unit tests for the ColumnView class."""
+import unittest
+from models.engine import columnar
+from models.engine.columnar import ColumnView
+
+
+@unittest.skipIf(columnar.np is None, "numpy is not installed")
+class TestColumnView(unittest.TestCase):
+    """Test cases for the ColumnView class."""
+
+    def setUp(self):
+        """Build a view of a few places."""
+        self.view = ColumnView({"city_id": str, "price": int,
+                                "rating": float},
+                               [("Place.1", ("c1", 80, 4.5)),
+                                ("Place.2", ("c2", 20, None)),
+                                ("Place.3", ("c1", 50, 3.0)),
+                                ("Place.4", (None, "free", 5.0))])
+
+    def test_columns(self):
+        """Test that values are encoded and missing ones kept apart."""
+        self.assertEqual(4, len(self.view))
+        self.assertEqual(("city_id", "price", "rating"), self.view.names)
+        self.assertEqual(["c1", "c2", "c1", None],
+                         list(self.view.column("city_id")))
+        price = self.view.column("price")
+        self.assertEqual([80, 20, 50], list(price[:3]))
+        self.assertTrue(columnar.np.isnan(price[3]))
+        with self.assertRaises(ValueError):
+            price[0] = 1
+        with self.assertRaises(KeyError):
+            self.view.column("name")
+
+    def test_mask(self):
+        """Test the vectorized conditions."""
+        view = self.view
+        self.assertEqual(["Place.1", "Place.3"],
+                         view.keys(view.mask("city_id", "==", "c1")))
+        self.assertEqual(["Place.2"],
+                         view.keys(view.mask("city_id", "!=", "c1")))
+        self.assertEqual(["Place.1", "Place.3"],
+                         view.keys(view.mask("price", ">=", 50)))
+        self.assertEqual(["Place.1", "Place.2", "Place.3"],
+                         view.keys(view.mask("price", "!=", 0)))
+        self.assertEqual(["Place.2"],
+                         view.keys(view.mask("price", "in", [20, 30])))
+        self.assertEqual([], view.keys(view.mask("price", "<", "x")))
+        self.assertEqual(["Place.2", "Place.3"],
+                         view.keys(view.where(("price", "<", 60),
+                                              ("price", ">", 10))))
+        with self.assertRaises(ValueError):
+            view.mask("price", "~", 1)
+
+    def test_aggregate(self):
+        """Test the aggregates, which skip missing values."""
+        view = self.view
+        self.assertEqual(4, view.aggregate("count"))
+        self.assertEqual(3, view.aggregate("count", "price"))
+        self.assertEqual(150, view.aggregate("sum", "price"))
+        self.assertEqual(20, view.aggregate("min", "price"))
+        self.assertEqual(80, view.aggregate("max", "price"))
+        self.assertAlmostEqual(12.5 / 3, view.aggregate("avg", "rating"))
+        self.assertEqual(130, view.aggregate(
+            "sum", "price", view.mask("city_id", "==", "c1")))
+        self.assertIsNone(view.aggregate(
+            "max", "price", view.mask("city_id", "==", "c9")))
+        self.assertEqual(0, view.aggregate(
+            "sum", "price", view.mask("city_id", "==", "c9")))
+        with self.assertRaises(ValueError):
+            view.aggregate("sum", "city_id")
+        with self.assertRaises(ValueError):
+            view.aggregate("median", "price")
+
+    def test_group_by(self):
+        """Test the aggregates per value of a column."""
+        view = self.view
+        self.assertEqual({"c1": 65.0, "c2": 20.0},
+                         view.group_by("city_id", "avg", "price"))
+        self.assertEqual({"c1": 2, "c2": 1}, view.group_by("city_id",
+                                                           "count"))
+        self.assertEqual({80: 4.5, 50: 3.0},
+                         view.group_by("price", "max", "rating"))
+        self.assertEqual({4.5: 1, 3.0: 1, 5.0: 1},
+                         view.group_by("rating", "count"))
+        self.assertEqual({"c1": 50}, view.group_by(
+            "city_id", "min", "price", view.mask("rating", "<", 4)))
+
+    def test_add_and_remove(self):
+        """Test that rows are replaced, moved and appended."""
+        view = self.view
+        view.add("Place.2", ("c3", 30, 1.0))
+        view.remove("Place.1")
+        view.remove("Place.9")
+        self.assertEqual(3, len(view))
+        self.assertEqual({"Place.2", "Place.3", "Place.4"}, set(view.keys()))
+        self.assertEqual({"c1": 50, "c3": 30}, view.group_by(
+            "city_id", "sum", "price"))
+        for i in range(100):
+            view.add(f"Place.n{i}", ("c4", i, None))
+        self.assertEqual(103, len(view))
+        self.assertEqual(4950, view.group_by("city_id", "sum",
+                                             "price")["c4"])
+        for i in range(100):
+            view.remove(f"Place.n{i}")
+        self.assertEqual({"c1": 1, "c3": 1}, view.group_by("city_id",
+                                                           "count"))
+
+
+@unittest.skipIf(columnar.np is not None, "numpy is installed")
+class TestColumnViewMissing(unittest.TestCase):
+    """Test cases for the ColumnView class without numpy."""
+
+    def test_missing(self):
+        """Test that the view asks for numpy."""
+        with self.assertRaises(ImportError):
+            ColumnView({"price": int})
+
+
+if __name__ == "__main__":
+    unittest.main()
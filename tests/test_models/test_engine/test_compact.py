@@ -0,0 +1,133 @@
+#!/usr/bin/python3
+"""Unit tests for the compact variants of the model classes."""
+import copy
+import unittest
+from console import HBNBCommand
+from datetime import datetime
+from unittest.mock import patch
+import models
+from models.base_model import BaseModel
+from models.engine.compact import compact
+from models.engine.decoder import compile_decoder
+from models.engine.schema import columns
+from models.place import Place
+
+CompactPlace = compact(Place, columns(Place))
+
+
+class TestCompact(unittest.TestCase):
+    """Test cases for the compact variants."""
+
+    def setUp(self):
+        """Build a compact place outside of storage."""
+        with patch.object(models.storage, "new"):
+            self.place = CompactPlace()
+
+    def test_variant(self):
+        """Test that the variant passes for the class it derives from."""
+        place = self.place
+        self.assertIsInstance(place, Place)
+        self.assertEqual("Place", type(place).__name__)
+        self.assertEqual(columns(Place), columns(CompactPlace))
+        self.assertIn("name", CompactPlace.__slots__)
+
+    def test_slots(self):
+        """Test that attributes are kept in slots, ad-hoc ones apart, and
+        that no instance dictionary is created."""
+        place = self.place
+        place.name = "Loft"
+        place.pets = True
+        self.assertEqual("Loft", place.name)
+        self.assertTrue(place.pets)
+        self.assertEqual({"pets": True}, place._extra)
+        self.assertEqual({}, vars(BaseModel)["__dict__"].__get__(place))
+
+    def test_defaults(self):
+        """Test that unset attributes read as their class default."""
+        place = self.place
+        self.assertEqual("", place.name)
+        self.assertEqual(0, place.max_guest)
+        self.assertNotIn("name", place.__dict__)
+        with self.assertRaises(AttributeError):
+            place.pets
+        del place.id
+        with self.assertRaises(AttributeError):
+            place.id
+
+    def test_dict_view(self):
+        """Test that __dict__ reads and writes the attributes."""
+        place = self.place
+        place.name = "Loft"
+        place.pets = True
+        attributes = place.__dict__
+        self.assertEqual({"id": place.id, "created_at": place.created_at,
+                          "updated_at": place.updated_at, "name": "Loft",
+                          "pets": True}, attributes)
+        self.assertEqual(repr(attributes.copy()), repr(attributes))
+        attributes["max_guest"] = 4
+        del attributes["pets"]
+        self.assertEqual(4, place.max_guest)
+        self.assertFalse(hasattr(place, "pets"))
+        with self.assertRaises(KeyError):
+            attributes["latitude"]
+        with self.assertRaises(KeyError):
+            del attributes["pets"]
+
+    def test_to_dict_and_str(self):
+        """Test that to_dict and __str__ match those of the class."""
+        place = self.place
+        place.name = "Loft"
+        record = place.to_dict()
+        del record["__class__"]
+        plain = Place(**record)
+        self.assertEqual(plain.to_dict(), place.to_dict())
+        self.assertEqual("Place", place.to_dict()["__class__"])
+        self.assertEqual(str(plain), str(place))
+
+    def test_changes_touch(self):
+        """Test that setting and deleting attributes mark changes."""
+        with patch.object(models.storage, "touch") as touch:
+            self.place.name = "Loft"
+            del self.place.name
+            self.place.__dict__["name"] = "Quiet"
+        self.assertEqual(4, touch.call_count)
+        touch.assert_called_with(self.place)
+
+    def test_copy(self):
+        """Test that copies are compact instances with equal attributes."""
+        self.place.pets = True
+        other = copy.copy(self.place)
+        self.assertIs(CompactPlace, type(other))
+        self.assertEqual(self.place.to_dict(), other.to_dict())
+        other.pets = False
+        self.assertTrue(self.place.pets)
+
+    def test_decoder(self):
+        """Test that decoded records fill the slots."""
+        record = {"__class__": "Place", "id": "1", "name": "Loft",
+                  "created_at": "2017-09-28T21:03:54.052298",
+                  "updated_at": "2017-09-28T21:05:54.052302", "pets": True}
+        place = compile_decoder(CompactPlace)(record)
+        self.assertIs(CompactPlace, type(place))
+        self.assertIs(record["created_at"], place.__dict__["created_at"])
+        self.assertEqual(datetime(2017, 9, 28, 21, 3, 54, 52298),
+                         place.created_at)
+        self.assertIsInstance(place.__dict__["created_at"], datetime)
+        self.assertEqual({"pets": True}, place._extra)
+        self.assertEqual(record, place.to_dict())
+
+    def test_console_update(self):
+        """Test that the console converts values to the declared types."""
+        place = CompactPlace()
+        self.addCleanup(models.storage.delete, place)
+        with patch.object(models.storage, "save"):
+            HBNBCommand().onecmd(f"update Place {place.id} max_guest 4")
+            HBNBCommand().onecmd(f'update Place {place.id} '
+                                 f'{{"latitude": "1.5", "pets": "yes"}}')
+        self.assertEqual(4, place.max_guest)
+        self.assertEqual(1.5, place.latitude)
+        self.assertEqual({"pets": "yes"}, place._extra)
+
+
+if __name__ == "__main__":
+    unittest.main()
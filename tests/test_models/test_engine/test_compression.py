@@ -0,0 +1,48 @@
+#!/usr/bin/python3
+"""Unit tests for the streaming compression codecs."""
+import os
+import unittest
+from models.engine import compression
+
+
+class TestCompression(unittest.TestCase):
+    """Test cases for the compression module."""
+
+    def tearDown(self):
+        """Remove the test file."""
+        if os.path.exists("test.bin"):
+            os.remove("test.bin")
+
+    def test_codec_for(self):
+        """Test that the codec is found from the file extension."""
+        self.assertEqual("gzip", compression.codec_for("file.json.gz"))
+        self.assertEqual("zlib", compression.codec_for("file.json.zz"))
+        self.assertEqual("lzma", compression.codec_for("file.json.xz"))
+        self.assertIsNone(compression.codec_for("file.json"))
+
+    def test_round_trip_and_detect(self):
+        """Test that every codec reads back what it wrote."""
+        data = b'{"User.1": {"id": "1"}}' * 5000
+        for codec in ("gzip", "zlib", "lzma", None):
+            with compression.open_file("test.bin", "wb", codec) as f:
+                for i in range(0, len(data), 1000):
+                    f.write(data[i:i + 1000])
+            self.assertEqual(codec, compression.detect("test.bin"))
+            if codec is not None:
+                self.assertLess(os.path.getsize("test.bin"), len(data) / 10)
+            with compression.open_file("test.bin", "rb") as f:
+                self.assertEqual(data[:7], f.peek(7)[:7])
+                self.assertEqual(data, f.read())
+
+    def test_zlib_small_reads(self):
+        """Test that a zlib stream can be read a few bytes at a time."""
+        data = bytes(range(256)) * 100
+        with compression.open_file("test.bin", "wb", "zlib") as f:
+            f.write(data)
+        with compression.open_file("test.bin", "rb") as f:
+            chunks = iter(lambda: f.read(7), b"")
+            self.assertEqual(data, b"".join(chunks))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,238 @@
+#!/usr/bin/python3
+"""Unit tests for the DBStorage class."""
+import os
+import unittest
+from unittest.mock import patch
+from models.engine import columnar
+from models.engine.db_storage import DBStorage, columns
+from models.place import Place
+from models.review import Review
+from models.user import User
+
+
+class TestDBStorage(unittest.TestCase):
+    """Test cases for the DBStorage class."""
+
+    def setUp(self):
+        """Point models.storage at a fresh SQLite database."""
+        with patch.dict(os.environ, {"HBNB_DB_PATH": "test.db"}):
+            self.storage = DBStorage()
+        self.storage.reload()
+        self.patcher = patch("models.storage", self.storage)
+        self.patcher.start()
+
+    def tearDown(self):
+        """Restore models.storage and remove the database."""
+        self.patcher.stop()
+        os.remove("test.db")
+
+    def reopen(self):
+        """Return a new DBStorage on the same database."""
+        with patch.dict(os.environ, {"HBNB_DB_PATH": "test.db"}):
+            storage = DBStorage()
+        storage.reload()
+        return storage
+
+    def test_columns(self):
+        """Test that the declared attributes become typed columns."""
+        self.assertEqual({"place_id": str, "user_id": str, "text": str},
+                         columns(Review))
+        self.assertIs(list, columns(Place)["amenity_ids"])
+
+    def test_new_save_reload(self):
+        """Test that saved objects are read back from the database."""
+        us = User()
+        us.first_name = "Betty"
+        us.nickname = "B"
+        pl = Place()
+        pl.amenity_ids = ["a", "b"]
+        self.storage.save()
+        objects = self.reopen().all()
+        self.assertEqual("Betty", objects[f"User.{us.id}"].first_name)
+        self.assertEqual("B", objects[f"User.{us.id}"].nickname)
+        self.assertEqual(["a", "b"], objects[f"Place.{pl.id}"].amenity_ids)
+        self.assertEqual(us.created_at, objects[f"User.{us.id}"].created_at)
+        self.assertNotIn("last_name", objects[f"User.{us.id}"].__dict__)
+
+    def test_lookup_returns_same_instance(self):
+        """Test that looking a key up twice returns the same instance."""
+        us = User()
+        self.storage.save()
+        storage = self.reopen()
+        self.assertIs(storage.all()[f"User.{us.id}"],
+                      storage.all()[f"User.{us.id}"])
+
+    def test_update_and_delete(self):
+        """Test that only changed rows are written on save."""
+        us = User()
+        rv = Review()
+        self.storage.save()
+        storage = self.reopen()
+        with patch("models.storage", storage):
+            storage.all()[f"User.{us.id}"].email = "b@b.com"
+            storage.delete(storage.all()[f"Review.{rv.id}"])
+            storage.save()
+        objects = self.reopen().all()
+        self.assertEqual("b@b.com", objects[f"User.{us.id}"].email)
+        self.assertNotIn(f"Review.{rv.id}", objects)
+
+    def test_batch(self):
+        """Test that a batch is saved once, and that an exception drops
+        the changes made inside it."""
+        us = User()
+        with self.storage.batch():
+            User().save()
+            self.assertEqual(0, self.reopen().count())
+        self.assertEqual(2, self.reopen().count())
+        with self.assertRaises(ValueError):
+            with self.storage.transaction():
+                us.first_name = "Betty"
+                pl = Place()
+                pl.save()
+                raise ValueError
+        self.storage.save()
+        storage = self.reopen()
+        self.assertNotIn(f"Place.{pl.id}", storage.all())
+        self.assertNotIn("first_name",
+                         storage.all()[f"User.{us.id}"].__dict__)
+        self.assertNotIn("first_name",
+                         self.storage.all()[f"User.{us.id}"].__dict__)
+        self.assertNotIn("first_name", us.__dict__)
+
+    def test_batch_restores_changed_objects(self):
+        """Test that an exception undoes the changes made inside a batch
+        to objects already changed before it."""
+        pl = Place()
+        pl.name = "before"
+        with self.assertRaises(ValueError):
+            with self.storage.batch():
+                pl.name = "inside"
+                self.storage.delete(pl)
+                raise ValueError
+        self.assertEqual("before", pl.name)
+        self.assertIs(pl, self.storage.all()[f"Place.{pl.id}"])
+        self.storage.save()
+        self.assertEqual("before",
+                         self.reopen().all()[f"Place.{pl.id}"].name)
+
+    def test_compact(self):
+        """Test that compact saves the pending changes."""
+        us = User()
+        self.storage.compact()
+        self.assertIn(f"User.{us.id}", self.reopen().all())
+
+    def test_count(self):
+        """Test that count accounts for saved and pending objects."""
+        User()
+        User()
+        self.storage.save()
+        rv = Review()
+        self.assertEqual(2, self.storage.count("User"))
+        self.assertEqual(3, self.storage.count())
+        self.assertEqual(3, len(self.storage.all()))
+        self.storage.delete(rv)
+        self.assertEqual(2, self.storage.count())
+
+    def test_lookup(self):
+        """Test that lookup finds saved and pending objects by attribute."""
+        rv1 = Review()
+        rv1.place_id = "p1"
+        rv2 = Review()
+        rv2.place_id = "p2"
+        self.storage.save()
+        rv3 = Review()
+        rv3.place_id = "p1"
+        rv2.place_id = "p1"
+        self.assertEqual({rv1.id, rv2.id, rv3.id},
+                         {obj.id for obj in
+                          self.storage.lookup("Review", "place_id", "p1")})
+        self.assertEqual([], self.storage.lookup("Review", "place_id", "p2"))
+        self.assertEqual([rv1.id], [obj.id for obj in self.reopen().lookup(
+            "Review", "place_id", "p1")])
+
+    def test_between(self):
+        """Test that between orders saved and pending objects."""
+        prices = [80, 20, 50]
+        places = []
+        for price in prices:
+            places.append(Place())
+            places[-1].price_by_night = price
+        self.storage.save()
+        places[0].price_by_night = 40
+        self.assertEqual([20, 40, 50], [
+            obj.price_by_night for obj in
+            self.storage.between("Place", "price_by_night", 10, 60)])
+        self.assertEqual([50, 40], [
+            obj.price_by_night for obj in
+            self.storage.between("Place", "price_by_night", 30,
+                                 reverse=True)])
+
+    def test_geo(self):
+        """Test the spatial queries over saved places."""
+        paris = Place()
+        paris.latitude, paris.longitude = 48.8566, 2.3522
+        london = Place()
+        london.latitude, london.longitude = 51.5072, -0.1276
+        self.storage.save()
+        self.assertEqual([paris], self.storage.radius("Place", 48.8, 2.3,
+                                                      50))
+        self.assertEqual([london, paris], self.storage.nearest(
+            "Place", 52.0, 0.0, 2))
+        self.assertEqual([london], self.storage.bbox("Place", 50, -1, 52, 1))
+
+    def test_search(self):
+        """Test that search ranks saved and pending texts."""
+        pl = Place()
+        pl.name = "Cozy loft"
+        self.storage.save()
+        rv = Review()
+        rv.text = "The loft was cozy, so cozy"
+        self.assertEqual([rv, pl], self.storage.search("cozy"))
+        self.assertEqual([pl], self.storage.search("loft", "Place"))
+
+    def test_query(self):
+        """Test that queries use the SQL indexes and see pending objects."""
+        rv1 = Review()
+        rv1.place_id = "p1"
+        self.storage.save()
+        rv2 = Review()
+        rv2.place_id = "p1"
+        query = self.storage.query("Review").where(place_id="p1")
+        self.assertEqual("index lookup Review.place_id == 'p1'",
+                         query.explain())
+        self.assertEqual({rv1.id, rv2.id}, {obj.id for obj in query})
+        self.assertEqual(2, self.storage.query("Review").count())
+        self.assertEqual([], self.storage.query("Nope").all())
+
+    @unittest.skipIf(columnar.np is None, "numpy is not installed")
+    def test_columnar_view(self):
+        """Test the columnar view of the stored and pending objects."""
+        pl1 = Place()
+        pl1.city_id = "c1"
+        pl1.price_by_night = 80
+        self.storage.save()
+        pl2 = Place()
+        pl2.city_id = "c1"
+        pl2.price_by_night = 40
+        view = self.storage.columns("Place")
+        self.assertEqual({"c1": 60.0}, view.group_by("city_id", "avg",
+                                                     "price_by_night"))
+        self.assertEqual(0, len(self.storage.columns("Nope")))
+
+    def test_aggregate(self):
+        """Test the aggregate views of the stored and pending objects."""
+        pl1 = Place()
+        pl1.city_id = "c1"
+        pl1.price_by_night = 80
+        self.storage.save()
+        pl2 = Place()
+        pl2.city_id = "c1"
+        pl2.price_by_night = 40
+        self.assertEqual({"c1": 2}, self.storage.aggregate("places_per_city"))
+        self.assertEqual(60, self.storage.aggregate("price_per_city", "c1"))
+        with self.assertRaises(KeyError):
+            self.storage.aggregate("places_per_planet")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+#!/usr/bin/python3
+"""Unit tests for the decoders of the model classes."""
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+import models
+from models.base_model import BaseModel
+from models.engine.decoder import compile_decoder, decoders
+from models.place import Place
+
+
+class Custom(BaseModel):
+    """A model overriding __init__."""
+
+    def __init__(self, *args, **kwargs):
+        """Remember that __init__ ran."""
+        super().__init__(*args, **kwargs)
+        self.__dict__["built"] = True
+
+
+class TestDecoders(unittest.TestCase):
+    """Test cases for the decoders."""
+
+    def setUp(self):
+        """Build the record of a place."""
+        self.record = {"__class__": "Place", "id": "1", "name": "Loft",
+                       "created_at": "2017-09-28T21:03:54.052298",
+                       "updated_at": "2017-09-28T21:05:54.052302",
+                       "amenity_ids": ["a"]}
+
+    def test_registry(self):
+        """Test that every model class has a decoder."""
+        self.assertEqual({"BaseModel", "User", "State", "City", "Amenity",
+                          "Place", "Review"}, set(decoders))
+
+    def test_decode(self):
+        """Test that a decoded instance matches one built by __init__."""
+        kwargs = dict(self.record)
+        del kwargs["__class__"]
+        expected = Place(**kwargs)
+        obj = decoders["Place"](self.record)
+        self.assertIsInstance(obj, Place)
+        self.assertEqual(expected.to_dict(), obj.to_dict())
+        self.assertEqual(datetime(2017, 9, 28, 21, 3, 54, 52298),
+                         obj.created_at)
+        self.assertEqual("Place", self.record["__class__"])
+        self.assertIsInstance(self.record["created_at"], str)
+
+    def test_shared_ids(self):
+        """Test that decoded ids and foreign keys are interned, unless
+        references leaves them out."""
+        self.record["user_id"] = "".join(["user", "-1"])
+        first = decoders["Place"](self.record)
+        self.record["user_id"] = "".join(["user", "-1"])
+        second = decoders["Place"](dict(self.record, id="".join("2")))
+        self.assertIs(first.user_id, second.user_id)
+        self.assertIs(first.id, decoders["Place"](self.record).id)
+        plain = compile_decoder(Place, ())(self.record)
+        self.assertIs(self.record["user_id"], plain.user_id)
+        self.assertIsNot(first.user_id, plain.user_id)
+
+    def test_timestamps_kept_as_saved(self):
+        """Test that decoding neither parses nor formats timestamps."""
+        obj = decoders["Place"](self.record)
+        self.assertIs(self.record["created_at"], obj.__dict__["created_at"])
+        self.assertIs(self.record["updated_at"],
+                      obj.to_dict()["updated_at"])
+
+    def test_timestamp_not_string(self):
+        """Test that records with other timestamps go through __init__."""
+        self.record["created_at"] = None
+        with self.assertRaises(TypeError):
+            decoders["Place"](self.record)
+
+    def test_bypasses_storage(self):
+        """Test that decoding neither registers nor touches instances."""
+        with patch.object(models.storage, "new") as new, \
+                patch.object(models.storage, "touch") as touch:
+            decoders["Place"](self.record)
+        new.assert_not_called()
+        touch.assert_not_called()
+
+    def test_missing_timestamp(self):
+        """Test that records without timestamps go through __init__."""
+        del self.record["updated_at"]
+        obj = decoders["Place"](self.record)
+        self.assertEqual("Loft", obj.name)
+        self.assertIsInstance(obj.created_at, datetime)
+        self.assertNotIn("updated_at", obj.__dict__)
+
+    def test_overridden_init(self):
+        """Test that classes overriding __init__ are built through it."""
+        obj = compile_decoder(Custom)({"__class__": "Custom", "id": "2"})
+        self.assertTrue(obj.built)
+        self.assertEqual("2", obj.id)
+
+
+if __name__ == "__main__":
+    unittest.main()
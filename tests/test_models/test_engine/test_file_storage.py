@@ -1,14 +1,29 @@
 #!/usr/bin/python3
 import unittest
+import json
 import os
+import re
+import subprocess
+import sys
+import models
+from io import StringIO
+from console import HBNBCommand
 from models.base_model import BaseModel
-from models.engine.file_storage import FileStorage
+from models import base_model
+from models.engine import columnar
+from models.engine import compression
+from models.engine import file_storage
+from models.engine.cache import cache
+from models.engine.file_storage import FileStorage, iter_shard
+from models.engine.mapped import MappedFile
+from models.engine.text_index import TextIndex
 from models.user import User
 from models.state import State
 from models.place import Place
 from models.city import City
 from models.amenity import Amenity
 from models.review import Review
+from unittest.mock import patch
 
 class TestFileStorage(unittest.TestCase):
     """Test cases for the FileStorage class."""
@@ -163,6 +178,1759 @@ class TestFileStorage(unittest.TestCase):
         with self.assertRaises(TypeError):
             models.storage.reload(None)
 
+
+class TestFileStorageDirtyTracking(unittest.TestCase):
+    """Test cases for the incremental serialization of FileStorage."""
+
+    def setUp(self):
+        """Start every test on an empty, saved storage."""
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        models.storage.save()
+
+    def tearDown(self):
+        """Restore the original file."""
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def test_setattr_marks_dirty(self):
+        """Test that setting an attribute marks the stored object as dirty."""
+        us = User()
+        models.storage.save()
+        self.assertEqual(set(), FileStorage._FileStorage__dirty)
+        us.first_name = "Betty"
+        self.assertEqual({f"User.{us.id}"}, FileStorage._FileStorage__dirty)
+
+    def test_setattr_marks_dirty_once_set(self):
+        """Test that a write landing while an attribute is being set does
+        not clear the mark of the change."""
+        us = User()
+        models.storage.save()
+        touch = FileStorage.touch
+        calls = []
+
+        def saving(storage, obj, **kwargs):
+            touch(storage, obj, **kwargs)
+            if not calls:
+                storage.save()
+            calls.append(kwargs)
+        with patch.object(FileStorage, "touch", saving):
+            us.first_name = "Betty"
+        self.assertEqual({f"User.{us.id}"}, FileStorage._FileStorage__dirty)
+
+    def test_save_encodes_only_dirty_objects(self):
+        """Test that a save only builds the records of changed objects."""
+        us = User()
+        pl = Place()
+        models.storage.save()
+        pl.name = "Cozy Cabin"
+        with patch.object(base_model, "record",
+                          side_effect=base_model.record) as record:
+            models.storage.save()
+        record.assert_called_once_with(pl)
+        with open("file.json", "r") as f:
+            saved = json.load(f)
+        self.assertEqual("Cozy Cabin", saved[f"Place.{pl.id}"]["name"])
+        self.assertIn(f"User.{us.id}", saved)
+
+    def test_deleted_object_not_saved(self):
+        """Test that a deleted object is dropped from the next save."""
+        rv = Review()
+        models.storage.save()
+        models.storage.delete(rv)
+        models.storage.save()
+        with open("file.json", "r") as f:
+            self.assertNotIn(f"Review.{rv.id}", json.load(f))
+
+
+class TestFileStorageJournal(unittest.TestCase):
+    """Test cases for the journaled mode of FileStorage."""
+
+    def setUp(self):
+        """Switch storage to journaled mode on an empty file."""
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__journaled = True
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__dirty.clear()
+
+    def tearDown(self):
+        """Restore full-file mode and the original file."""
+        FileStorage._FileStorage__journaled = False
+        for name in ("file.json", "file.json.journal"):
+            try:
+                os.remove(name)
+            except IOError:
+                pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def test_save_appends_only_changes(self):
+        """Test that a save only journals the objects changed since the
+        last one."""
+        us = User()
+        models.storage.save()
+        pl = Place()
+        models.storage.save()
+        with open("file.json.journal", "r") as f:
+            lines = f.readlines()
+        self.assertEqual(2, len(lines))
+        self.assertIn(f"User.{us.id}", lines[0])
+        self.assertIn(f"Place.{pl.id}", lines[1])
+        self.assertFalse(os.path.exists("file.json"))
+
+    def test_reload_replays_journal(self):
+        """Test that reload replays updates and deletions from the journal."""
+        us = User()
+        rv = Review()
+        models.storage.save()
+        us.first_name = "Betty"
+        us.save()
+        models.storage.delete(rv)
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        reloaded_objects = models.storage.all()
+        self.assertEqual("Betty", reloaded_objects[f"User.{us.id}"].first_name)
+        self.assertNotIn(f"Review.{rv.id}", reloaded_objects)
+
+    def test_full_save_truncates_journal(self):
+        """Test that writing the whole file empties the journal."""
+        us = User()
+        models.storage.save()
+        FileStorage._FileStorage__journaled = False
+        models.storage.save()
+        self.assertFalse(os.path.exists("file.json.journal"))
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertIn(f"User.{us.id}", models.storage.all())
+
+    def test_save_after_torn_record(self):
+        """Test that the objects saved after an interrupted append are
+        reloaded."""
+        User()
+        models.storage.save()
+        with open("file.json.journal", "a") as f:
+            f.write('{"key": "User.torn", "val')
+        users = [User() for i in range(3)]
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertEqual(4, models.storage.count("User"))
+        for us in users:
+            self.assertIn(f"User.{us.id}", models.storage.all())
+
+
+class TestFileStorageShards(unittest.TestCase):
+    """Test cases for the sharded layout of FileStorage."""
+
+    def setUp(self):
+        """Switch storage to two partitions per class."""
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__shards = 2
+        FileStorage._FileStorage__objects = {}
+
+    def tearDown(self):
+        """Restore the single file layout and the original file."""
+        FileStorage._FileStorage__shards = 0
+        for name in os.listdir("file.json.shards"):
+            os.remove(os.path.join("file.json.shards", name))
+        os.rmdir("file.json.shards")
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def test_save_one_shard_per_class(self):
+        """Test that every class is saved to its own partitions."""
+        users = [User() for i in range(10)]
+        Place()
+        models.storage.save()
+        names = os.listdir("file.json.shards")
+        self.assertEqual({"User.0.json", "User.1.json"},
+                         {name for name in names if name.startswith("User")})
+        self.assertEqual(1, len([n for n in names if n.startswith("Place")]))
+        self.assertFalse(os.path.exists("file.json"))
+
+    def test_save_rewrites_only_changed_shards(self):
+        """Test that untouched shards are not rewritten."""
+        us = User()
+        pl = Place()
+        models.storage.save()
+        place_shard = [os.path.join("file.json.shards", name)
+                       for name in os.listdir("file.json.shards")
+                       if name.startswith("Place")][0]
+        os.utime(place_shard, (0, 0))
+        us.first_name = "Betty"
+        models.storage.save()
+        self.assertEqual(0, os.path.getmtime(place_shard))
+
+    def test_reload_shards(self):
+        """Test that reload reads every shard back."""
+        users = [User() for i in range(10)]
+        rv = Review()
+        models.storage.save()
+        models.storage.delete(rv)
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        for us in users:
+            self.assertIn(f"User.{us.id}", models.storage.all())
+        self.assertNotIn(f"Review.{rv.id}", models.storage.all())
+        self.assertFalse(any(name.startswith("Review")
+                             for name in os.listdir("file.json.shards")))
+
+    def test_import_with_shards(self):
+        """Test that importing models reads several shards without waiting
+        on its own import."""
+        users = [User() for i in range(10)]
+        Place()
+        models.storage.save()
+        root = os.path.dirname(os.path.dirname(os.path.abspath(
+            models.__file__)))
+        env = dict(os.environ, HBNB_FILE_SHARDS="2", PYTHONPATH=root)
+        result = subprocess.run(
+            [sys.executable, "-c",
+             "from models.engine import file_storage; "
+             "file_storage.processors = lambda: 2; "
+             "import models; print(len(models.storage.all()))"],
+            env=env, capture_output=True, text=True, timeout=60)
+        self.assertEqual(0, result.returncode, result.stderr)
+        self.assertEqual("11", result.stdout.strip())
+
+    def test_reload_parses_in_other_processes(self):
+        """Test that several shards are parsed by other processes and
+        built here."""
+        users = [User() for i in range(10)]
+        Place()
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        with patch.object(file_storage, "processors", return_value=2), \
+                patch.object(file_storage, "iter_records",
+                             side_effect=file_storage.iter_records) as read:
+            models.storage.reload()
+        read.assert_not_called()
+        self.assertEqual(11, models.storage.count())
+        for us in users:
+            self.assertEqual(us.to_dict(),
+                             models.storage.all()[f"User.{us.id}"].to_dict())
+
+    def test_lazy_count_parses_one_class(self):
+        """Test that counting a class in lazy mode only parses its shards."""
+        users = [User() for i in range(10)]
+        Place()
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        with patch.object(FileStorage, "_FileStorage__lazy", True), \
+                patch.object(FileStorage, "_FileStorage__mapped", False), \
+                patch.object(file_storage, "iter_records",
+                             side_effect=file_storage.iter_records) as read:
+            models.storage.reload()
+            self.assertEqual(10, models.storage.count("User"))
+            self.assertEqual(10, len(list(models.storage.query("User"))))
+            shards = {os.path.basename(call.args[0])
+                      for call in read.call_args_list}
+            self.assertEqual({"User.0.json", "User.1.json"}, shards)
+            self.assertEqual(1, models.storage.count("Place"))
+            self.assertEqual(11, models.storage.count())
+
+
+class TestFileStorageLazy(unittest.TestCase):
+    """Test cases for the lazy mode of FileStorage."""
+
+    def setUp(self):
+        """Save a few objects and reload them lazily."""
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        self.us = User()
+        self.pl = Place()
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__lazy = True
+        models.storage.reload()
+
+    def tearDown(self):
+        """Restore eager mode and the original file."""
+        FileStorage._FileStorage__lazy = False
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def test_reload_builds_nothing(self):
+        """Test that reload does not build any object."""
+        self.assertEqual(0, dict.__len__(models.storage.all()))
+
+    def test_lookup_builds_one_object(self):
+        """Test that looking a key up only builds its object."""
+        us = models.storage.all()[f"User.{self.us.id}"]
+        self.assertEqual(self.us.id, us.id)
+        self.assertEqual(1, dict.__len__(models.storage.all()))
+
+    def test_save_keeps_unbuilt_records(self):
+        """Test that saving writes back the objects that were never built."""
+        us = models.storage.all()[f"User.{self.us.id}"]
+        us.first_name = "Betty"
+        models.storage.save()
+        with open("file.json", "r") as f:
+            saved = json.load(f)
+        self.assertEqual("Betty", saved[f"User.{self.us.id}"]["first_name"])
+        self.assertIn(f"Place.{self.pl.id}", saved)
+
+    def test_save_copies_unbuilt_texts(self):
+        """Test that saving copies the text the unbuilt records were read
+        from instead of encoding them again."""
+        with open("file.json", "r") as f:
+            before = json.load(f)
+        with patch.object(json, "dumps", wraps=json.dumps) as dumps:
+            models.storage.save()
+        self.assertEqual([], [call for call in dumps.call_args_list
+                              if isinstance(call.args[0], dict)])
+        with open("file.json", "r") as f:
+            self.assertEqual(before, json.load(f))
+        us = models.storage.all()[f"User.{self.us.id}"]
+        us.first_name = "Betty"
+        models.storage.save()
+        with open("file.json", "r") as f:
+            saved = json.load(f)
+        self.assertEqual("Betty", saved[f"User.{self.us.id}"]["first_name"])
+        self.assertEqual(before[f"Place.{self.pl.id}"],
+                         saved[f"Place.{self.pl.id}"])
+
+
+class TestFileStorageMapped(unittest.TestCase):
+    """Test cases for the memory-mapped mode of FileStorage."""
+
+    def setUp(self):
+        """Save a few objects with their index and map them."""
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__mapped = True
+        FileStorage._FileStorage__objects = {}
+        self.us = User()
+        self.pl = Place()
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+
+    def tearDown(self):
+        """Restore eager mode and the original file."""
+        FileStorage._FileStorage__mapped = False
+        FileStorage._FileStorage__objects = {}
+        for name in ("file.json", "file.json.idx"):
+            try:
+                os.remove(name)
+            except IOError:
+                pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+
+    def test_save_writes_index(self):
+        """Test that saving in mapped mode writes the offset index."""
+        self.assertTrue(os.path.exists("file.json.idx"))
+
+    def test_lookup_reads_one_record(self):
+        """Test that a lookup decodes a single record."""
+        objects = models.storage.all()
+        self.assertIn(f"User.{self.us.id}", objects)
+        self.assertEqual(0, dict.__len__(objects))
+        self.assertEqual(self.pl.id, objects[f"Place.{self.pl.id}"].id)
+        self.assertEqual(1, dict.__len__(objects))
+        self.assertEqual(2, len(objects))
+
+    def test_update_and_delete(self):
+        """Test that changes are saved while the file is mapped."""
+        objects = models.storage.all()
+        objects[f"User.{self.us.id}"].first_name = "Betty"
+        models.storage.delete(objects[f"Place.{self.pl.id}"])
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        objects = models.storage.all()
+        self.assertEqual("Betty", objects[f"User.{self.us.id}"].first_name)
+        self.assertNotIn(f"Place.{self.pl.id}", objects)
+
+    def test_count_reads_index(self):
+        """Test that count uses the index without listing the keys."""
+        models.storage.new(User())
+        models.storage.delete(models.storage.all()[f"Place.{self.pl.id}"])
+        us = models.storage.all()[f"User.{self.us.id}"]
+        us.first_name = "Betty"
+        with patch.object(MappedFile, "keys") as keys:
+            self.assertEqual(2, models.storage.count("User"))
+            self.assertEqual(0, models.storage.count("Place"))
+            self.assertEqual(2, models.storage.count())
+        keys.assert_not_called()
+
+    def test_save_streams_entries(self):
+        """Test that a save hands its entries to the writer one by one."""
+        for _ in range(3):
+            Place()
+        passed = []
+        write = FileStorage._FileStorage__write
+
+        def spy(self, path, entries, *args, **kwargs):
+            passed.append(entries)
+            return write(self, path, entries, *args, **kwargs)
+        with patch.object(FileStorage, "_FileStorage__write", spy):
+            models.storage.save()
+        self.assertEqual(1, len(passed))
+        self.assertNotIsInstance(passed[0], (list, tuple))
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertEqual(4, models.storage.count("Place"))
+
+
+class TestFileStorageBinary(unittest.TestCase):
+    """Test cases for saving FileStorage in the binary format."""
+
+    def setUp(self):
+        """Switch storage to the binary format."""
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__binary = True
+        FileStorage._FileStorage__objects = {}
+
+    def tearDown(self):
+        """Restore the JSON format and the original file."""
+        FileStorage._FileStorage__binary = False
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def test_save_and_reload(self):
+        """Test that objects saved in binary are reloaded unchanged."""
+        us = User()
+        us.first_name = "Betty"
+        pl = Place()
+        models.storage.save()
+        with open("file.json", "rb") as f:
+            self.assertEqual(b"HBNB", f.read(4))
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        objects = models.storage.all()
+        self.assertEqual(us.to_dict(), objects[f"User.{us.id}"].to_dict())
+        self.assertEqual(pl.to_dict(), objects[f"Place.{pl.id}"].to_dict())
+
+    def test_json_reader_picks_binary(self):
+        """Test that a binary file is read back after switching to JSON."""
+        us = User()
+        models.storage.save()
+        FileStorage._FileStorage__binary = False
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertIn(f"User.{us.id}", models.storage.all())
+
+    def test_save_reuses_packed_records(self):
+        """Test that a save only packs the records of changed objects."""
+        us = User()
+        pl = Place()
+        models.storage.save()
+        pl.name = "Loft"
+        with patch.object(base_model, "record",
+                          side_effect=base_model.record) as record:
+            models.storage.save()
+        record.assert_called_once_with(pl)
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertEqual("Loft",
+                         models.storage.all()[f"Place.{pl.id}"].name)
+
+
+class TestFileStorageCompression(unittest.TestCase):
+    """Test cases for saving FileStorage through a compression codec."""
+
+    def setUp(self):
+        """Move the original file away."""
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def tearDown(self):
+        """Restore no compression and the original file."""
+        FileStorage._FileStorage__codec = None
+        FileStorage._FileStorage__binary = False
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def test_save_and_reload(self):
+        """Test that compressed JSON and binary files are read back."""
+        us = User()
+        for codec in ("gzip", "zlib", "lzma"):
+            for binary in (False, True):
+                FileStorage._FileStorage__codec = codec
+                FileStorage._FileStorage__binary = binary
+                models.storage.save()
+                with open("file.json", "rb") as f:
+                    self.assertNotIn(us.id.encode(), f.read())
+                FileStorage._FileStorage__objects = {}
+                models.storage.reload()
+                reloaded = models.storage.all()[f"User.{us.id}"]
+                self.assertEqual(us.to_dict(), reloaded.to_dict())
+
+    def test_save_streams_chunks(self):
+        """Test that the document is handed to the file in chunks."""
+        for i in range(2000):
+            User()
+        opened = compression.open_file
+        sizes = []
+
+        def spying(*args):
+            f = opened(*args)
+            write = f.write
+
+            def counting(data):
+                sizes.append(len(data))
+                return write(data)
+            f.write = counting
+            return f
+        with patch.object(compression, "open_file", spying):
+            models.storage.save()
+        self.assertGreater(len(sizes), 2)
+        self.assertLess(max(sizes), 2 << 16)
+        with open("file.json", "rb") as f:
+            self.assertEqual(sum(sizes), len(f.read()))
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertEqual(2000, len(models.storage.all()))
+
+
+class TestFileStorageWriteBehind(unittest.TestCase):
+    """Test cases for the write-behind mode of FileStorage."""
+
+    def setUp(self):
+        """Switch storage to write-behind mode."""
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__write_behind = 30
+
+    def tearDown(self):
+        """Restore synchronous saves and the original file."""
+        FileStorage._FileStorage__write_behind = 0
+        FileStorage._FileStorage__flusher = None
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def test_save_is_deferred_until_flush(self):
+        """Test that save only writes once flush is called."""
+        us = User()
+        us.save()
+        self.assertFalse(os.path.exists("file.json"))
+        models.storage.flush()
+        with open("file.json", "r") as f:
+            self.assertIn(f"User.{us.id}", f.read())
+
+
+class TestFileStorageBatch(unittest.TestCase):
+    """Test cases for the batch context manager of FileStorage."""
+
+    def setUp(self):
+        """Start every test on an empty storage."""
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def tearDown(self):
+        """Restore the original file."""
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def test_batch_writes_once(self):
+        """Test that the saves inside a batch are written once at the end."""
+        with patch.object(FileStorage, "_FileStorage__commit",
+                          autospec=True) as commit:
+            with models.storage.batch():
+                for i in range(10):
+                    User().save()
+                commit.assert_not_called()
+        self.assertEqual(1, commit.call_count)
+
+    def test_batch_rolls_back(self):
+        """Test that an exception restores objects and attributes."""
+        us = User()
+        us.first_name = "Betty"
+        rv = Review()
+        models.storage.save()
+        with self.assertRaises(ValueError):
+            with models.storage.transaction():
+                us.first_name = "Holberton"
+                us.last_name = "School"
+                models.storage.delete(rv)
+                pl = Place()
+                pl.save()
+                raise ValueError
+        objects = models.storage.all()
+        self.assertEqual("Betty", us.first_name)
+        self.assertNotIn("last_name", us.__dict__)
+        self.assertIs(rv, objects[f"Review.{rv.id}"])
+        self.assertNotIn(f"Place.{pl.id}", objects)
+        self.assertLessEqual({f"User.{us.id}", f"Review.{rv.id}"},
+                             FileStorage._FileStorage__dirty)
+        with open("file.json", "r") as f:
+            self.assertNotIn(pl.id, f.read())
+
+    def test_write_behind_waits_for_batch(self):
+        """Test that a write-behind flush inside a batch is written once
+        the batch is undone, with the restored values."""
+        FileStorage._FileStorage__journaled = True
+        FileStorage._FileStorage__write_behind = 60
+        FileStorage._FileStorage__flusher = None
+        self.addCleanup(self.__restore_modes)
+        us = User()
+        us.first_name = "Betty"
+        models.storage.save()
+        models.storage.flush()
+        with self.assertRaises(ValueError):
+            with models.storage.batch():
+                us.first_name = "Holberton"
+                models.storage.save()
+                FileStorage._FileStorage__flusher.request()
+                models.storage.flush()
+                raise ValueError
+        models.storage.flush()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertEqual("Betty",
+                         models.storage.all()[f"User.{us.id}"].first_name)
+
+    @staticmethod
+    def __restore_modes():
+        """Go back to full-file mode without write-behind."""
+        models.storage.flush()
+        FileStorage._FileStorage__journaled = False
+        FileStorage._FileStorage__write_behind = 0
+        FileStorage._FileStorage__flusher = None
+        FileStorage._FileStorage__dirty.clear()
+        for name in ("file.json.journal", "file.json.journal.old"):
+            try:
+                os.remove(name)
+            except IOError:
+                pass
+
+    def test_nested_batches(self):
+        """Test that a nested batch is saved with the outer one."""
+        with models.storage.batch():
+            with models.storage.batch():
+                us = User()
+                us.save()
+            self.assertFalse(os.path.exists("file.json"))
+        with open("file.json", "r") as f:
+            self.assertIn(us.id, f.read())
+
+
+class TestFileStorageCompaction(unittest.TestCase):
+    """Test cases for the compaction of the FileStorage journal."""
+
+    def setUp(self):
+        """Switch storage to journaled mode on an empty file."""
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__journaled = True
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__dirty.clear()
+
+    def tearDown(self):
+        """Restore full-file mode, the thresholds and the original file."""
+        models.storage.flush()
+        FileStorage._FileStorage__journaled = False
+        FileStorage._FileStorage__compact_entries = 100000
+        FileStorage._FileStorage__compact_bytes = 64 << 20
+        for name in ("file.json", "file.json.journal",
+                     "file.json.journal.old"):
+            try:
+                os.remove(name)
+            except IOError:
+                pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def test_compact_writes_snapshot(self):
+        """Test that compact writes every object and empties the journal."""
+        us = User()
+        rv = Review()
+        models.storage.save()
+        us.first_name = "Betty"
+        models.storage.delete(rv)
+        models.storage.save()
+        models.storage.compact()
+        self.assertFalse(os.path.exists("file.json.journal"))
+        self.assertFalse(os.path.exists("file.json.journal.old"))
+        with open("file.json", "r") as f:
+            saved = json.load(f)
+        self.assertEqual("Betty", saved[f"User.{us.id}"]["first_name"])
+        self.assertNotIn(f"Review.{rv.id}", saved)
+
+    def test_saves_after_compaction_are_journaled(self):
+        """Test that reload replays the journal on top of the snapshot."""
+        us = User()
+        models.storage.save()
+        models.storage.compact()
+        us.first_name = "Betty"
+        us.save()
+        self.assertTrue(os.path.exists("file.json.journal"))
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertEqual("Betty",
+                         models.storage.all()[f"User.{us.id}"].first_name)
+
+    def test_interrupted_compaction_is_replayed(self):
+        """Test that rotated records are kept until the snapshot is done."""
+        us = User()
+        models.storage.save()
+        with patch.object(FileStorage, "_FileStorage__snapshot",
+                          side_effect=OSError), \
+                patch("threading.excepthook"):
+            models.storage.compact()
+        self.assertTrue(os.path.exists("file.json.journal.old"))
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertIn(f"User.{us.id}", models.storage.all())
+
+    def test_entry_threshold(self):
+        """Test that a save starts a compaction past the entry threshold."""
+        FileStorage._FileStorage__compact_entries = 3
+        for i in range(3):
+            User().save()
+        models.storage.flush()
+        self.assertFalse(os.path.exists("file.json.journal"))
+        with open("file.json", "r") as f:
+            self.assertEqual(3, len(json.load(f)))
+
+    def test_byte_threshold(self):
+        """Test that a save starts a compaction past the size threshold."""
+        FileStorage._FileStorage__compact_bytes = 1
+        User().save()
+        models.storage.flush()
+        self.assertFalse(os.path.exists("file.json.journal"))
+        self.assertTrue(os.path.exists("file.json"))
+
+    def test_reload_counts_entries(self):
+        """Test that reload counts the records of the journal."""
+        User().save()
+        User().save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertEqual(2, FileStorage._FileStorage__journal_entries)
+
+
+class TestFileStorageClassIndex(unittest.TestCase):
+    """Test cases for the per-class index of FileStorage."""
+
+    def setUp(self):
+        """Start every test from an empty storage."""
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def tearDown(self):
+        """Restore the original file and modes."""
+        FileStorage._FileStorage__lazy = False
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def test_new_and_delete(self):
+        """Test that count and query follow new() and delete()."""
+        us = User()
+        rv1 = Review()
+        rv2 = Review()
+        self.assertEqual(3, models.storage.count())
+        self.assertEqual(2, models.storage.count("Review"))
+        self.assertEqual([rv1, rv2], list(models.storage.query("Review")))
+        models.storage.delete(rv1)
+        self.assertEqual(1, models.storage.count("Review"))
+        self.assertEqual([us], list(models.storage.query("User")))
+        self.assertEqual([], list(models.storage.query("Place")))
+
+    def test_replaced_objects(self):
+        """Test that a replaced __objects dictionary is indexed again."""
+        User()
+        self.assertEqual(1, models.storage.count("User"))
+        FileStorage._FileStorage__objects = {}
+        self.assertEqual(0, models.storage.count("User"))
+        pl = Place()
+        self.assertEqual([pl], list(models.storage.query("Place")))
+
+    def test_reload(self):
+        """Test that reloaded objects are indexed."""
+        us = User()
+        Place()
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertEqual(1, models.storage.count("Place"))
+        self.assertEqual([us.id], [obj.id for obj in
+                                   list(models.storage.query("User"))])
+
+    def test_batch_rollback(self):
+        """Test that a rolled back batch restores the index."""
+        us = User()
+        with self.assertRaises(ValueError):
+            with models.storage.batch():
+                Place()
+                models.storage.delete(us)
+                raise ValueError
+        self.assertEqual([us], list(models.storage.query("User")))
+        self.assertEqual(0, models.storage.count("Place"))
+
+    def test_lazy(self):
+        """Test that lazy mode counts without building the objects."""
+        User()
+        pl = Place()
+        models.storage.save()
+        FileStorage._FileStorage__lazy = True
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertEqual(1, models.storage.count("Place"))
+        self.assertEqual(0, dict.__len__(models.storage.all()))
+        self.assertEqual([pl.id], [obj.id for obj in
+                                   list(models.storage.query("Place"))])
+        self.assertEqual(1, dict.__len__(models.storage.all()))
+
+
+class TestFileStorageLookup(unittest.TestCase):
+    """Test cases for the foreign key indexes of FileStorage."""
+
+    def setUp(self):
+        """Start every test from an empty storage."""
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def tearDown(self):
+        """Restore the original file and modes."""
+        FileStorage._FileStorage__lazy = False
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def test_lookup_follows_changes(self):
+        """Test that lookup follows new objects, updates and deletions."""
+        ct1 = City()
+        ct1.state_id = "s1"
+        self.assertEqual([ct1], models.storage.lookup("City", "state_id",
+                                                      "s1"))
+        ct2 = City()
+        ct2.state_id = "s1"
+        ct1.state_id = "s2"
+        self.assertEqual([ct2], models.storage.lookup("City", "state_id",
+                                                      "s1"))
+        self.assertEqual([ct1], models.storage.lookup("City", "state_id",
+                                                      "s2"))
+        models.storage.delete(ct2)
+        self.assertEqual([], models.storage.lookup("City", "state_id", "s1"))
+
+    def test_console_update_and_destroy(self):
+        """Test that lookup follows the update and destroy commands."""
+        rv = Review()
+        with patch("sys.stdout"):
+            HBNBCommand().onecmd(f"update Review {rv.id} place_id p1")
+            self.assertEqual([rv], models.storage.lookup("Review",
+                                                         "place_id", "p1"))
+            HBNBCommand().onecmd(f"destroy Review {rv.id}")
+        self.assertEqual([], models.storage.lookup("Review", "place_id",
+                                                   "p1"))
+
+    def test_reload(self):
+        """Test that reloaded objects are found, also in lazy mode."""
+        pl = Place()
+        pl.user_id = "u1"
+        Place()
+        models.storage.save()
+        for lazy in (False, True):
+            FileStorage._FileStorage__lazy = lazy
+            FileStorage._FileStorage__objects = {}
+            models.storage.reload()
+            self.assertEqual([pl.id], [obj.id for obj in models.storage.lookup(
+                "Place", "user_id", "u1")])
+            self.assertEqual(1, len(models.storage.lookup("Place", "user_id",
+                                                          "")))
+
+    def test_rollback(self):
+        """Test that a rolled back batch restores the indexed values."""
+        ct = City()
+        ct.state_id = "s1"
+        models.storage.lookup("City", "state_id", "s1")
+        with self.assertRaises(ValueError):
+            with models.storage.batch():
+                ct.state_id = "s2"
+                models.storage.lookup("City", "state_id", "s2")
+                raise ValueError
+        self.assertEqual([ct], models.storage.lookup("City", "state_id",
+                                                     "s1"))
+
+    def test_unindexed_attribute(self):
+        """Test that other attributes are found by scanning the class."""
+        us = User()
+        us.first_name = "Betty"
+        User()
+        self.assertEqual([us], models.storage.lookup("User", "first_name",
+                                                     "Betty"))
+
+
+class TestFileStorageBetween(unittest.TestCase):
+    """Test cases for the range indexes of FileStorage."""
+
+    def setUp(self):
+        """Start every test from an empty storage."""
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def tearDown(self):
+        """Restore the original file."""
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def test_between(self):
+        """Test that between returns the places in the range, in order."""
+        places = []
+        for price in (80, 20, 50):
+            places.append(Place())
+            places[-1].price_by_night = price
+        self.assertEqual([places[1], places[2]], models.storage.between(
+            "Place", "price_by_night", 10, 60))
+        self.assertEqual([places[0], places[2]], models.storage.between(
+            "Place", "price_by_night", 50, reverse=True))
+        models.storage.delete(places[2])
+        self.assertEqual([places[1], places[0]], models.storage.between(
+            "Place", "price_by_night"))
+
+    def test_console_update(self):
+        """Test that values coerced by the update command are indexed."""
+        pl = Place()
+        models.storage.between("Place", "max_guest")
+        with patch("sys.stdout"):
+            HBNBCommand().onecmd(f"update Place {pl.id} max_guest 6")
+            HBNBCommand().onecmd(
+                f'Place.update("{pl.id}", {{"number_rooms": "3"}})')
+        self.assertEqual([pl], models.storage.between("Place", "max_guest",
+                                                      5, 8))
+        self.assertEqual([pl], models.storage.between("Place",
+                                                      "number_rooms", 3, 3))
+        self.assertEqual([pl], models.storage.lookup("Place", "max_guest", 6))
+
+    def test_unindexed_attribute(self):
+        """Test that other numeric attributes are sorted from a scan."""
+        pl1 = Place()
+        pl1.latitude = 2.5
+        pl2 = Place()
+        pl2.latitude = -1.0
+        self.assertEqual([pl2, pl1], models.storage.between("Place",
+                                                            "latitude"))
+
+
+class TestFileStorageGeo(unittest.TestCase):
+    """Test cases for the spatial index of FileStorage."""
+
+    def setUp(self):
+        """Store a few places."""
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        self.places = {}
+        for name, lat, lon in (("paris", 48.8566, 2.3522),
+                               ("london", 51.5072, -0.1276),
+                               ("lagos", 6.5244, 3.3792)):
+            self.places[name] = Place()
+            self.places[name].latitude = lat
+            self.places[name].longitude = lon
+
+    def tearDown(self):
+        """Restore the original file."""
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def test_queries(self):
+        """Test the radius, nearest and bbox queries."""
+        places = self.places
+        self.assertEqual([places["paris"]], models.storage.radius(
+            "Place", 48.8, 2.3, 50))
+        self.assertEqual([places["paris"], places["london"]],
+                         models.storage.radius("Place", 49.0, 2.0, 500))
+        self.assertEqual([places["lagos"], places["paris"]],
+                         models.storage.nearest("Place", 0.0, 0.0, 2))
+        self.assertEqual([places["london"]], models.storage.bbox(
+            "Place", 50, -1, 52, 1))
+
+    def test_follows_changes(self):
+        """Test that moved, new and deleted places are found."""
+        places = self.places
+        models.storage.nearest("Place", 0.0, 0.0, 1)
+        places["paris"].latitude = 6.6
+        places["paris"].longitude = 3.4
+        models.storage.delete(places["lagos"])
+        self.assertEqual([places["paris"]], models.storage.radius(
+            "Place", 6.5, 3.4, 50))
+        FileStorage._FileStorage__objects = {}
+        self.assertEqual([], models.storage.nearest("Place", 0.0, 0.0, 1))
+
+    def test_reload(self):
+        """Test that reloaded places are indexed."""
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertEqual([self.places["london"].id],
+                         [obj.id for obj in models.storage.bbox(
+                             "Place", 50, -1, 52, 1)])
+
+    def test_console(self):
+        """Test the geo console command."""
+        with patch("sys.stdout", new=StringIO()) as output:
+            HBNBCommand().onecmd("geo nearest 0 0 1")
+            self.assertIn(self.places["lagos"].id, output.getvalue())
+        with patch("sys.stdout", new=StringIO()) as output:
+            HBNBCommand().onecmd("geo radius 51.5 -0.1 10")
+            self.assertIn(self.places["london"].id, output.getvalue())
+            self.assertNotIn(self.places["paris"].id, output.getvalue())
+        with patch("sys.stdout", new=StringIO()) as output:
+            HBNBCommand().onecmd("geo bbox 40 0 50 5")
+            self.assertIn(self.places["paris"].id, output.getvalue())
+        for command, message in (("geo", "** query missing **"),
+                                 ("geo near 1 2", "** query doesn't exist **"),
+                                 ("geo bbox 1 2 3", "** coordinates missing **"),
+                                 ("geo radius a 2 3", "** invalid number **")):
+            with patch("sys.stdout", new=StringIO()) as output:
+                HBNBCommand().onecmd(command)
+                self.assertEqual(message, output.getvalue().strip())
+
+
+class TestFileStorageSearch(unittest.TestCase):
+    """Test cases for the full-text index of FileStorage."""
+
+    def setUp(self):
+        """Store a few places and reviews."""
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        self.loft = Place()
+        self.loft.name = "Cozy loft"
+        self.loft.description = "A cozy loft near the river"
+        self.house = Place()
+        self.house.name = "Beach house"
+        self.review = Review()
+        self.review.text = "Loved the loft"
+
+    def tearDown(self):
+        """Restore the original file and modes."""
+        FileStorage._FileStorage__journaled = False
+        for name in ("file.json", "file.json.text", "file.json.journal",
+                     "file.json.text.journal"):
+            try:
+                os.remove(name)
+            except IOError:
+                pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def test_search(self):
+        """Test that search ranks places and reviews."""
+        self.assertEqual([self.loft, self.review],
+                         models.storage.search("loft"))
+        self.assertEqual([self.loft], models.storage.search("loft", "Place"))
+        self.assertEqual([self.loft], models.storage.search("loft",
+                                                            limit=1))
+        self.assertEqual([], models.storage.search("loft", "User"))
+
+    def test_follows_changes(self):
+        """Test that search follows created, updated and deleted objects."""
+        models.storage.search("loft")
+        self.house.description = "Loft with a sea view"
+        models.storage.delete(self.review)
+        rv = Review()
+        rv.text = "Great sea view"
+        self.assertEqual({self.loft, self.house},
+                         set(models.storage.search("loft")))
+        self.assertEqual({self.house, rv}, set(models.storage.search("sea")))
+
+    def test_saved_index(self):
+        """Test that the saved index is read back and kept up to date."""
+        models.storage.search("loft")
+        models.storage.compact()
+        self.assertTrue(os.path.exists("file.json.text"))
+        FileStorage._FileStorage__objects = {}
+        with patch("models.engine.file_storage.TextIndex.add") as add:
+            models.storage.reload()
+            found = models.storage.search("river")
+        add.assert_not_called()
+        self.assertEqual([self.loft.id], [obj.id for obj in found])
+        found[0].description = "A flat"
+        Review().text = "By the river"
+        self.assertEqual(["Review"], [type(obj).__name__ for obj in
+                                      models.storage.search("river")])
+
+    def test_saved_index_with_journal(self):
+        """Test that journaled changes are applied to the saved index."""
+        models.storage.search("loft")
+        models.storage.compact()
+        FileStorage._FileStorage__journaled = True
+        self.loft.description = "A flat"
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertEqual([], models.storage.search("river"))
+        self.assertEqual(["Place"], [type(obj).__name__ for obj in
+                                     models.storage.search("flat")])
+
+    def test_save_logs_changes(self):
+        """Test that a save keeps the saved index valid by logging the
+        changed keys, which are the only ones indexed again, and that
+        reload leaves it unread until the first search."""
+        models.storage.search("loft")
+        models.storage.save()
+        self.assertTrue(os.path.exists("file.json.text"))
+        with open("file.json.text", "r") as f:
+            saved = f.read()
+        self.loft.description = "A flat"
+        with patch.object(FileStorage, "_FileStorage__text_documents") \
+                as documents:
+            models.storage.save()
+        documents.assert_not_called()
+        with open("file.json.text", "r") as f:
+            self.assertEqual(saved, f.read())
+        FileStorage._FileStorage__objects = {}
+        with patch.object(TextIndex, "add", autospec=True,
+                          side_effect=TextIndex.add) as add, \
+                patch.object(TextIndex, "restore",
+                             side_effect=TextIndex.restore) as restore:
+            models.storage.reload()
+            restore.assert_not_called()
+            self.assertEqual([], models.storage.search("river"))
+        self.assertEqual([f"Place.{self.loft.id}"],
+                         [call.args[1] for call in add.call_args_list])
+        self.assertEqual(2, restore.call_count)
+        self.assertEqual(["Place"], [type(obj).__name__ for obj in
+                                     models.storage.search("flat")])
+
+    def test_broken_log(self):
+        """Test that the saved index is ignored when its log misses a
+        write."""
+        models.storage.search("loft")
+        models.storage.save()
+        os.remove("file.json")
+        self.loft.description = "A flat"
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        with patch.object(TextIndex, "restore") as restore:
+            self.assertEqual([], models.storage.search("river"))
+        restore.assert_not_called()
+
+    def test_stale_saved_index(self):
+        """Test that a saved index is ignored once the file changed."""
+        models.storage.search("loft")
+        models.storage.compact()
+        with open("file.json", "r") as f:
+            saved = json.load(f)
+        del saved[f"Place.{self.loft.id}"]
+        with open("file.json", "w") as f:
+            json.dump(saved, f)
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertEqual(["Review"], [type(obj).__name__ for obj in
+                                      models.storage.search("loft")])
+
+    def test_console(self):
+        """Test the search console command."""
+        with patch("sys.stdout", new=StringIO()) as output:
+            HBNBCommand().onecmd("search loft")
+            self.assertIn(self.review.id, output.getvalue())
+        with patch("sys.stdout", new=StringIO()) as output:
+            HBNBCommand().onecmd("Place.search(loft)")
+            self.assertIn(self.loft.id, output.getvalue())
+            self.assertNotIn(self.review.id, output.getvalue())
+        with patch("sys.stdout", new=StringIO()) as output:
+            HBNBCommand().onecmd("search Place")
+            self.assertEqual("** words missing **", output.getvalue().strip())
+
+
+class TestFileStorageQuery(unittest.TestCase):
+    """Test cases for the queries of FileStorage."""
+
+    def setUp(self):
+        """Store a few places."""
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        self.places = []
+        for city_id, price, guests in (("c1", 80, 2), ("c2", 20, 4),
+                                       ("c1", 50, 6)):
+            pl = Place()
+            pl.city_id = city_id
+            pl.price_by_night = price
+            pl.max_guest = guests
+            self.places.append(pl)
+
+    def tearDown(self):
+        """Restore the original file."""
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def test_plans(self):
+        """Test that the planner picks the declared indexes."""
+        query = models.storage.query("Place")
+        self.assertEqual("index lookup Place.city_id == 'c1'",
+                         query.where(city_id="c1").explain())
+        self.assertEqual("range scan Place.max_guest from 4 to inf",
+                         query.where("max_guest", ">=", 4).explain())
+        self.assertEqual("class scan Place\nfilter name == 'x'",
+                         query.where(name="x").explain())
+
+    def test_results(self):
+        """Test that queries return the matching places in order."""
+        pl1, pl2, pl3 = self.places
+        query = models.storage.query("Place")
+        self.assertEqual([pl1, pl3], query.where(city_id="c1").all())
+        self.assertEqual([pl3, pl1], query.where(city_id="c1").order_by(
+            "price_by_night").all())
+        self.assertEqual([pl2, pl3], query.where(
+            "price_by_night", "<", 80).order_by("price_by_night").all())
+        self.assertEqual([pl1], query.order_by("-price_by_night").limit(1)
+                         .all())
+        self.assertEqual(3, query.count())
+        self.assertEqual(1, query.where("max_guest", ">", 4).count())
+
+    def test_follows_changes(self):
+        """Test that queries see updates made after they are built."""
+        query = models.storage.query("Place").where(city_id="c2")
+        self.places[0].city_id = "c2"
+        models.storage.delete(self.places[1])
+        self.assertEqual([self.places[0]], query.all())
+
+    def test_lazy(self):
+        """Test that a limited query only builds the instances it reads."""
+        models.storage.save()
+        FileStorage._FileStorage__lazy = True
+        FileStorage._FileStorage__objects = {}
+        try:
+            models.storage.reload()
+            first = models.storage.query("Place").order_by(
+                "price_by_night").first()
+            self.assertEqual(self.places[1].id, first.id)
+            self.assertEqual(1, dict.__len__(models.storage.all()))
+        finally:
+            FileStorage._FileStorage__lazy = False
+
+
+class TestFileStorageColumns(unittest.TestCase):
+    """Test cases for the columnar view of FileStorage."""
+
+    def setUp(self):
+        """Store a few places."""
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        self.places = []
+        for city_id, price, guests in (("c1", 80, 2), ("c2", 20, 4),
+                                       ("c1", 50, 6)):
+            pl = Place()
+            pl.city_id = city_id
+            pl.price_by_night = price
+            pl.max_guest = guests
+            self.places.append(pl)
+
+    def tearDown(self):
+        """Restore the original file."""
+        FileStorage._FileStorage__lazy = False
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    @unittest.skipIf(columnar.np is None, "numpy is not installed")
+    def test_columns(self):
+        """Test the aggregates over the stored places."""
+        view = models.storage.columns("Place")
+        self.assertIn("price_by_night", view.names)
+        self.assertNotIn("amenity_ids", view.names)
+        self.assertEqual({"c1": 65.0, "c2": 20.0},
+                         view.group_by("city_id", "avg", "price_by_night"))
+        self.assertEqual([f"Place.{self.places[2].id}"], view.keys(
+            view.where(("city_id", "==", "c1"), ("max_guest", ">", 2))))
+        self.assertEqual(0, len(models.storage.columns("User")))
+        self.assertEqual(0, len(models.storage.columns("Nope")))
+
+    @unittest.skipIf(columnar.np is None, "numpy is not installed")
+    def test_follows_changes(self):
+        """Test that the view follows created, updated and deleted
+        places."""
+        models.storage.columns("Place")
+        models.storage.delete(self.places[1])
+        pl = Place()
+        pl.city_id = "c3"
+        pl.price_by_night = 10
+        self.places[0].price_by_night = 100
+        self.places[0].save()
+        view = models.storage.columns("Place")
+        self.assertEqual({"c1": 150, "c3": 10},
+                         view.group_by("city_id", "sum", "price_by_night"))
+
+    @unittest.skipIf(columnar.np is None, "numpy is not installed")
+    def test_lazy(self):
+        """Test that the view is built without building the instances."""
+        models.storage.save()
+        FileStorage._FileStorage__lazy = True
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        view = models.storage.columns("Place")
+        self.assertEqual(150, view.aggregate("sum", "price_by_night"))
+        self.assertEqual(0, dict.__len__(models.storage.all()))
+
+    @unittest.skipIf(columnar.np is None, "numpy is not installed")
+    def test_console(self):
+        """Test the stats console command."""
+        commands = {
+            "stats Place count": "3",
+            "stats Place avg price_by_night by city_id":
+                "{'c1': 65.0, 'c2': 20.0}",
+            "stats Place sum price_by_night where max_guest >= 4": "70.0",
+            "stats Place count by city_id where city_id in c2,c3":
+                "{'c2': 1}",
+            "stats Place": "** aggregate missing **",
+            "stats Place median": "** aggregate doesn't exist **",
+            "stats Place avg": "** attribute name missing **",
+            "stats Place avg rooms": "** attribute doesn't exist **",
+            "stats Place avg city_id": "** attribute isn't a number **",
+            "stats Place count where max_guest": "** invalid condition **",
+            "stats Place count where max_guest ~ 1":
+                "** invalid condition **"
+        }
+        for command, expected in commands.items():
+            with patch("sys.stdout", new=StringIO()) as output:
+                HBNBCommand().onecmd(command)
+                self.assertEqual(expected, output.getvalue().strip())
+
+    @unittest.skipIf(columnar.np is not None, "numpy is installed")
+    def test_missing_numpy(self):
+        """Test that the view asks for numpy."""
+        with self.assertRaises(ImportError):
+            models.storage.columns("Place")
+        with patch("sys.stdout", new=StringIO()) as output:
+            HBNBCommand().onecmd("stats Place count")
+            self.assertEqual("** numpy missing **", output.getvalue().strip())
+
+    def test_console_errors(self):
+        """Test the stats console command without a class."""
+        for command, expected in (("stats", "** class name missing **"),
+                                  ("stats Nope count",
+                                   "** class doesn't exist **")):
+            with patch("sys.stdout", new=StringIO()) as output:
+                HBNBCommand().onecmd(command)
+                self.assertEqual(expected, output.getvalue().strip())
+
+
+class TestFileStorageAggregates(unittest.TestCase):
+    """Test cases for the aggregate views of FileStorage."""
+
+    def setUp(self):
+        """Store a few places."""
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        self.places = []
+        for city_id, price in (("c1", 80), ("c2", 20), ("c1", 50)):
+            pl = Place()
+            pl.city_id = city_id
+            pl.price_by_night = price
+            self.places.append(pl)
+
+    def tearDown(self):
+        """Restore the original file."""
+        FileStorage._FileStorage__lazy = False
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def test_aggregate(self):
+        """Test reading the declared views."""
+        self.assertEqual({"c1": 2, "c2": 1},
+                         models.storage.aggregate("places_per_city"))
+        self.assertEqual(65, models.storage.aggregate("price_per_city", "c1"))
+        self.assertEqual(0, models.storage.aggregate("places_per_city", "c9"))
+        self.assertEqual({}, models.storage.aggregate("reviews_per_place"))
+        with self.assertRaises(KeyError):
+            models.storage.aggregate("places_per_planet")
+
+    def test_follows_changes(self):
+        """Test that the views follow created, updated and deleted
+        places."""
+        models.storage.aggregate("price_per_city")
+        pl = Place()
+        pl.city_id = "c2"
+        pl.price_by_night = 40
+        self.places[0].city_id = "c2"
+        self.places[0].save()
+        models.storage.delete(self.places[1])
+        self.assertEqual({"c1": 1, "c2": 2},
+                         models.storage.aggregate("places_per_city"))
+        self.assertEqual({"c1": 50, "c2": 60},
+                         models.storage.aggregate("price_per_city"))
+
+    def test_incremental(self):
+        """Test that a read only reads the places changed since the last
+        one."""
+        models.storage.aggregate("places_per_city")
+        self.places[1].city_id = "c1"
+        self.places[1].save()
+        attribute = FileStorage._FileStorage__attribute
+        with patch.object(FileStorage, "_FileStorage__attribute",
+                          autospec=True, side_effect=attribute) as read:
+            self.assertEqual(3, models.storage.aggregate("places_per_city",
+                                                         "c1"))
+            self.assertEqual(3, models.storage.aggregate("places_per_city",
+                                                         "c1"))
+        self.assertTrue(0 < read.call_count < 10)
+
+    def test_batch_rollback(self):
+        """Test that a rolled back batch puts the views back."""
+        models.storage.aggregate("places_per_city")
+        with self.assertRaises(RuntimeError):
+            with models.storage.batch():
+                Place().city_id = "c3"
+                models.storage.delete(self.places[0])
+                raise RuntimeError
+        self.assertEqual({"c1": 2, "c2": 1},
+                         models.storage.aggregate("places_per_city"))
+
+    def test_lazy(self):
+        """Test that the views are built without building the instances."""
+        models.storage.save()
+        FileStorage._FileStorage__lazy = True
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertEqual(65, models.storage.aggregate("price_per_city",
+                                                      "c1"))
+        self.assertEqual(0, dict.__len__(models.storage.all()))
+
+
+class TestFileStorageCache(unittest.TestCase):
+    """Test cases for the cached forms used by FileStorage."""
+
+    def setUp(self):
+        """Store a few places."""
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        self.places = [Place() for _ in range(3)]
+
+    def tearDown(self):
+        """Restore the original file."""
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def test_saves_reuse_encodings(self):
+        """Test that saving unchanged objects reuses their JSON, without
+        filling the cache of their forms."""
+        models.storage.save()
+        cache.clear()
+        with patch.object(base_model, "record",
+                          side_effect=base_model.record) as record:
+            models.storage.save()
+        record.assert_not_called()
+        self.assertEqual(0, len(cache))
+        self.places[0].name = "changed"
+        models.storage.save()
+        with open("file.json", "r") as f:
+            self.assertEqual("changed",
+                             json.load(f)[f"Place.{self.places[0].id}"]
+                             ["name"])
+
+    def test_saves_beyond_cache(self):
+        """Test that a save only encodes the changed objects when there are
+        more objects than the cache of their forms holds."""
+        self.places += [Place() for _ in range(200)]
+        binary = FileStorage._FileStorage__binary
+        self.addCleanup(setattr, cache, "max_bytes", cache.max_bytes)
+        self.addCleanup(setattr, FileStorage, "_FileStorage__binary", binary)
+        cache.max_bytes = 4096
+        for FileStorage._FileStorage__binary in (False, True):
+            models.storage.save()
+            for place in self.places[:2]:
+                place.name = "changed"
+            with patch.object(base_model, "record",
+                              side_effect=base_model.record) as record:
+                models.storage.save()
+                models.storage.save()
+            self.assertEqual(self.places[:2],
+                             [call.args[0] for call in record.call_args_list])
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertEqual("changed", models.storage.all()
+                         [f"Place.{self.places[1].id}"].name)
+
+    def test_all_hits(self):
+        """Test that listing unchanged objects reuses their string."""
+        with patch("sys.stdout", new=StringIO()) as output:
+            HBNBCommand().onecmd("all Place")
+            first = output.getvalue()
+        cache.hits = cache.misses = 0
+        with patch("sys.stdout", new=StringIO()) as output:
+            HBNBCommand().onecmd("all Place")
+            self.assertEqual(first, output.getvalue())
+        self.assertEqual(3, cache.hits)
+        self.assertEqual(0, cache.misses)
+
+    def test_batch_rollback(self):
+        """Test that rolled back attributes are formatted again."""
+        place = self.places[0]
+        place.name = "before"
+        str(place)
+        with self.assertRaises(RuntimeError):
+            with models.storage.batch():
+                place.name = "after"
+                str(place)
+                raise RuntimeError
+        self.assertIn("'before'", str(place))
+        self.assertEqual("before", place.to_dict()["name"])
+
+
+class TestFileStorageDecoders(unittest.TestCase):
+    """Test cases for the reload of instances through their decoders."""
+
+    def setUp(self):
+        """Store a few linked objects."""
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        self.city = City()
+        self.places = [Place() for _ in range(4)]
+        for place in self.places:
+            place.city_id = self.city.id
+        models.storage.save()
+
+    def tearDown(self):
+        """Restore the original file."""
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def test_one_entry_per_line(self):
+        """Test that the saved file holds one entry per line."""
+        with open("file.json", "r") as f:
+            lines = f.read().split("\n")
+        self.assertEqual(["{", "}"], [lines[0], lines[-1]])
+        self.assertEqual(5, len(lines) - 2)
+        with open("file.json", "r") as f:
+            self.assertEqual(5, len(json.load(f)))
+
+    def test_reload(self):
+        """Test that reloaded instances equal the saved ones."""
+        saved = {key: obj.to_dict()
+                 for key, obj in models.storage.all().items()}
+        FileStorage._FileStorage__objects = {}
+        with patch.object(models.storage, "touch") as touch:
+            models.storage.reload()
+        touch.assert_not_called()
+        objects = models.storage.all()
+        self.assertEqual(saved, {key: obj.to_dict()
+                                 for key, obj in objects.items()})
+        self.assertIsInstance(objects[f"Place.{self.places[0].id}"], Place)
+        self.assertEqual(4, len(models.storage.lookup("Place", "city_id",
+                                                      self.city.id)))
+
+    def test_timestamps_round_trip(self):
+        """Test that unread timestamps are saved back as they were read."""
+        with open("file.json", "r") as f:
+            text = re.sub(r"(\d{4}-\d\d-\d\d)T", r"\1 ", f.read())
+        with open("file.json", "w") as f:
+            f.write(text)
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        for obj in models.storage.all().values():
+            models.storage.touch(obj)
+        models.storage.save()
+        with open("file.json", "r") as f:
+            self.assertEqual(text, f.read())
+
+    def test_reload_single_line(self):
+        """Test that files saved on a single line are still read."""
+        saved = {key: obj.to_dict()
+                 for key, obj in models.storage.all().items()}
+        with open("file.json", "w") as f:
+            json.dump(saved, f)
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertEqual(saved, {key: obj.to_dict() for key, obj
+                                 in models.storage.all().items()})
+
+
+class TestIterShard(unittest.TestCase):
+    """Test cases for the iter_shard function."""
+
+    def tearDown(self):
+        """Remove the test file."""
+        os.remove("test.json")
+
+    def test_streamed_and_loaded_match(self):
+        """Test that streaming a file builds the same objects as loading it."""
+        us = User()
+        pl = Place()
+        with open("test.json", "w") as f:
+            json.dump({f"User.{us.id}": us.to_dict(),
+                       f"Place.{pl.id}": pl.to_dict()}, f)
+        loaded = list(iter_shard("test.json"))
+        streamed = list(iter_shard("test.json", stream_size=0))
+        self.assertEqual([key for key, obj in loaded],
+                         [key for key, obj in streamed])
+        self.assertEqual([obj.to_dict() for key, obj in loaded],
+                         [obj.to_dict() for key, obj in streamed])
+
 if __name__ == "__main__":
     unittest.main()
 
@@ -0,0 +1,83 @@
+#!/usr/bin/python3
+"""Unit tests for the GridIndex class."""
+import random
+import unittest
+from models.engine.geo import GridIndex, distance, located
+
+
+class TestDistance(unittest.TestCase):
+    """Test cases for the great-circle helpers."""
+
+    def test_distance(self):
+        """Test the distance between known points."""
+        self.assertAlmostEqual(0, distance(48.85, 2.35, 48.85, 2.35))
+        self.assertAlmostEqual(111.2, distance(0, 0, 1, 0), places=1)
+        self.assertAlmostEqual(343.6, distance(48.8566, 2.3522,
+                                               51.5072, -0.1276), places=0)
+
+    def test_located(self):
+        """Test which points can be indexed."""
+        self.assertTrue(located((12.5, -70)))
+        self.assertFalse(located((91.0, 0.0)))
+        self.assertFalse(located(("1", 0.0)))
+        self.assertFalse(located((float("nan"), 0.0)))
+        self.assertFalse(located(None))
+
+
+class TestGridIndex(unittest.TestCase):
+    """Test cases for the GridIndex class."""
+
+    def setUp(self):
+        """Index random points and keep them for brute force checks."""
+        rand = random.Random(0)
+        self.points = [(f"Place.{i}", (rand.uniform(-89, 89),
+                                       rand.uniform(-180, 180)))
+                       for i in range(500)]
+        self.index = GridIndex(self.points, cell_size=2.0)
+
+    def brute(self, lat, lon):
+        """Return every (distance, key) pair from the closest."""
+        return sorted((distance(lat, lon, *point), key)
+                      for key, point in self.points)
+
+    def test_radius(self):
+        """Test that radius matches a scan of every point."""
+        for lat, lon, km in ((0, 0, 1500), (60, 179, 2000),
+                             (-88, 10, 500), (10, -20, 30000)):
+            self.assertEqual([pair for pair in self.brute(lat, lon)
+                              if pair[0] <= km],
+                             self.index.radius(lat, lon, km))
+
+    def test_nearest(self):
+        """Test that nearest matches a scan of every point."""
+        for lat, lon, k in ((0, 0, 1), (45, -179.9, 10), (89, 0, 3)):
+            self.assertEqual(self.brute(lat, lon)[:k],
+                             self.index.nearest(lat, lon, k))
+        self.assertEqual(500, len(self.index.nearest(0, 0, 1000)))
+        self.assertEqual([], self.index.nearest(0, 0, 0))
+
+    def test_bbox(self):
+        """Test boxes, including one crossing the antimeridian."""
+        for south, west, north, east in ((-10, -10, 10, 10),
+                                         (20, 170, 60, -170),
+                                         (-90, -180, 90, 180)):
+            expected = {key for key, (lat, lon) in self.points
+                        if south <= lat <= north and
+                        (west <= lon <= east if west <= east
+                         else lon >= west or lon <= east)}
+            self.assertEqual(expected,
+                             set(self.index.bbox(south, west, north, east)))
+
+    def test_add_and_remove(self):
+        """Test that keys move with their point and can be removed."""
+        index = GridIndex([("Place.1", (1.0, 1.0)), ("Place.2", (1.0, 1.0))])
+        index.add("Place.1", (40.0, 40.0))
+        index.remove("Place.2")
+        index.add("Place.3", ("a", 1.0))
+        self.assertEqual(1, len(index))
+        self.assertEqual([], index.get((1.0, 1.0)))
+        self.assertEqual(["Place.1"], index.get((40.0, 40.0)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+#!/usr/bin/python3
+"""Unit tests for the ClassIndex class."""
+import unittest
+from models.engine.index import AttributeIndex, ClassIndex, SortedIndex
+
+
+class TestClassIndex(unittest.TestCase):
+    """Test cases for the ClassIndex class."""
+
+    def test_add_and_count(self):
+        """Test that keys are counted per class and in total."""
+        index = ClassIndex([("User.1", "u1"), ("User.2", "u2"),
+                            ("Place.1", "p1")])
+        self.assertEqual(3, len(index))
+        self.assertEqual(2, index.count("User"))
+        self.assertEqual(1, index.count("Place"))
+        self.assertEqual(0, index.count("Review"))
+        self.assertEqual({"1": "u1", "2": "u2"}, index.ids("User"))
+
+    def test_add_replaces(self):
+        """Test that adding a stored key replaces its instance."""
+        index = ClassIndex([("User.1", "u1")])
+        index.add("User.1", "new")
+        self.assertEqual(1, len(index))
+        self.assertEqual({"1": "new"}, index.ids("User"))
+
+    def test_remove(self):
+        """Test that removing a key, stored or not, keeps the counts."""
+        index = ClassIndex([("User.1", "u1"), ("User.2", "u2")])
+        index.remove("User.1")
+        index.remove("User.1")
+        index.remove("Place.1")
+        self.assertEqual(1, len(index))
+        self.assertEqual({"2": "u2"}, index.ids("User"))
+
+
+class TestAttributeIndex(unittest.TestCase):
+    """Test cases for the AttributeIndex class."""
+
+    def test_add_and_get(self):
+        """Test that keys are grouped by value."""
+        index = AttributeIndex([("City.1", "s1"), ("City.2", "s1"),
+                                ("City.3", "s2")])
+        self.assertEqual(["City.1", "City.2"], index.get("s1"))
+        self.assertEqual(["City.3"], index.get("s2"))
+        self.assertEqual([], index.get("s3"))
+        self.assertEqual(3, len(index))
+
+    def test_add_moves_key(self):
+        """Test that adding a key again moves it to its new value."""
+        index = AttributeIndex([("City.1", "s1")])
+        index.add("City.1", "s2")
+        self.assertEqual([], index.get("s1"))
+        self.assertEqual(["City.1"], index.get("s2"))
+
+    def test_remove(self):
+        """Test that removed keys are no longer found."""
+        index = AttributeIndex([("City.1", "s1"), ("City.2", "s1")])
+        index.remove("City.1")
+        index.remove("City.9")
+        self.assertEqual(["City.2"], index.get("s1"))
+
+    def test_unhashable(self):
+        """Test that unhashable values are not indexed."""
+        index = AttributeIndex([("City.1", ["s1"])])
+        self.assertEqual(0, len(index))
+        self.assertEqual([], index.get(["s1"]))
+
+
+class TestSortedIndex(unittest.TestCase):
+    """Test cases for the SortedIndex class."""
+
+    def setUp(self):
+        """Index a few places by price."""
+        self.index = SortedIndex([("Place.1", 80), ("Place.2", 20),
+                                  ("Place.3", 50), ("Place.4", 50.0)])
+
+    def test_range(self):
+        """Test that range returns the keys between the bounds in order."""
+        self.assertEqual(["Place.2", "Place.3", "Place.4", "Place.1"],
+                         self.index.range())
+        self.assertEqual(["Place.3", "Place.4"], self.index.range(50, 50))
+        self.assertEqual(["Place.3", "Place.4", "Place.1"],
+                         self.index.range(21))
+        self.assertEqual(["Place.4", "Place.3", "Place.2"],
+                         self.index.range(high=79, reverse=True))
+        self.assertEqual([], self.index.range(81))
+
+    def test_add_and_remove(self):
+        """Test that keys move with their value and can be removed."""
+        self.index.add("Place.1", 10)
+        self.index.remove("Place.3")
+        self.index.remove("Place.9")
+        self.assertEqual(["Place.1", "Place.2", "Place.4"],
+                         self.index.range())
+        self.assertEqual(["Place.4"], self.index.get(50))
+
+    def test_not_numeric(self):
+        """Test that values other than numbers are not indexed."""
+        index = SortedIndex([("Place.1", "80"), ("Place.2", True),
+                             ("Place.3", float("nan")), ("Place.4", 1)])
+        self.assertEqual(1, len(index))
+        index.add("Place.4", None)
+        self.assertEqual([], index.range())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+#!/usr/bin/python3
+"""Unit tests for the Journal class."""
+import os
+import unittest
+from models.engine.journal import Journal
+
+
+class TestJournal(unittest.TestCase):
+    """Test cases for the Journal class."""
+
+    def setUp(self):
+        """Start every test with an empty journal."""
+        self.journal = Journal("test.journal")
+        self.journal.truncate()
+
+    def tearDown(self):
+        """Remove the journal file."""
+        self.journal.truncate()
+
+    def test_replay_missing_file(self):
+        """Test that replaying a missing journal yields nothing."""
+        self.assertEqual([], list(self.journal.replay()))
+
+    def test_append_and_replay(self):
+        """Test that records are replayed in the order they were appended."""
+        self.journal.append([("User.1", {"id": "1"})])
+        self.journal.append([("User.2", {"id": "2"}), ("User.1", None)])
+        self.assertEqual([("User.1", {"id": "1"}), ("User.2", {"id": "2"}),
+                          ("User.1", None)], list(self.journal.replay()))
+
+    def test_replay_ignores_torn_line(self):
+        """Test that an interrupted last record is ignored."""
+        self.journal.append([("User.1", {"id": "1"})])
+        with open("test.journal", "a") as f:
+            f.write('{"key": "User.2", "val')
+        self.assertEqual([("User.1", {"id": "1"})],
+                         list(self.journal.replay()))
+
+    def test_append_after_torn_line(self):
+        """Test that records appended after an interrupted one are
+        replayed."""
+        for torn in ("", '{"key": "User.1", "val' * 500):
+            self.journal.truncate()
+            if torn:
+                with open("test.journal", "w") as f:
+                    f.write(torn)
+            else:
+                self.journal.append([("User.1", {"id": "1"})])
+                with open("test.journal", "a") as f:
+                    f.write('{"key": "User.2", "val')
+            self.journal.append([("User.3", {"id": "3"})])
+            self.journal.append([("User.4", {"id": "4"})])
+            records = [("User.3", {"id": "3"}), ("User.4", {"id": "4"})]
+            if not torn:
+                records.insert(0, ("User.1", {"id": "1"}))
+            self.assertEqual(records, list(self.journal.replay()))
+
+    def test_truncate(self):
+        """Test that truncate removes the journal file."""
+        self.journal.append([("User.1", {"id": "1"})])
+        self.journal.truncate()
+        self.assertFalse(os.path.exists("test.journal"))
+
+    def test_rotate_keeps_records(self):
+        """Test that rotated records are replayed before the new ones."""
+        self.journal.append([("User.1", {"id": "1"})])
+        self.journal.rotate()
+        self.journal.append([("User.1", None)])
+        self.journal.rotate()
+        self.journal.append([("User.2", {"id": "2"})])
+        self.assertEqual([("User.1", {"id": "1"}), ("User.1", None),
+                          ("User.2", {"id": "2"})],
+                         list(self.journal.replay()))
+        self.assertEqual(0, os.path.getsize("test.journal") -
+                         self.journal.size())
+
+    def test_rotate_after_torn_line(self):
+        """Test that records rotated after an interrupted one are
+        replayed."""
+        self.journal.append([("User.1", {"id": "1"})])
+        with open("test.journal", "a") as f:
+            f.write('{"key": "User.2", "val')
+        self.journal.rotate()
+        self.journal.append([("User.3", {"id": "3"})])
+        self.journal.rotate()
+        self.assertEqual([("User.1", {"id": "1"}), ("User.3", {"id": "3"})],
+                         list(self.journal.replay()))
+
+    def test_drop_old(self):
+        """Test that drop_old only removes the rotated records."""
+        self.journal.append([("User.1", {"id": "1"})])
+        self.journal.rotate()
+        self.journal.append([("User.2", {"id": "2"})])
+        self.journal.drop_old()
+        self.assertEqual([("User.2", {"id": "2"})],
+                         list(self.journal.replay()))
+        self.journal.truncate()
+        self.assertEqual(0, self.journal.size())
+
+
+if __name__ == "__main__":
+    unittest.main()
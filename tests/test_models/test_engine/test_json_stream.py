@@ -0,0 +1,112 @@
+#!/usr/bin/python3
+"""Unit tests for the incremental JSON reader."""
+import io
+import json
+import unittest
+from models.engine import json_stream
+from models.engine.json_stream import iter_entries
+from unittest.mock import patch
+
+
+class TestIterEntries(unittest.TestCase):
+    """Test cases for the iter_entries function."""
+
+    def entries(self, text, chunk_size=3):
+        """Return the entries read from text with a small chunk size."""
+        return list(iter_entries(io.StringIO(text), chunk_size))
+
+    def test_empty_object(self):
+        """Test that an empty object has no entries."""
+        self.assertEqual([], self.entries("{}"))
+        self.assertEqual([], self.entries(" \n{ } "))
+
+    def test_entries_across_chunks(self):
+        """Test that entries split across chunks are decoded whole."""
+        data = {"User.1": {"id": "1", "name": "Betty \"B\" {x}"},
+                "Place.2": {"id": "2", "amenity_ids": ["a", "b"],
+                            "latitude": 12.5, "max_guest": 12345}}
+        for text in (json.dumps(data), json.dumps(data, indent=4)):
+            for chunk_size in (1, 2, 7, 1 << 16):
+                self.assertEqual(list(data.items()),
+                                 self.entries(text, chunk_size))
+
+    def test_number_not_cut_at_chunk_end(self):
+        """Test that a number is not decoded before its last digit."""
+        self.assertEqual([("a", 123456789)],
+                         self.entries('{"a": 123456789}', 2))
+
+    def test_invalid_input(self):
+        """Test that anything but a JSON object is refused."""
+        for text in ("[1, 2]", '{"a" 1}', '{"a": 1 "b": 2}', '{1: 2}'):
+            with self.assertRaises(ValueError):
+                self.entries(text)
+
+    def test_truncated_input(self):
+        """Test that a truncated object is refused."""
+        with self.assertRaises(ValueError):
+            self.entries('{"a": {"id": "1"}, "b": {"id"')
+
+    def test_entries_by_line(self):
+        """Test that files with one entry per line are read whole."""
+        data = {f"User.{i}": {"id": str(i), "bio": "a\nb, {c}: d"}
+                for i in range(50)}
+        text = "{" + ",".join(f"\n{json.dumps(key)}: {json.dumps(value)}"
+                              for key, value in data.items()) + "\n}"
+        for chunk_size in (1, 7, 100, 1 << 16):
+            self.assertEqual(list(data.items()),
+                             self.entries(text, chunk_size))
+        self.assertEqual([], self.entries("{\n}"))
+
+    def test_lines_not_entries(self):
+        """Test that lines holding part of an entry are read entry by
+        entry, even when they happen to form a valid object."""
+        data = {"Place.1": {"meta": {"a": 1}, "id": "1"},
+                "Place.2": {"id": "2"}}
+        text = json.dumps(data, indent=1)
+        for chunk_size in (5, 30, 1 << 16):
+            self.assertEqual(list(data.items()),
+                             self.entries(text, chunk_size))
+
+    def test_entries_on_one_line(self):
+        """Test that the entries of a file on a single line are decoded
+        together, up to the last one, even when values hold "},"."""
+        data = {f"User.{i}": {"id": str(i), "bio": "a}, {b},c"}
+                for i in range(50)}
+        data["Place.1"] = {"id": "1", "rooms": [{"a": 1}, {"b": 2}]}
+        data["User.50"] = {"id": "50"}
+        text = json.dumps(data)
+        for chunk_size in (1, 7, 100, 1 << 16):
+            self.assertEqual(list(data.items()),
+                             self.entries(text, chunk_size))
+        text = json.dumps({f"User.{i}": {"id": str(i)} for i in range(50)})
+        with patch.object(json_stream.decoder, "raw_decode",
+                          side_effect=json_stream.decoder.raw_decode) as raw:
+            self.assertEqual(50, len(self.entries(text, 1 << 16)))
+        self.assertEqual(2, raw.call_count)
+
+    def test_truncated_lines(self):
+        """Test that a truncated file with one entry per line is refused."""
+        with self.assertRaises(ValueError):
+            self.entries('{\n"a": {"id": "1"},\n"b": {"id"', 1 << 16)
+
+    def test_texts(self):
+        """Test that the text of each value is kept as it is written, and
+        that values spanning several lines have none."""
+        data = {"User.1": {"id": "1", "bio": "a\nb, {c}: d"},
+                "Place.2": {"id": "2", "latitude": 1.50}}
+        by_line = "{" + ",".join(f"\n{json.dumps(key)}: {json.dumps(value)}"
+                                 for key, value in data.items()) + "\n}"
+        for text in (by_line, json.dumps(data)):
+            for chunk_size in (1, 7, 1 << 16):
+                entries = list(iter_entries(io.StringIO(text), chunk_size,
+                                            texts=True))
+                self.assertEqual([(key, value, json.dumps(value))
+                                  for key, value in data.items()], entries)
+        text = json.dumps(data, indent=1)
+        entries = list(iter_entries(io.StringIO(text), texts=True))
+        self.assertEqual([(key, value, None)
+                          for key, value in data.items()], entries)
+
+
+if __name__ == "__main__":
+    unittest.main()
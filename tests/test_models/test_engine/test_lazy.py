@@ -0,0 +1,91 @@
+#!/usr/bin/python3
+"""Unit tests for the LazyObjects class."""
+import json
+import os
+import unittest
+from models.engine.lazy import LazyObjects
+
+
+def read(path):
+    """Return the entries of the JSON file path."""
+    with open(path, "r") as f:
+        return json.load(f).items()
+
+
+def build(record):
+    """Return a tuple standing for the instance of record."""
+    return ("built", record["id"])
+
+
+class TestLazyObjects(unittest.TestCase):
+    """Test cases for the LazyObjects class."""
+
+    def setUp(self):
+        """Write two sources, one per class."""
+        for name in ("User", "Place"):
+            with open(f"{name}.test.json", "w") as f:
+                json.dump({f"{name}.1": {"id": "1"},
+                           f"{name}.2": {"id": "2"}}, f)
+        self.objects = LazyObjects({}, build,
+                                   lambda key: key.partition(".")[0], read)
+        self.objects.add_source("User", "User.test.json", "User")
+        self.objects.add_source("Place", "Place.test.json", "Place")
+
+    def tearDown(self):
+        """Remove the sources."""
+        for name in ("User", "Place"):
+            os.remove(f"{name}.test.json")
+
+    def test_lookup_parses_one_source(self):
+        """Test that a lookup only parses the source holding the key."""
+        self.assertIn("User.1", self.objects)
+        self.assertEqual(["User.1", "User.2"], self.objects.loaded())
+        self.assertEqual(0, dict.__len__(self.objects))
+
+    def test_lookup_builds_one_record(self):
+        """Test that reading a key only builds its own record."""
+        self.assertEqual(("built", "1"), self.objects["User.1"])
+        self.assertEqual(1, dict.__len__(self.objects))
+        self.assertIs(self.objects["User.1"], self.objects["User.1"])
+
+    def test_missing_key(self):
+        """Test that a missing key raises KeyError."""
+        with self.assertRaises(KeyError):
+            self.objects["User.3"]
+        self.assertIsNone(self.objects.get("Review.1"))
+
+    def test_peek_does_not_build(self):
+        """Test that peek returns the raw record of an unbuilt key."""
+        self.assertEqual({"id": "2"}, self.objects.peek("Place.2"))
+        self.assertEqual(0, dict.__len__(self.objects))
+
+    def test_discard_before_parse(self):
+        """Test that a key discarded before its source is parsed stays gone."""
+        self.objects.discard("Place.1")
+        self.assertNotIn("Place.1", self.objects)
+        self.assertIn("Place.2", self.objects)
+
+    def test_add_record_wins_over_source(self):
+        """Test that a newer record is not replaced by its source."""
+        self.objects.add_record("User.1", {"id": "new"})
+        self.assertEqual(("built", "new"), self.objects["User.1"])
+
+    def test_iteration_loads_everything(self):
+        """Test that len, keys and values cover every source."""
+        self.assertEqual(4, len(self.objects))
+        self.assertEqual({"User.1", "User.2", "Place.1", "Place.2"},
+                         set(self.objects.keys()))
+        self.assertIn(("built", "2"), list(self.objects.values()))
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+    def test_class_parses_its_sources(self):
+        """Test that the keys and count of a class only parse its source."""
+        self.objects.discard("User.2")
+        self.assertEqual(["User.1"], self.objects.keys("User"))
+        self.assertEqual(1, self.objects.count("User"))
+        self.assertEqual(["User.1"], self.objects.loaded())
+        self.assertEqual(2, self.objects.count("Place"))
+        self.assertEqual(3, self.objects.count())
@@ -0,0 +1,63 @@
+#!/usr/bin/python3
+"""Unit tests for the MappedFile class."""
+import os
+import unittest
+from models.engine.mapped import MappedFile, write_index
+
+
+class TestMappedFile(unittest.TestCase):
+    """Test cases for the MappedFile class."""
+
+    def setUp(self):
+        """Write a JSON file and its offset index."""
+        records = {"User.2": '{"id": "2"}', "User.1": '{"id": "1"}',
+                   "Place.1": '{"id": "1", "name": "Cabin"}'}
+        text = "{"
+        entries = []
+        for key, record in records.items():
+            text += f'"{key}": '
+            entries.append((key, len(text), len(record)))
+            text += record + ", "
+        with open("test.json", "w") as f:
+            f.write(text[:-2] + "}")
+        write_index("test.json", entries)
+        self.mapped = MappedFile("test.json")
+
+    def tearDown(self):
+        """Remove the JSON file and its index."""
+        self.mapped.close()
+        os.remove("test.json")
+        os.remove("test.json.idx")
+
+    def test_read(self):
+        """Test that a record is read on its own."""
+        self.assertEqual({"id": "1", "name": "Cabin"},
+                         self.mapped.read("Place.1"))
+        self.assertEqual('{"id": "2"}', self.mapped.text("User.2"))
+
+    def test_missing_key(self):
+        """Test that a missing key is reported."""
+        self.assertNotIn("User.3", self.mapped)
+        self.assertIsNone(self.mapped.text("User.3"))
+        with self.assertRaises(KeyError):
+            self.mapped.read("Review.1")
+
+    def test_keys_and_count(self):
+        """Test that keys are sorted and can be filtered by prefix."""
+        self.assertEqual(3, len(self.mapped))
+        self.assertEqual(["Place.1", "User.1", "User.2"],
+                         list(self.mapped.keys()))
+        self.assertEqual(["User.1", "User.2"], list(self.mapped.keys("User.")))
+        self.assertEqual(2, self.mapped.count("User."))
+        self.assertEqual(0, self.mapped.count("Review."))
+
+    def test_stale_index(self):
+        """Test that an index is refused once its file changed."""
+        with open("test.json", "a") as f:
+            f.write(" ")
+        with self.assertRaises(ValueError):
+            MappedFile("test.json")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,136 @@
+#!/usr/bin/python3
+"""Unit tests for the Query class."""
+import unittest
+from types import SimpleNamespace
+from models.engine.query import Query, compile_condition
+
+
+class TestCompileCondition(unittest.TestCase):
+    """Test cases for the compile_condition function."""
+
+    def test_operators(self):
+        """Test that conditions compile to predicates."""
+        obj = SimpleNamespace(price=50, name="Cozy loft", tags=["a"])
+        self.assertTrue(compile_condition("price", "<=", 50)(obj))
+        self.assertFalse(compile_condition("price", ">", 50)(obj))
+        self.assertTrue(compile_condition("price", "in", (10, 50))(obj))
+        self.assertTrue(compile_condition("name", "contains", "loft")(obj))
+        self.assertTrue(compile_condition("tags", "!=", [])(obj))
+        self.assertFalse(compile_condition("missing", "==", 1)(obj))
+
+    def test_type_mismatch(self):
+        """Test that values that cannot be compared do not match."""
+        obj = SimpleNamespace(price="50")
+        self.assertFalse(compile_condition("price", "<", 100)(obj))
+
+    def test_unknown_operator(self):
+        """Test that an unknown operator raises a ValueError."""
+        with self.assertRaises(ValueError):
+            compile_condition("price", "~", 1)
+
+
+class TestQuery(unittest.TestCase):
+    """Test cases for the Query class."""
+
+    def setUp(self):
+        """Build a query over a few places, recording the reads."""
+        self.places = [SimpleNamespace(id=str(i), city_id=city, price=price,
+                                       guests=guests)
+                       for i, (city, price, guests) in enumerate(
+                           [("c1", 80, 2), ("c2", 20, 4), ("c1", 50, 6),
+                            ("c2", 50, 2)])]
+        self.reads = []
+
+        def scan(class_name):
+            """Yield every place."""
+            self.reads.append("scan")
+            yield from self.places
+
+        def lookup(class_name, name, value):
+            """Yield the places with name equal to value."""
+            self.reads.append(("lookup", name, value))
+            return iter([obj for obj in self.places
+                         if getattr(obj, name) == value])
+
+        def between(class_name, name, low, high, reverse):
+            """Yield the places with name between low and high."""
+            self.reads.append(("between", name, low, high, reverse))
+            found = [obj for obj in self.places
+                     if (low is None or getattr(obj, name) >= low) and
+                     (high is None or getattr(obj, name) <= high)]
+            return iter(sorted(found, key=lambda obj: getattr(obj, name),
+                               reverse=reverse))
+
+        self.query = Query("Place", {"scan": scan, "lookup": lookup,
+                                     "between": between,
+                                     "count": lambda name: len(self.places)},
+                           hashed=("city_id", "price"), ordered=("price",))
+
+    def ids(self, query):
+        """Return the ids of the instances of query."""
+        return [obj.id for obj in query]
+
+    def test_scan(self):
+        """Test that unindexed conditions filter a scan of the class."""
+        query = self.query.where("guests", ">=", 4)
+        self.assertEqual("class scan Place\nfilter guests >= 4",
+                         query.explain())
+        self.assertEqual(["1", "2"], self.ids(query))
+        self.assertEqual(["scan"], self.reads)
+
+    def test_lookup(self):
+        """Test that an equality on a hashed attribute uses the index."""
+        query = self.query.where(city_id="c1").where("guests", "<", 5)
+        self.assertEqual("index lookup Place.city_id == 'c1'\n"
+                         "filter guests < 5", query.explain())
+        self.assertEqual(["0"], self.ids(query))
+        self.assertEqual([("lookup", "city_id", "c1")], self.reads)
+
+    def test_range(self):
+        """Test that bounds on an ordered attribute use a range scan."""
+        query = self.query.where("price", ">", 20).where("price", "<=", 60)
+        self.assertEqual("range scan Place.price from 20 to 60\n"
+                         "filter price > 20", query.explain())
+        self.assertEqual(["2", "3"], self.ids(query))
+        self.assertEqual([("between", "price", 20, 60, False)], self.reads)
+
+    def test_order_from_index(self):
+        """Test that ordering by a range attribute needs no sort."""
+        query = self.query.order_by("-price").limit(2)
+        self.assertEqual("range scan Place.price from -inf to inf "
+                         "descending\nlimit 2", query.explain())
+        self.assertEqual(["0", "2"], self.ids(query))
+
+    def test_sort(self):
+        """Test that other orders are sorted after the access path."""
+        query = self.query.where(city_id="c2").order_by("-price", "guests")
+        self.assertEqual("index lookup Place.city_id == 'c2'\n"
+                         "sort by -price, guests", query.explain())
+        self.assertEqual(["3", "1"], self.ids(query))
+        query = self.query.order_by("guests", "-price")
+        self.assertEqual(["0", "3", "1", "2"], self.ids(query))
+
+    def test_lazy(self):
+        """Test that nothing is read before iterating."""
+        query = self.query.where(city_id="c1").limit(1)
+        self.assertEqual([], self.reads)
+        self.assertEqual("0", query.first().id)
+
+    def test_chaining_copies(self):
+        """Test that refining a query leaves the original unchanged."""
+        query = self.query.where("guests", "==", 2)
+        query.where(city_id="c1")
+        self.assertEqual(2, query.count())
+        self.assertEqual(4, self.query.count())
+        self.assertEqual(["scan"], self.reads)
+
+    def test_invalid_condition(self):
+        """Test that malformed conditions raise a ValueError."""
+        with self.assertRaises(ValueError):
+            self.query.where("price", 10)
+        with self.assertRaises(ValueError):
+            self.query.where("price", "=", 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+#!/usr/bin/python3
+"""Unit tests for the TextIndex class."""
+import unittest
+from models.engine.text_index import TextIndex, tokenize
+
+
+class TestTextIndex(unittest.TestCase):
+    """Test cases for the TextIndex class."""
+
+    def setUp(self):
+        """Index a few documents."""
+        self.index = TextIndex([
+            ("Place.1", ("Cozy loft", "A cozy loft near the river")),
+            ("Place.2", ("Beach house", "Sunny house by the sea")),
+            ("Review.1", "Loved the loft, very cozy!")])
+
+    def test_tokenize(self):
+        """Test that words are lowercased and split on punctuation."""
+        self.assertEqual(["loved", "the", "loft", "very", "cozy"],
+                         tokenize("Loved the loft, very cozy!"))
+
+    def test_search_ranks(self):
+        """Test that documents are ranked by BM25 score."""
+        keys = [key for _, key in self.index.search("cozy loft")]
+        self.assertEqual(["Place.1", "Review.1"], keys)
+        self.assertEqual(["Place.2"],
+                         [key for _, key in self.index.search("SEA")])
+        self.assertEqual([], self.index.search("castle"))
+        self.assertEqual(1, len(self.index.search("the", limit=1)))
+
+    def test_rare_words_score_higher(self):
+        """Test that a rare word weighs more than a common one."""
+        scores = dict((key, score) for score, key in
+                       self.index.search("the sunny"))
+        self.assertGreater(scores["Place.2"], scores["Place.1"])
+
+    def test_add_and_remove(self):
+        """Test that changed and removed documents are no longer found."""
+        self.index.add("Place.1", ("Castle", None))
+        self.index.remove("Review.1")
+        self.index.remove("Review.9")
+        self.assertEqual([], self.index.search("loft"))
+        self.assertEqual(["Place.1"],
+                         [key for _, key in self.index.search("castle")])
+        self.index.add("Place.2", ("", 12))
+        self.assertEqual(1, len(self.index))
+
+    def test_restore(self):
+        """Test that an index restored from its words ranks the same."""
+        restored = TextIndex.restore(self.index.documents())
+        self.assertEqual(self.index.search("cozy sea"),
+                         restored.search("cozy sea"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+#!/usr/bin/python3
+"""Unit tests for the WriteBehind class."""
+import time
+import unittest
+from models.engine.write_behind import WriteBehind
+
+
+class TestWriteBehind(unittest.TestCase):
+    """Test cases for the WriteBehind class."""
+
+    def setUp(self):
+        """Count the commits of a write-behind."""
+        self.commits = 0
+        self.flusher = WriteBehind(self.commit, 0.05)
+
+    def commit(self):
+        """Count a commit."""
+        self.commits += 1
+
+    def test_requests_are_coalesced(self):
+        """Test that requests made close together are written once."""
+        for i in range(100):
+            self.flusher.request()
+        self.assertEqual(0, self.commits)
+        time.sleep(0.3)
+        self.assertEqual(1, self.commits)
+
+    def test_flush_writes_now(self):
+        """Test that flush writes the pending request right away."""
+        self.flusher.request()
+        self.flusher.flush()
+        self.assertEqual(1, self.commits)
+        time.sleep(0.2)
+        self.assertEqual(1, self.commits)
+
+    def test_flush_without_request(self):
+        """Test that flush does nothing when no request is pending."""
+        self.flusher.flush()
+        self.assertEqual(0, self.commits)
+
+
+if __name__ == "__main__":
+    unittest.main()